@@ -1,5 +1,15 @@
 import pygame
 import random
+import sys
+
+from block_sprites import BlockAtlas
+from layers import StaticLayer
+from timestep import FixedTimestep
+
+try:
+    import numpy as np
+except ImportError:  # the NumPy backend is optional
+    np = None
 
 # Initialize pygame
 pygame.init()
@@ -22,6 +32,9 @@ COLORS = [
     (0, 255, 255),  # Cyan
 ]
 
+# One pre-rendered sprite per block color; empty (black) cells are not drawn
+BLOCKS = BlockAtlas(GRID_SIZE, empty=BLACK)
+
 # Tetromino shapes
 SHAPES = [
     [[1, 1, 1],
@@ -51,9 +64,15 @@ class Tetromino:
         self.color = color
         self.x = COLS // 2 - len(shape[0]) // 2
         self.y = 0
+        self.cells = shape_cells(shape)
 
     def rotate(self):
         self.shape = [list(row) for row in zip(*self.shape[::-1])]
+        self.cells = shape_cells(self.shape)
+
+def shape_cells(shape):
+    """(x, y) offsets of a shape's filled cells."""
+    return [(x, y) for y, row in enumerate(shape) for x, cell in enumerate(row) if cell]
 
 def create_grid(locked_positions):
     grid = [[BLACK for _ in range(COLS)] for _ in range(ROWS)]
@@ -61,15 +80,26 @@ def create_grid(locked_positions):
         grid[y][x] = color
     return grid
 
-def draw_grid(surface, grid):
-    for y, row in enumerate(grid):
-        for x, color in enumerate(row):
-            pygame.draw.rect(surface, color, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+def draw_background(surface):
+    surface.fill(BLACK)
+    font = pygame.font.Font(None, 30)
+    label = font.render("Next Shape", True, WHITE)
+    surface.blit(label, (WIDTH + 10, 10))
+
+def draw_grid_lines(surface):
     for x in range(COLS):
         pygame.draw.line(surface, WHITE, (x * GRID_SIZE, 0), (x * GRID_SIZE, HEIGHT))
     for y in range(ROWS):
         pygame.draw.line(surface, WHITE, (0, y * GRID_SIZE), (WIDTH, y * GRID_SIZE))
 
+# Static layers, drawn once: the sidebar label under the blocks, the grid lines over them
+BACKGROUND = StaticLayer(draw_background)
+GRID_LINES = StaticLayer(draw_grid_lines, transparent=BLACK)
+
+def draw_grid(surface, grid):
+    BLOCKS.blit_grid(surface, grid)
+    GRID_LINES.blit(surface)
+
 def valid_space(tetromino, grid):
     for y, row in enumerate(tetromino.shape):
         for x, cell in enumerate(row):
@@ -95,84 +125,160 @@ def clear_lines(grid, locked_positions):
                     del locked_positions[(x, y)]
     return cleared
 
+# Board cells of the NumPy backend hold 0 for empty or 1 + an index into COLORS
+COLOR_INDEX = {color: i + 1 for i, color in enumerate(COLORS)}
+
+class NumpyBoard:
+    """
+    Optional board backend: a uint8 array of color indices, any size.
+    A piece touches only four cells, too few for a vectorized call to pay
+    off, so single-piece checks and locks read and write cells one at a
+    time through a flat view of the array. Whole-board line clears are
+    vectorized.
+    """
+    def __init__(self, cols=COLS, rows=ROWS):
+        if np is None:
+            raise RuntimeError('the NumPy backend needs numpy: pip install numpy')
+        self.cols = cols
+        self.rows = rows
+        self.cells = np.zeros((rows, cols), dtype=np.uint8)
+        self.flat = memoryview(self.cells).cast('B')  # cell (x, y) is flat[y * cols + x]
+        self.palette = [BLACK] + COLORS
+
+    def valid_space(self, tetromino):
+        cols, rows, flat = self.cols, self.rows, self.flat
+        px, py = tetromino.x, tetromino.y
+        for x, y in tetromino.cells:
+            x += px
+            y += py
+            if x < 0 or x >= cols or y >= rows or flat[y * cols + x]:
+                return False
+        return True
+
+    def lock(self, tetromino):
+        """Write the piece into the board; returns the rows it touched."""
+        cols, flat = self.cols, self.flat
+        px, py = tetromino.x, tetromino.y
+        color = COLOR_INDEX[tetromino.color]
+        for x, y in tetromino.cells:
+            flat[(py + y) * cols + px + x] = color
+        return {py + y for _, y in tetromino.cells}
+
+    def clear_lines(self, rows=None):
+        """
+        Remove full rows and move the rows above down. rows: the only rows
+        that can be full, e.g. those lock() just wrote to; by default the
+        whole board is checked.
+        """
+        cells = self.cells
+        if rows is None:
+            full = cells.all(axis=1)
+            cleared = int(full.sum())
+            if cleared:
+                cells[cleared:] = cells[~full]
+                cells[:cleared] = 0
+            return cleared
+        cols, flat = self.cols, self.flat
+        full = sorted(y for y in rows if 0 not in flat[y * cols:(y + 1) * cols])
+        for y in full:  # top to bottom, so the rows still to clear keep their index
+            cells[1:y + 1] = cells[:y]
+            cells[0] = 0
+        return len(full)
+
+    def to_grid(self):
+        palette = self.palette
+        return [[palette[c] for c in row] for row in self.cells.tolist()]
+
+def draw_tetromino(surface, tetromino, origin):
+    ox, oy = origin
+    BLOCKS.blit_cells(surface, [(tetromino.color, (ox + x * GRID_SIZE, oy + y * GRID_SIZE))
+                                for y, row in enumerate(tetromino.shape)
+                                for x, cell in enumerate(row) if cell])
+
 def draw_next_tetromino(surface, tetromino):
-    font = pygame.font.Font(None, 30)
-    label = font.render("Next Shape", True, WHITE)
-    surface.blit(label, (WIDTH + 10, 10))
-    for y, row in enumerate(tetromino.shape):
-        for x, cell in enumerate(row):
-            if cell:
-                pygame.draw.rect(surface, tetromino.color, (WIDTH + 10 + x * GRID_SIZE, 50 + y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+    draw_tetromino(surface, tetromino, (WIDTH + 10, 50))
 
-def main():
+def main(use_numpy=False):
     screen = pygame.display.set_mode((WIDTH + 150, HEIGHT))
     pygame.display.set_caption("Tetris")
-    clock = pygame.time.Clock()
 
     locked_positions = {}
     grid = create_grid(locked_positions)
+    board = NumpyBoard() if use_numpy else None
+    # The list grid for drawing is only rebuilt from the NumPy board when a lock changes it
+
+    def fits(tetromino):
+        if board is not None:
+            return board.valid_space(tetromino)
+        return valid_space(tetromino, grid)
 
     current_piece = Tetromino(random.choice(SHAPES), random.choice(COLORS))
     next_piece = Tetromino(random.choice(SHAPES), random.choice(COLORS))
 
-    fall_time = 0
+    timestep = FixedTimestep(0.5)
     game_over = False
 
     while not game_over:
-        grid = create_grid(locked_positions)
+        if board is None:
+            grid = create_grid(locked_positions)
+        changed = False
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 game_over = True
             if event.type == pygame.KEYDOWN:
+                changed = True
                 if event.key == pygame.K_LEFT:
                     current_piece.x -= 1
-                    if not valid_space(current_piece, grid):
+                    if not fits(current_piece):
                         current_piece.x += 1
                 if event.key == pygame.K_RIGHT:
                     current_piece.x += 1
-                    if not valid_space(current_piece, grid):
+                    if not fits(current_piece):
                         current_piece.x -= 1
                 if event.key == pygame.K_DOWN:
                     current_piece.y += 1
-                    if not valid_space(current_piece, grid):
+                    if not fits(current_piece):
                         current_piece.y -= 1
                 if event.key == pygame.K_UP:
                     current_piece.rotate()
-                    if not valid_space(current_piece, grid):
+                    if not fits(current_piece):
                         for _ in range(3):
                             current_piece.rotate()
 
-        fall_time += clock.get_rawtime()
-        clock.tick()
-
-        if fall_time / 1000 > 0.5:
+        for _ in range(timestep.steps()):
+            changed = True
             current_piece.y += 1
-            if not valid_space(current_piece, grid):
+            if not fits(current_piece):
                 current_piece.y -= 1
-                for y, row in enumerate(current_piece.shape):
-                    for x, cell in enumerate(row):
-                        if cell:
-                            locked_positions[(current_piece.x + x, current_piece.y + y)] = current_piece.color
+                if board is not None:
+                    board.clear_lines(board.lock(current_piece))
+                    grid = board.to_grid()
+                else:
+                    for y, row in enumerate(current_piece.shape):
+                        for x, cell in enumerate(row):
+                            if cell:
+                                locked_positions[(current_piece.x + x, current_piece.y + y)] = current_piece.color
+                    grid = create_grid(locked_positions)
                 current_piece = next_piece
                 next_piece = Tetromino(random.choice(SHAPES), random.choice(COLORS))
-                if not valid_space(current_piece, grid):
+                if not fits(current_piece):
                     game_over = True
-            fall_time = 0
+                    break
 
-        clear_lines(grid, locked_positions)
+        if board is None and clear_lines(grid, locked_positions):
+            changed = True
 
-        screen.fill(BLACK)
-        draw_grid(screen, grid)
-        draw_next_tetromino(screen, next_piece)
-        for y, row in enumerate(current_piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    pygame.draw.rect(screen, current_piece.color, ((current_piece.x + x) * GRID_SIZE, (current_piece.y + y) * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        if timestep.frame_due(changed):
+            BACKGROUND.blit(screen)
+            draw_grid(screen, grid)
+            draw_next_tetromino(screen, next_piece)
+            draw_tetromino(screen, current_piece, (current_piece.x * GRID_SIZE, current_piece.y * GRID_SIZE))
 
-        pygame.display.update()
+            pygame.display.update()
+        timestep.wait()
 
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
+    main(use_numpy='--numpy' in sys.argv)
@@ -1,6 +1,16 @@
 import pygame
 import random
+import struct
 import sys
+import zlib
+
+from block_sprites import BlockAtlas
+from layers import StaticLayer
+from piece_source import UniformSource
+from shape_tables import compile_shapes
+from text_cache import text_cache
+import frame_profiler
+import replay
 
 # Initialize Pygame
 pygame.init()
@@ -30,6 +40,9 @@ MAGENTA = (255, 0,   255)
 YELLOW  = (255, 255, 0)
 ORANGE  = (255, 165, 0)
 
+# One pre-rendered sprite per block color; empty (black) cells are not drawn
+BLOCKS = BlockAtlas(BLOCK_SIZE, empty=BLACK)
+
 # Shape configurations (Tetriminoes).
 # Each shape is defined by a list of lists of coordinates (x, y).
 # The center (pivot for rotation) is generally the top-left or near the middle of the shape grid.
@@ -141,17 +154,101 @@ SHAPES = [
 # Associated colors for each shape
 SHAPE_COLORS = [GREEN, RED, CYAN, YELLOW, ORANGE, BLUE, MAGENTA]
 
+# --------------------------
+#     BITBOARD TABLES
+# --------------------------
+# The locked board is kept as one integer per row: bit j is set when column j
+# is occupied. Every (shape, rotation, column) placement is precomputed once as
+# a tuple of (row offset, row mask) pairs, so a collision check is a handful of
+# ANDs instead of a scan over the whole grid.
+
+FULL_ROW = (1 << GRID_WIDTH) - 1
+SHAPE_GRID_SIZE = 5  # shape templates are 5x5 strings
+
+def _row_masks(cells, x):
+    """
+    Return ((row offset, mask), ...) for a shape placed at column x.
+    A mask of -1 means that row has a cell outside the side walls.
+    """
+    rows = {}
+    for j, i in cells:
+        col = x + j
+        if rows.get(i) == -1:
+            continue
+        if 0 <= col < GRID_WIDTH:
+            rows[i] = rows.get(i, 0) | (1 << col)
+        else:
+            rows[i] = -1
+    return tuple(sorted(rows.items()))
+
+# SHAPE_TABLES[shape_id][rotation] -> CompiledShape(cells, min_x, max_x, min_y, max_y)
+SHAPE_TABLES = compile_shapes(SHAPES, 'X')
+
+# SHAPE_MASKS[shape_id][rotation][x + SHAPE_GRID_SIZE - 1] -> ((row offset, mask), ...)
+SHAPE_MASKS = [[[_row_masks(table.cells, x)
+                 for x in range(-(SHAPE_GRID_SIZE - 1), GRID_WIDTH)]
+                for table in rotations]
+               for rotations in SHAPE_TABLES]
+
+class Bitboard:
+    """Occupancy of the locked cells as one bitmask per row; their colors stay in locked_positions."""
+    def __init__(self):
+        self.rows = [0] * GRID_HEIGHT
+
+    @classmethod
+    def from_locked(cls, locked_positions):
+        """Build a bitboard from a {(x, y): color} dict."""
+        board = cls()
+        for (col, row) in locked_positions:
+            if row >= 0:
+                board.rows[row] |= 1 << col
+        return board
+
+    def fits(self, shape_id, rotation, x, y):
+        """Return True if the shape can be placed with its top-left at (x, y)."""
+        if not -(SHAPE_GRID_SIZE - 1) <= x < GRID_WIDTH:
+            return False
+        rows = self.rows
+        for dy, mask in SHAPE_MASKS[shape_id][rotation][x + SHAPE_GRID_SIZE - 1]:
+            row = y + dy
+            if row < 0:
+                continue  # ignore positions above the top
+            if mask < 0 or row >= GRID_HEIGHT or rows[row] & mask:
+                return False
+        return True
+
+    def lock(self, shape_id, rotation, x, y):
+        """OR a shape into the board."""
+        rows = self.rows
+        for dy, mask in SHAPE_MASKS[shape_id][rotation][x + SHAPE_GRID_SIZE - 1]:
+            if y + dy >= 0:
+                rows[y + dy] |= mask
+
+    def full_rows(self):
+        """Return the indices of completely filled rows, top to bottom."""
+        return [i for i, row in enumerate(self.rows) if row == FULL_ROW]
+
+    def clear_full_rows(self):
+        """Drop every full row and shift the rows above down. Returns the cleared indices."""
+        cleared = self.full_rows()
+        if cleared:
+            kept = [row for row in self.rows if row != FULL_ROW]
+            self.rows = [0] * len(cleared) + kept
+        return cleared
+
 # --------------------------
 #     DATA STRUCTURES
 # --------------------------
 
 class Piece:
     """Represents a Tetris piece with shape, rotation index, color, and position."""
-    def __init__(self, x, y, shape):
+    def __init__(self, x, y, shape, shape_id=None):
         self.x = x
         self.y = y
         self.shape = shape
-        self.color = SHAPE_COLORS[SHAPES.index(shape)]
+        # Callers that know the index pass it; otherwise look the shape up by value
+        self.shape_id = SHAPES.index(shape) if shape_id is None else shape_id
+        self.color = SHAPE_COLORS[self.shape_id]
         self.rotation = 0  # index into the shape's rotation list
 
 # --------------------------
@@ -170,31 +267,14 @@ def create_grid(locked_positions=None):
     return grid
 
 def convert_shape_format(piece):
-    """Convert the shape string array into a list of (x,y) positions relative to the piece's top-left."""
-    positions = []
-    shape_format = piece.shape[piece.rotation % len(piece.shape)]
-
-    for i, line in enumerate(shape_format):
-        row = list(line)
-        for j, column in enumerate(row):
-            if column == 'X':
-                positions.append((piece.x + j, piece.y + i))
+    """Convert the piece's precomputed cell offsets into absolute (x,y) positions."""
+    x, y = piece.x, piece.y
+    cells = SHAPE_TABLES[piece.shape_id][piece.rotation % len(piece.shape)].cells
+    return [(x + j, y + i) for j, i in cells]
 
-    # Remove any empty rows
-    return positions
-
-def valid_space(piece, grid):
+def valid_space(piece, board):
     """Check if the piece is within the valid area and not colliding with existing blocks."""
-    accepted_positions = [[(j, i) for j in range(GRID_WIDTH) if grid[i][j] == BLACK] for i in range(GRID_HEIGHT)]
-    accepted_positions = [pos for row in accepted_positions for pos in row]
-
-    formatted = convert_shape_format(piece)
-
-    for pos in formatted:
-        if pos not in accepted_positions:
-            if pos[1] > -1:  # ignore positions above the top
-                return False
-    return True
+    return board.fits(piece.shape_id, piece.rotation % len(piece.shape), piece.x, piece.y)
 
 def check_lost(positions):
     """Check if any locked block is above the top of the grid, indicating game over."""
@@ -203,14 +283,13 @@ def check_lost(positions):
             return True
     return False
 
-def get_shape():
+def get_shape(rng=random):
     """Return a new random piece from SHAPES."""
-    return SHAPES[random.randint(0, len(SHAPES)-1)]
+    return SHAPES[rng.randint(0, len(SHAPES)-1)]
 
 def draw_text_middle(text, size, color, surface):
     """Draw text in the middle of the given surface."""
-    font = pygame.font.SysFont('comicsans', size, bold=True)
-    label = font.render(text, 1, color)
+    label = text_cache.render(text, color, 'comicsans', size, bold=True)
 
     surface_width = surface.get_width()
     surface_height = surface.get_height()
@@ -220,89 +299,258 @@ def draw_text_middle(text, size, color, surface):
 
     surface.blit(label, (label_x, label_y))
 
-def draw_grid(surface, grid):
+def draw_background(surface):
+    """Draw the static background: black with the title."""
+    surface.fill(BLACK)
+    label = text_cache.render('TETRIS', WHITE, 'comicsans', 60)
+    surface.blit(label, (surface.get_width() // 2 - label.get_width() // 2, 10))
+
+def draw_grid(surface):
     """Draw the grid lines on the surface."""
     for i in range(GRID_HEIGHT):
         # horizontal lines
-        pygame.draw.line(surface, GRAY, (0, i*BLOCK_SIZE), (SCREEN_WIDTH, i*BLOCK_SIZE))
+        pygame.draw.line(surface, GRAY, (0, i*BLOCK_SIZE), (surface.get_width(), i*BLOCK_SIZE))
     for j in range(GRID_WIDTH):
         # vertical lines
-        pygame.draw.line(surface, GRAY, (j*BLOCK_SIZE, 0), (j*BLOCK_SIZE, SCREEN_HEIGHT))
+        pygame.draw.line(surface, GRAY, (j*BLOCK_SIZE, 0), (j*BLOCK_SIZE, surface.get_height()))
 
-def clear_rows(grid, locked):
+# Drawn once and reused every frame; the grid lines go over the blocks
+BACKGROUND = StaticLayer(draw_background)
+GRID_LINES = StaticLayer(draw_grid, transparent=BLACK)
+
+# Pixel position of every cell, so drawing the falling piece creates no coordinate tuples
+CELL_PIXELS = [[(x*BLOCK_SIZE, y*BLOCK_SIZE) for x in range(GRID_WIDTH)] for y in range(GRID_HEIGHT)]
+
+class BoardLayer:
+    """
+    The background with the locked blocks drawn on it, kept in one surface.
+    It is only repainted when the grid's contents change (a piece locks or
+    rows clear), so a frame blits one surface instead of batching a sprite
+    per locked block.
     """
-    Clear completed rows from the grid and update locked positions.
+    def __init__(self):
+        self.surface = None
+        self.rows = None  # copy of the grid last painted
+
+    def blit(self, target, grid):
+        if self.surface is None or self.surface.get_size() != target.get_size():
+            self.surface = pygame.Surface(target.get_size(), 0, target)
+            self.rows = None
+        if grid != self.rows:
+            BACKGROUND.blit(self.surface)
+            BLOCKS.blit_grid(self.surface, grid)
+            self.rows = [row[:] for row in grid]
+        target.blit(self.surface, (0, 0))
+
+BOARD = BoardLayer()
+
+def clear_rows(board, locked, grid=None):
+    """
+    Clear completed rows from the bitboard and update locked positions,
+    and the color grid in place if one is given.
     Returns the number of cleared lines.
     """
-    lines_cleared = 0
-    # Go bottom-up so that when we remove a row, we shift everything down
-    for i in range(GRID_HEIGHT-1, -1, -1):
-        row = grid[i]
-        if BLACK not in row:
-            # This row is full, remove it
-            lines_cleared += 1
-            # Remove all locked blocks in that row
-            for j in range(GRID_WIDTH):
-                try:
-                    del locked[(j, i)]
-                except KeyError:
-                    pass
-            # Shift rows above down
-            for key in sorted(list(locked), key=lambda x: x[1]):
-                x, y = key
-                if y < i:
-                    newKey = (x, y + 1)
-                    locked[newKey] = locked.pop(key)
-    return lines_cleared
-
-def draw_window(surface, grid, score=0):
-    """Draw the main game window, including the grid and the current score."""
-    surface.fill(BLACK)
-
-    # Title
-    font = pygame.font.SysFont('comicsans', 60)
-    label = font.render('TETRIS', 1, WHITE)
-    surface.blit(label, (SCREEN_WIDTH // 2 - label.get_width() // 2, 10))
+    cleared = board.clear_full_rows()
+    if not cleared:
+        return 0
+    # Each surviving block moves down by the number of cleared rows below it
+    shift = [0] * GRID_HEIGHT
+    for row in cleared:
+        shift[row] = -1
+        for y in range(row):
+            if shift[y] >= 0:
+                shift[y] += 1
+    shifted = {}
+    for (x, y), color in locked.items():
+        if y < 0:
+            shifted[(x, y)] = color
+        elif shift[y] >= 0:
+            shifted[(x, y + shift[y])] = color
+    locked.clear()
+    locked.update(shifted)
+
+    if grid is not None:
+        for row in reversed(cleared):
+            del grid[row]
+        for _ in cleared:
+            grid.insert(0, [BLACK] * GRID_WIDTH)
+    return len(cleared)
+
+def draw_window(surface, grid, score=0, piece=None):
+    """
+    Draw the main game window, including the grid and the current score.
+    The falling piece, if given, is drawn over the grid without touching it.
+    """
+    # Background, title and the blocks in the grid
+    BOARD.blit(surface, grid)
 
-    # Draw the blocks in the grid
-    for i in range(GRID_HEIGHT):
-        for j in range(GRID_WIDTH):
-            pygame.draw.rect(surface, grid[i][j],
-                             (j*BLOCK_SIZE, i*BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 0)
+    # Draw the falling piece
+    if piece is not None:
+        sprite = BLOCKS.sprite(piece.color)
+        surface.blits([(sprite, CELL_PIXELS[piece.y + i][piece.x + j])
+                       for j, i in SHAPE_TABLES[piece.shape_id][piece.rotation % len(piece.shape)].cells
+                       if piece.y + i >= 0], doreturn=False)
 
     # Draw the grid lines
-    draw_grid(surface, grid)
+    GRID_LINES.blit(surface)
 
     # Score
-    font = pygame.font.SysFont('comicsans', 30)
-    score_label = font.render(f'Score: {score}', 1, WHITE)
-    surface.blit(score_label, (10, 10 + label.get_height()))
+    title = text_cache.render('TETRIS', WHITE, 'comicsans', 60)  # cached, for its height
+    score_label = text_cache.render(f'Score: {score}', WHITE, 'comicsans', 30)
+    surface.blit(score_label, (10, 10 + title.get_height()))
 
-    pygame.display.update()
+# --------------------------
+#         GAME STATE
+# --------------------------
+
+# Player inputs, also the codes stored in replay logs
+MOVE_LEFT, MOVE_RIGHT, MOVE_DOWN, ROTATE = range(4)
+
+KEY_INPUTS = {
+    pygame.K_LEFT: MOVE_LEFT,
+    pygame.K_RIGHT: MOVE_RIGHT,
+    pygame.K_DOWN: MOVE_DOWN,
+    pygame.K_UP: ROTATE
+}
+
+class Game:
+    """
+    The rules of one game without any pygame calls. Pieces come from a
+    random.Random seeded with `seed`, so the same seed and inputs always
+    replay the same game. Another piece_source can be passed as `source`
+    (replays assume the default uniform one).
+    """
+    profiler = frame_profiler.NULL_PROFILER
+
+    def __init__(self, seed=None, source=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Draws the same shapes as get_shape(self.rng) did, so old replays still play back
+        self.source = UniformSource(len(SHAPES), preview=1, rng=self.rng) if source is None else source
+        self.locked_positions = {}  # (x,y):(color)
+        self.grid = create_grid(self.locked_positions)
+        self.board = Bitboard.from_locked(self.locked_positions)
+        self.current_piece = self.new_piece()
+        self.next_piece = self.new_piece()
+        self.score = 0
+        self.pieces = 0
+        self.lost = False
+
+    def new_piece(self):
+        shape_id = self.source.next()
+        return Piece(GRID_WIDTH // 2 - 2, 0, SHAPES[shape_id], shape_id)
+
+    def move(self, move):
+        """Apply one player input, undoing it if the piece would not fit."""
+        piece = self.current_piece
+        if move == MOVE_LEFT:
+            piece.x -= 1
+            if not valid_space(piece, self.board):
+                piece.x += 1
+
+        elif move == MOVE_RIGHT:
+            piece.x += 1
+            if not valid_space(piece, self.board):
+                piece.x -= 1
+
+        elif move == MOVE_DOWN:
+            # move piece down
+            piece.y += 1
+            if not valid_space(piece, self.board):
+                piece.y -= 1
+
+        elif move == ROTATE:
+            # rotate piece
+            piece.rotation = (piece.rotation + 1) % len(piece.shape)
+            if not valid_space(piece, self.board):
+                piece.rotation = (piece.rotation - 1) % len(piece.shape)
+
+    def gravity(self):
+        """
+        Move the piece down one row. If it cannot move it is locked, full rows
+        are cleared and the next piece is spawned. Returns True on a lock.
+        """
+        piece = self.current_piece
+        piece.y += 1
+        if valid_space(piece, self.board) or piece.y <= 0:
+            return False
+        piece.y -= 1
+
+        # lock the piece
+        for x, y in convert_shape_format(piece):
+            self.locked_positions[(x, y)] = piece.color
+            if y >= 0:
+                self.grid[y][x] = piece.color
+        self.board.lock(piece.shape_id, piece.rotation % len(piece.shape), piece.x, piece.y)
+        self.pieces += 1
+
+        phase = self.profiler.switch('clear')
+        lines_cleared = clear_rows(self.board, self.locked_positions, self.grid)
+        self.profiler.switch(phase)
+        self.score += lines_cleared * 10
+        self.current_piece = self.next_piece
+        self.next_piece = self.new_piece()
+
+        # Check if game over
+        if check_lost(self.locked_positions):
+            self.lost = True
+        return True
+
+    def checksum(self):
+        """CRC32 of the board, score, piece count and the falling piece's shape."""
+        return zlib.crc32(struct.pack(f'>{GRID_HEIGHT}H3i', *self.board.rows,
+                                      self.score, self.pieces, self.current_piece.shape_id))
+
+def play_back(data):
+    """
+    Re-simulate a recorded game headless, as fast as possible, checking every
+    stored checksum. Returns the final Game; raises replay.ReplayDivergence
+    at the first checkpoint that does not match.
+    """
+    seed, checkpoint_every, records = replay.read_replay(data)
+    game = Game(seed)
+    ticks = 0
+    for tick, code, checksum in records:
+        while ticks < tick:
+            game.gravity()
+            ticks += 1
+        if code == replay.CHECKPOINT:
+            if game.checksum() != checksum:
+                raise replay.ReplayDivergence(
+                    f'checksum mismatch after {game.pieces} pieces (gravity tick {tick})')
+        elif code == replay.END:
+            break
+        else:
+            game.move(code)
+    return game
 
 # --------------------------
 #         MAIN GAME
 # --------------------------
 
-def main_game(surface):
-    locked_positions = {}  # (x,y):(color)
-    grid = create_grid(locked_positions)
+PROFILE_PHASES = ['gravity', 'clear', 'events', 'draw']
+
+def main_game(surface, seed=None, recorder=None, profiler=frame_profiler.NULL_PROFILER):
+    """
+    Play one game. With a recorder (replay.ReplayRecorder built with the same
+    seed) every input, gravity tick and checkpoint is logged. A
+    frame_profiler.FrameProfiler times each phase and draws an overlay.
+    """
+    game = Game(seed)
+    game.profiler = profiler
 
-    change_piece = False
     run = True
-    current_piece = Piece(GRID_WIDTH // 2 - 2, 0, get_shape())
-    next_piece = Piece(GRID_WIDTH // 2 - 2, 0, get_shape())
     clock = pygame.time.Clock()
     fall_time = 0
     fall_speed = 0.5  # lower = faster piece
     level_time = 0
-    score = 0
 
     while run:
-        grid = create_grid(locked_positions)
         fall_time += clock.get_rawtime()
         level_time += clock.get_rawtime()
         clock.tick(FPS)
+        profiler.begin_frame()
+        profiler.switch('gravity')
 
         # Increase speed every 10 seconds
         if level_time/1000 > 10:
@@ -313,73 +561,62 @@ def main_game(surface):
         # Piece falling logic
         if fall_time/1000 >= fall_speed:
             fall_time = 0
-            current_piece.y += 1
-            if not(valid_space(current_piece, grid)) and current_piece.y > 0:
-                current_piece.y -= 1
-                # lock the piece
-                for pos in convert_shape_format(current_piece):
-                    locked_positions[(pos[0], pos[1])] = current_piece.color
-                change_piece = True
+            if recorder is not None:
+                recorder.tick()
+            if game.gravity() and recorder is not None:
+                recorder.piece_locked(game.checksum())
 
         # Check Pygame events
+        profiler.switch('events')
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    current_piece.x -= 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x += 1
-
-                elif event.key == pygame.K_RIGHT:
-                    current_piece.x += 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x -= 1
-
-                elif event.key == pygame.K_DOWN:
-                    # move piece down
-                    current_piece.y += 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.y -= 1
-
-                elif event.key == pygame.K_UP:
-                    # rotate piece
-                    current_piece.rotation = (current_piece.rotation + 1) % len(current_piece.shape)
-                    if not valid_space(current_piece, grid):
-                        current_piece.rotation = (current_piece.rotation - 1) % len(current_piece.shape)
-
-        piece_pos = convert_shape_format(current_piece)
-        # Draw current piece on the grid
-        for x, y in piece_pos:
-            if y >= 0:
-                grid[y][x] = current_piece.color
+                # Return instead of exiting so main() can still save the replay
+                return game
 
-        # If piece is locked, generate a new piece
-        if change_piece:
-            lines_cleared = clear_rows(grid, locked_positions)
-            score += lines_cleared * 10
-            current_piece = next_piece
-            next_piece = Piece(GRID_WIDTH // 2 - 2, 0, get_shape())
-            change_piece = False
+            if event.type == pygame.KEYDOWN and event.key in KEY_INPUTS:
+                if recorder is not None:
+                    recorder.input(KEY_INPUTS[event.key])
+                game.move(KEY_INPUTS[event.key])
 
-            # Check if game over
-            if check_lost(locked_positions):
-                run = False
+        # Check if game over
+        if game.lost:
+            run = False
 
-        draw_window(surface, grid, score=score)
+        profiler.switch('draw')
+        draw_window(surface, game.grid, score=game.score, piece=game.current_piece)
+        profiler.draw_overlay(surface, (0, SCREEN_HEIGHT - 100))
+        pygame.display.update()
+        profiler.end_frame()
 
     # Display "You Lost"
     surface.fill(BLACK)
     draw_text_middle("YOU LOST", 60, WHITE, surface)
     pygame.display.update()
     pygame.time.delay(2000)
+    return game
 
 def main():
+    # python TetrisByChatGPTo1.py [--seed N] [--record FILE]
+    # python TetrisByChatGPTo1.py --replay FILE
+    # add --profile [CSV] for a timing overlay and a per-frame CSV on exit
+    args = sys.argv[1:]
+    if '--replay' in args:
+        with open(args[args.index('--replay') + 1], 'rb') as f:
+            game = play_back(f.read())
+        print(f'Replayed {game.pieces} pieces, score {game.score}')
+        return
+
+    seed = int(args[args.index('--seed') + 1]) if '--seed' in args else random.randrange(2**63)
+    recorder = replay.ReplayRecorder(seed) if '--record' in args else None
+
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption('Tetris')
-    main_game(screen)
+    profiler = frame_profiler.from_argv(args, PROFILE_PHASES, 'profile_ChatGPTo1.csv')
+    main_game(screen, seed, recorder, profiler)
+    pygame.quit()
+    if recorder is not None:
+        with open(args[args.index('--record') + 1], 'wb') as f:
+            f.write(recorder.finish())
 
 if __name__ == '__main__':
     main()
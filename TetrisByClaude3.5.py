@@ -1,5 +1,12 @@
 import pygame
-import random
+import sys
+from collections import namedtuple
+
+from block_sprites import BlockAtlas
+from layers import StaticLayer
+from piece_source import BagSource, UniformSource
+from text_cache import text_cache
+import frame_profiler
 
 # Initialize Pygame
 pygame.init()
@@ -21,6 +28,7 @@ YELLOW = (255, 255, 0)  # O piece
 GREEN = (0, 255, 0)  # S piece
 PURPLE = (128, 0, 128)  # T piece
 RED = (255, 0, 0)  # Z piece
+GRAY = (128, 128, 128)  # garbage rows from a versus opponent
 
 # Tetromino shapes and their rotations
 SHAPES = {
@@ -45,6 +53,9 @@ SHAPES = {
           [(2, 0), (1, 1), (2, 1), (1, 2)]]
 }
 
+# Shape names in the order piece sources number them
+SHAPE_NAMES = list(SHAPES)
+
 SHAPE_COLORS = {
     'I': CYAN,
     'J': BLUE,
@@ -55,17 +66,90 @@ SHAPE_COLORS = {
     'Z': RED
 }
 
+# Lowest cell of each column of every rotation: BOTTOMS[shape][rotation] = ((dx, dy), ...)
+BOTTOMS = {name: [tuple(sorted({x: max(y2 for x2, y2 in cells if x2 == x) for x, _ in cells}.items()))
+                  for cells in rotations]
+           for name, rotations in SHAPES.items()}
+
+# One pre-rendered sprite per color, leaving a 1 px gap between cells
+BLOCKS = BlockAtlas(BLOCK_SIZE - 1, empty=BLACK)
+
+# The ghost piece (where the current piece would land) is drawn in a dim version of its color
+GHOST_COLORS = {name: tuple(c // 4 for c in color) for name, color in SHAPE_COLORS.items()}
+
+
+def draw_background(surface):
+    surface.fill(BLACK)
+    # Next piece preview box
+    pygame.draw.rect(surface, WHITE,
+                     (GRID_WIDTH * BLOCK_SIZE + BLOCK_SIZE, 2 * BLOCK_SIZE, 5 * BLOCK_SIZE, 5 * BLOCK_SIZE), 1)
+
+
+# Drawn once and reused every frame
+BACKGROUND = StaticLayer(draw_background)
+
+# Actions accepted by Tetris.step()
+NOOP, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP = range(6)
+
+KEY_ACTIONS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: ROTATE,
+    pygame.K_DOWN: DOWN,
+    pygame.K_SPACE: HARD_DROP
+}
+
+
+class Piece:
+    """A falling piece: its SHAPES key, rotation index and grid position."""
+    __slots__ = ('shape', 'rotation', 'x', 'y')
+
+    def __init__(self, shape, rotation=0, x=0, y=0):
+        self.shape = shape
+        self.rotation = rotation
+        self.x = x
+        self.y = y
+
+    def copy(self):
+        return Piece(self.shape, self.rotation, self.x, self.y)
+
+    def __eq__(self, other):
+        return (isinstance(other, Piece) and
+                (self.shape, self.rotation, self.x, self.y) == (other.shape, other.rotation, other.x, other.y))
+
+    def __repr__(self):
+        return f'Piece({self.shape!r}, {self.rotation}, {self.x}, {self.y})'
+
+
+# Everything Tetris.restore() needs to rewind a game; pieces are (shape, rotation, x, y) tuples
+# and source is the piece source's getstate(), so every branch sees the same pieces.
+# Grid rows are shared with the live game, which replaces a row instead of writing into it.
+GameState = namedtuple('GameState', ['grid', 'row_counts', 'column_tops', 'current_piece', 'next_piece',
+                                     'score', 'level', 'fall_speed', 'fall_time', 'game_over', 'lines_cleared',
+                                     'source'])
+
 
 class Tetris:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption('Tetris')
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
+    def __init__(self, headless=False, profiler=frame_profiler.NULL_PROFILER,
+                 width=GRID_WIDTH, height=GRID_HEIGHT, source=None):
+        # Headless games have no window, font or frame cap and are driven by step()
+        self.headless = headless
+        self.profiler = profiler
+        # Upcoming shapes as SHAPE_NAMES indices; search agents can peek() past next_piece
+        self.source = UniformSource(len(SHAPE_NAMES), preview=1) if source is None else source
+        # Other board sizes are meant for headless use; the window is laid out for 10x20
+        self.width = width
+        self.height = height
+        if not headless:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption('Tetris')
+            self.clock = pygame.time.Clock()
         self.reset_game()
 
     def reset_game(self):
-        self.grid = [[BLACK for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        self.grid = [[BLACK for _ in range(self.width)] for _ in range(self.height)]
+        self.row_counts = [0] * self.height  # filled cells per row
+        self.column_tops = [self.height] * self.width  # highest filled row per column
         self.current_piece = self.new_piece()
         self.next_piece = self.new_piece()
         self.game_over = False
@@ -73,97 +157,240 @@ class Tetris:
         self.fall_time = 0
         self.fall_speed = 500  # Start with 0.5 seconds per drop
         self.level = 1
+        self.lines_cleared = 0
 
     def new_piece(self):
-        shape = random.choice(list(SHAPES.keys()))
-        return {
-            'shape': shape,
-            'rotation': 0,
-            'x': GRID_WIDTH // 2 - 2,
-            'y': 0
-        }
+        shape = SHAPE_NAMES[self.source.next()]
+        return Piece(shape, 0, self.width // 2 - 2, 0)
 
     def get_piece_positions(self, piece):
-        shape_coords = SHAPES[piece['shape']][piece['rotation'] % len(SHAPES[piece['shape']])]
-        return [(x + piece['x'], y + piece['y']) for x, y in shape_coords]
+        shape_coords = SHAPES[piece.shape][piece.rotation % len(SHAPES[piece.shape])]
+        return [(x + piece.x, y + piece.y) for x, y in shape_coords]
 
     def valid_move(self, piece):
-        positions = self.get_piece_positions(piece)
-        return all(0 <= x < GRID_WIDTH and y < GRID_HEIGHT and
-                   (y < 0 or self.grid[y][x] == BLACK)
-                   for x, y in positions)
+        return self.fits(piece.shape, piece.rotation, piece.x, piece.y)
+
+    def fits(self, shape, rotation, px, py):
+        """valid_move for a piece given by its fields, so moves can be tested without a copy."""
+        rotations = SHAPES[shape]
+        grid, width, height = self.grid, self.width, self.height
+        for x, y in rotations[rotation % len(rotations)]:
+            x += px
+            y += py
+            if not (0 <= x < width and y < height and (y < 0 or grid[y][x] == BLACK)):
+                return False
+        return True
+
+    def snapshot(self):
+        """Capture the game state for restore(); copies a few short lists and the source's state, no grid cells."""
+        current, following = self.current_piece, self.next_piece
+        return GameState(self.grid[:], self.row_counts[:], self.column_tops[:],
+                         (current.shape, current.rotation, current.x, current.y),
+                         (following.shape, following.rotation, following.x, following.y),
+                         self.score, self.level, self.fall_speed, self.fall_time, self.game_over,
+                         self.lines_cleared, self.source.getstate())
+
+    def restore(self, state):
+        """Rewind to a snapshot. The same snapshot can be restored any number of times."""
+        self.grid = state.grid[:]
+        self.row_counts = state.row_counts[:]
+        self.column_tops = state.column_tops[:]
+        self.current_piece = Piece(*state.current_piece)
+        self.next_piece = Piece(*state.next_piece)
+        self.score = state.score
+        self.level = state.level
+        self.fall_speed = state.fall_speed
+        self.fall_time = state.fall_time
+        self.game_over = state.game_over
+        self.lines_cleared = state.lines_cleared
+        self.source.setstate(state.source)
+
+    def set_grid(self, grid):
+        """Replace the board, e.g. with a prepared position, and recount its rows."""
+        self.grid = grid
+        self.row_counts = [sum(cell != BLACK for cell in row) for row in grid]
+        self.column_tops = [0] * self.width
+        self.update_column_tops()
+
+    def add_garbage(self, lines, hole):
+        """
+        Push `lines` garbage rows, full except for column `hole`, up from the
+        bottom, as sent by a versus opponent. The falling piece moves up with
+        the stack if it would overlap it; locked cells pushed off the top end
+        the game.
+        """
+        lines = min(lines, self.height)
+        if any(self.row_counts[:lines]):
+            self.game_over = True
+        row = [GRAY] * self.width
+        row[hole] = BLACK
+        self.set_grid(self.grid[lines:] + [row[:] for _ in range(lines)])
+        if not self.valid_move(self.current_piece):
+            self.current_piece.y -= lines
+
+    def update_column_tops(self):
+        """Move each column top down past empty cells (rows only ever move down)."""
+        grid, tops, height = self.grid, self.column_tops, self.height
+        for x, y in enumerate(tops):
+            while y < height and grid[y][x] == BLACK:
+                y += 1
+            tops[x] = y
+
+    def drop_y(self, piece):
+        """
+        Row the piece lands on when dropped straight down: for each of its
+        columns, the distance from its lowest cell to the column top. Only a
+        column whose top is above the piece (an overhang) is scanned cell by
+        cell below the piece.
+        """
+        grid, tops, height = self.grid, self.column_tops, self.height
+        bottoms = BOTTOMS[piece.shape]
+        distance = height
+        for dx, dy in bottoms[piece.rotation % len(bottoms)]:
+            x, y = piece.x + dx, piece.y + dy
+            top = tops[x]
+            if top <= y:
+                top = y + 1
+                while top < height and grid[top][x] == BLACK:
+                    top += 1
+            distance = min(distance, top - y - 1)
+        return piece.y + distance
 
     def merge_piece(self):
         positions = self.get_piece_positions(self.current_piece)
+        rows = set()
         for x, y in positions:
             if y >= 0:
-                self.grid[y][x] = SHAPE_COLORS[self.current_piece['shape']]
-        self.clear_lines()
+                if y not in rows:
+                    self.grid[y] = self.grid[y][:]  # rows may be shared with snapshots
+                self.grid[y][x] = SHAPE_COLORS[self.current_piece.shape]
+                self.row_counts[y] += 1
+                rows.add(y)
+                if y < self.column_tops[x]:
+                    self.column_tops[x] = y
+        phase = self.profiler.switch('clear')
+        self.clear_lines(rows)
+        self.profiler.switch(phase)
         self.current_piece = self.next_piece
         self.next_piece = self.new_piece()
         if not self.valid_move(self.current_piece):
             self.game_over = True
 
-    def clear_lines(self):
-        lines_cleared = 0
-        y = GRID_HEIGHT - 1
-        while y >= 0:
-            if all(self.grid[y][x] != BLACK for x in range(GRID_WIDTH)):
-                lines_cleared += 1
-                for y2 in range(y, 0, -1):
-                    self.grid[y2] = self.grid[y2 - 1][:]
-                self.grid[0] = [BLACK] * GRID_WIDTH
-            else:
-                y -= 1
-
-        if lines_cleared > 0:
-            self.score += (lines_cleared ** 2) * 100
-            self.level = self.score // 1000 + 1
-            self.fall_speed = max(100, 500 - (self.level - 1) * 50)  # Speed up as level increases
+    def apply_action(self, action):
+        piece = self.current_piece
+        rotation, x, y = piece.rotation, piece.x, piece.y
+
+        if action == LEFT:
+            x -= 1
+        elif action == RIGHT:
+            x += 1
+        elif action == ROTATE:
+            rotation = (rotation + 1) % len(SHAPES[piece.shape])
+        elif action == DOWN:
+            y += 1
+        elif action == HARD_DROP:
+            piece.y = self.drop_y(piece)
+            self.merge_piece()
+            return
+
+        if self.fits(piece.shape, rotation, x, y):
+            piece.rotation, piece.x, piece.y = rotation, x, y
+
+    def apply_gravity(self):
+        piece = self.current_piece
+        if self.fits(piece.shape, piece.rotation, piece.x, piece.y + 1):
+            piece.y += 1
+        else:
+            self.merge_piece()
+
+    def step(self, action=NOOP):
+        """Apply one action followed by one gravity tick. Returns (reward, game_over)."""
+        if self.game_over:
+            return 0, True
+        score = self.score
+        if action != NOOP:
+            self.apply_action(action)
+        if not self.game_over and action != HARD_DROP:
+            self.apply_gravity()
+        return self.score - score, self.game_over
+
+    def clear_lines(self, rows=None):
+        """
+        Remove full rows and let the rows above fall. Only the rows given
+        (those the last piece touched) can have become full; by default
+        every row is checked.
+        """
+        grid, counts, width = self.grid, self.row_counts, self.width
+        full = {y for y in (range(self.height) if rows is None else rows) if counts[y] == width}
+        lines_cleared = len(full)
+        if not full:
+            return 0
+
+        # One pass from the lowest full row up: every other row moves down to the next free
+        # slot, as a reference, and the slots left at the top get new empty rows
+        write = max(full)
+        for y in range(write, -1, -1):
+            if y not in full:
+                grid[write] = grid[y]
+                counts[write] = counts[y]
+                write -= 1
+        for y in range(write + 1):
+            grid[y] = [BLACK] * width
+            counts[y] = 0
+        self.update_column_tops()
+
+        self.lines_cleared += lines_cleared
+        self.score += (lines_cleared ** 2) * 100
+        self.level = self.score // 1000 + 1
+        self.fall_speed = max(100, 500 - (self.level - 1) * 50)  # Speed up as level increases
+        return lines_cleared
 
     def draw(self):
-        self.screen.fill(BLACK)
+        BACKGROUND.blit(self.screen)
 
         # Draw the grid
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                pygame.draw.rect(self.screen, self.grid[y][x],
-                                 (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE - 1, BLOCK_SIZE - 1))
+        BLOCKS.blit_grid(self.screen, self.grid, pitch=BLOCK_SIZE)
 
-        # Draw current piece
-        for x, y in self.get_piece_positions(self.current_piece):
-            if y >= 0:
-                pygame.draw.rect(self.screen, SHAPE_COLORS[self.current_piece['shape']],
-                                 (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE - 1, BLOCK_SIZE - 1))
+        # Draw the ghost piece where the current piece would land
+        if not self.game_over:
+            ghost = self.current_piece.copy()
+            ghost.y = self.drop_y(ghost)
+            BLOCKS.blit_cells(self.screen, [(GHOST_COLORS[ghost.shape], (x * BLOCK_SIZE, y * BLOCK_SIZE))
+                                            for x, y in self.get_piece_positions(ghost) if y >= 0])
 
-        # Draw next piece preview
-        preview_x = GRID_WIDTH * BLOCK_SIZE + BLOCK_SIZE
-        preview_y = 2 * BLOCK_SIZE
-        pygame.draw.rect(self.screen, WHITE,
-                         (preview_x, preview_y, 5 * BLOCK_SIZE, 5 * BLOCK_SIZE), 1)
+        # Draw current piece
+        color = SHAPE_COLORS[self.current_piece.shape]
+        BLOCKS.blit_cells(self.screen, [(color, (x * BLOCK_SIZE, y * BLOCK_SIZE))
+                                        for x, y in self.get_piece_positions(self.current_piece) if y >= 0])
 
+        # Draw next piece preview (its box is part of the background)
         preview_piece = self.next_piece.copy()
-        preview_piece['x'] = GRID_WIDTH + 2
-        preview_piece['y'] = 3
-        for x, y in self.get_piece_positions(preview_piece):
-            pygame.draw.rect(self.screen, SHAPE_COLORS[preview_piece['shape']],
-                             (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE - 1, BLOCK_SIZE - 1))
+        preview_piece.x = GRID_WIDTH + 2
+        preview_piece.y = 3
+        color = SHAPE_COLORS[preview_piece.shape]
+        BLOCKS.blit_cells(self.screen, [(color, (x * BLOCK_SIZE, y * BLOCK_SIZE))
+                                        for x, y in self.get_piece_positions(preview_piece)])
 
         # Draw score and level
-        score_text = self.font.render(f'Score: {self.score}', True, WHITE)
-        level_text = self.font.render(f'Level: {self.level}', True, WHITE)
+        # Labels are only rendered again when the score or level changes
+        score_text = text_cache.render(f'Score: {self.score}', WHITE, None, 36)
+        level_text = text_cache.render(f'Level: {self.level}', WHITE, None, 36)
         self.screen.blit(score_text, (GRID_WIDTH * BLOCK_SIZE + 10, 8 * BLOCK_SIZE))
         self.screen.blit(level_text, (GRID_WIDTH * BLOCK_SIZE + 10, 9 * BLOCK_SIZE))
 
         if self.game_over:
-            game_over_text = self.font.render('GAME OVER', True, RED)
+            game_over_text = text_cache.render('GAME OVER', RED, None, 36)
             text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
             self.screen.blit(game_over_text, text_rect)
 
+        self.profiler.draw_overlay(self.screen, (GRID_WIDTH * BLOCK_SIZE + 5, 11 * BLOCK_SIZE))
         pygame.display.flip()
 
     def run(self):
+        profiler = self.profiler
         while True:
+            profiler.begin_frame()
+            profiler.switch('events')
             current_time = pygame.time.get_ticks()
 
             for event in pygame.event.get():
@@ -172,47 +399,30 @@ class Tetris:
                     return
 
                 if event.type == pygame.KEYDOWN and not self.game_over:
-                    new_piece = self.current_piece.copy()
-
-                    if event.key == pygame.K_LEFT:
-                        new_piece['x'] -= 1
-                    elif event.key == pygame.K_RIGHT:
-                        new_piece['x'] += 1
-                    elif event.key == pygame.K_UP:
-                        new_piece['rotation'] = (new_piece['rotation'] + 1) % len(SHAPES[new_piece['shape']])
-                    elif event.key == pygame.K_DOWN:
-                        new_piece['y'] += 1
-                    elif event.key == pygame.K_SPACE:
-                        # Hard drop
-                        while self.valid_move(new_piece):
-                            self.current_piece = new_piece.copy()
-                            new_piece['y'] += 1
-                        self.merge_piece()
-                        new_piece = self.current_piece
-
-                    if self.valid_move(new_piece):
-                        self.current_piece = new_piece
+                    self.apply_action(KEY_ACTIONS.get(event.key, NOOP))
 
                 elif event.type == pygame.KEYDOWN and self.game_over:
                     if event.key == pygame.K_r:
                         self.reset_game()
 
             # Handle automatic falling
+            profiler.switch('gravity')
             if not self.game_over:
                 if current_time - self.fall_time > self.fall_speed:
                     self.fall_time = current_time
-                    new_piece = self.current_piece.copy()
-                    new_piece['y'] += 1
-
-                    if self.valid_move(new_piece):
-                        self.current_piece = new_piece
-                    else:
-                        self.merge_piece()
+                    self.apply_gravity()
 
+            profiler.switch('draw')
             self.draw()
+            profiler.end_frame()
             self.clock.tick(60)
 
 
+PROFILE_PHASES = ['events', 'gravity', 'clear', 'draw']
+
 if __name__ == '__main__':
-    game = Tetris()
+    # --profile [CSV] shows a timing overlay and writes a per-frame CSV on exit
+    # --bag deals pieces from a shuffled 7-bag instead of uniformly at random
+    game = Tetris(profiler=frame_profiler.from_argv(sys.argv, PROFILE_PHASES, 'profile_Claude3.5.csv'),
+                  source=BagSource(len(SHAPE_NAMES)) if '--bag' in sys.argv else None)
     game.run()
\ No newline at end of file
@@ -1,8 +1,10 @@
 import pygame
 import random
+from collections import namedtuple
 
-# Initialize pygame
-pygame.init()
+from block_sprites import BlockAtlas
+from layers import StaticLayer
+from window import Window
 
 # Screen dimensions
 SCREEN_WIDTH = 400  # Increased width to accommodate next piece display
@@ -22,6 +24,10 @@ COLORS = [
     (128, 0, 128)   # Purple (T)
 ]
 
+# One pre-rendered sprite per color with the white cell outline baked in
+BLOCKS = BlockAtlas(BLOCK_SIZE, outline=WHITE)
+PIECE_BLOCKS = BlockAtlas(BLOCK_SIZE)
+
 # Shapes and their rotations
 SHAPES = [
     [[1, 1, 1, 1]],  # I
@@ -33,54 +39,99 @@ SHAPES = [
     [[1, 1, 1], [0, 1, 0]]   # T
 ]
 
-# Initialize screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Tetris")
-
-# Clock
-clock = pygame.time.Clock()
+# Screen, opened on the first draw
+WINDOW = Window((SCREEN_WIDTH, SCREEN_HEIGHT), "Tetris")
 
 # Grid
 grid = [[0 for _ in range(10)] for _ in range(20)]  # 10x20 grid
+column_tops = [len(grid)] * len(grid[0])  # highest filled row of each column
 
-def draw_grid():
+def draw_background(surface):
+    surface.fill(BLACK)
     for y in range(len(grid)):
         for x in range(len(grid[y])):
-            if grid[y][x]:
-                pygame.draw.rect(screen, COLORS[grid[y][x] - 1], (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE))
-            pygame.draw.rect(screen, WHITE, (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 1)
+            pygame.draw.rect(surface, WHITE, (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 1)
+    font = pygame.font.SysFont('comicsans', 30)
+    text = font.render('Next Piece:', True, WHITE)
+    surface.blit(text, (320, 50))
+
+# Cell outlines and the sidebar label never change, so they are drawn once
+BACKGROUND = StaticLayer(draw_background)
+
+def draw_grid():
+    screen = WINDOW.get()
+    BACKGROUND.blit(screen)
+    BLOCKS.blit_cells(screen, ((COLORS[cell - 1], (x * BLOCK_SIZE, y * BLOCK_SIZE))
+                               for y, row in enumerate(grid) for x, cell in enumerate(row) if cell))
+
+class Piece:
+    """A falling piece: its shape matrix, color index (1-7) and grid position."""
+    __slots__ = ('shape', 'color', 'x', 'y')
+
+    def __init__(self, shape, color, x, y):
+        self.shape = shape
+        self.color = color
+        self.x = x
+        self.y = y
+
+    def copy(self):
+        return Piece(self.shape, self.color, self.x, self.y)
+
+# Board and pieces saved by snapshot(), and the state of the random module,
+# which new_piece() draws from, so every branch gets the same pieces. Grid
+# rows are shared with the live grid, which replaces a row instead of writing into it
+GameState = namedtuple('GameState', ['grid', 'column_tops', 'piece', 'next_piece', 'random_state'])
+
+def snapshot(piece, next_piece):
+    return GameState(grid[:], column_tops[:], piece.copy(), next_piece.copy(), random.getstate())
+
+def restore(state):
+    """
+    Rewind the board and the random module to a snapshot and return copies
+    of its (piece, next_piece).
+    """
+    grid[:] = state.grid
+    column_tops[:] = state.column_tops
+    random.setstate(state.random_state)
+    return state.piece.copy(), state.next_piece.copy()
 
 def new_piece():
     shape_index = random.randint(0, len(SHAPES) - 1)
     shape = SHAPES[shape_index]
     color = shape_index + 1  # Assign color based on shape index
-    piece = {
-        'shape': shape,
-        'color': color,
-        'x': 5 - len(shape[0]) // 2,  # Center the piece
-        'y': 0
-    }
-    return piece
+    return Piece(shape, color, 5 - len(shape[0]) // 2, 0)  # Center the piece
 
 def draw_piece(piece, offset_x=0, offset_y=0):
-    for y, row in enumerate(piece['shape']):
-        for x, cell in enumerate(row):
-            if cell:
-                pygame.draw.rect(screen, COLORS[piece['color'] - 1], ((piece['x'] + x + offset_x) * BLOCK_SIZE, (piece['y'] + y + offset_y) * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE))
-
-def check_collision(piece):
-    for y, row in enumerate(piece['shape']):
+    color = COLORS[piece.color - 1]
+    PIECE_BLOCKS.blit_cells(WINDOW.get(), [(color, ((piece.x + x + offset_x) * BLOCK_SIZE, (piece.y + y + offset_y) * BLOCK_SIZE))
+                                           for y, row in enumerate(piece.shape)
+                                           for x, cell in enumerate(row) if cell])
+
+def check_collision(piece, dx=0, dy=0, shape=None):
+    """Whether the piece, moved by (dx, dy) and with shape in place of its own if given, collides."""
+    px, py = piece.x + dx, piece.y + dy
+    for y, row in enumerate(piece.shape if shape is None else shape):
         for x, cell in enumerate(row):
             if cell:
-                if piece['y'] + y >= len(grid) or piece['x'] + x < 0 or piece['x'] + x >= len(grid[0]) or grid[piece['y'] + y][piece['x'] + x]:
+                if py + y >= len(grid) or px + x < 0 or px + x >= len(grid[0]) or grid[py + y][px + x]:
                     return True
     return False
 
 def merge_piece(piece):
-    for y, row in enumerate(piece['shape']):
+    for y, row in enumerate(piece.shape):
+        if any(row):
+            grid[piece.y + y] = grid[piece.y + y][:]  # rows may be shared with snapshots
         for x, cell in enumerate(row):
             if cell:
-                grid[piece['y'] + y][piece['x'] + x] = piece['color']
+                grid[piece.y + y][piece.x + x] = piece.color
+                column_tops[piece.x + x] = min(column_tops[piece.x + x], piece.y + y)
+
+def update_column_tops():
+    # Rows only move down when lines clear, so each top can only move down
+    for x, y in enumerate(column_tops):
+        while y < len(grid) and not grid[y][x]:
+            y += 1
+        column_tops[x] = y
 
 def clear_lines():
     lines_cleared = 0
@@ -89,29 +140,56 @@ def clear_lines():
             del grid[y]
             grid.insert(0, [0 for _ in range(len(grid[0]))])
             lines_cleared += 1
+    if lines_cleared:
+        update_column_tops()
     return lines_cleared
 
 def game_over():
     font = pygame.font.SysFont('comicsans', 50)
     text = font.render('Game Over', True, WHITE)
-    screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - text.get_height() // 2))
+    WINDOW.get().blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - text.get_height() // 2))
     pygame.display.update()
     pygame.time.wait(3000)
 
+def landing_y(piece):
+    """
+    Row the piece lands on when dropped straight down, from the lowest cell
+    of each of its columns and the column tops. Only a column whose top is
+    above the piece (an overhang) is scanned below the piece.
+    """
+    shape = piece.shape
+    distance = len(grid)
+    for x in range(len(shape[0])):
+        cells = [y for y in range(len(shape)) if shape[y][x]]
+        if not cells:
+            continue
+        column, bottom = piece.x + x, piece.y + cells[-1]
+        top = column_tops[column]
+        if top <= bottom:
+            top = bottom + 1
+            while top < len(grid) and not grid[top][column]:
+                top += 1
+        distance = min(distance, top - bottom - 1)
+    return piece.y + distance
+
 def drop_piece(piece):
-    while not check_collision(piece):
-        piece['y'] += 1
-    piece['y'] -= 1  # Move back up one step after collision
+    piece.y = landing_y(piece)
 
-def draw_next_piece(next_piece):
-    font = pygame.font.SysFont('comicsans', 30)
-    text = font.render('Next Piece:', True, WHITE)
-    screen.blit(text, (320, 50))
-    # Draw the next piece in the sidebar
-    for y, row in enumerate(next_piece['shape']):
+def draw_ghost(piece):
+    """Outline where the piece would land."""
+    screen = WINDOW.get()
+    ghost_y = landing_y(piece)
+    for y, row in enumerate(piece.shape):
         for x, cell in enumerate(row):
             if cell:
-                pygame.draw.rect(screen, COLORS[next_piece['color'] - 1], (320 + x * BLOCK_SIZE, 100 + y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE))
+                pygame.draw.rect(screen, COLORS[piece.color - 1], ((piece.x + x) * BLOCK_SIZE, (ghost_y + y) * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 2)
+
+def draw_next_piece(next_piece):
+    # Draw the next piece in the sidebar, under the label drawn by draw_background
+    color = COLORS[next_piece.color - 1]
+    PIECE_BLOCKS.blit_cells(WINDOW.get(), [(color, (320 + x * BLOCK_SIZE, 100 + y * BLOCK_SIZE))
+                                           for y, row in enumerate(next_piece.shape)
+                                           for x, cell in enumerate(row) if cell])
 
 def main():
     piece = new_piece()
@@ -119,10 +197,11 @@ def main():
     fall_time = 0
     fall_speed = 500
     running = True
+    clock = pygame.time.Clock()
 
     while running:
-        screen.fill(BLACK)
         draw_grid()
+        draw_ghost(piece)
         draw_piece(piece)
         draw_next_piece(next_piece)
 
@@ -131,21 +210,21 @@ def main():
                 running = False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_LEFT:
-                    piece['x'] -= 1
+                    piece.x -= 1
                     if check_collision(piece):
-                        piece['x'] += 1
+                        piece.x += 1
                 if event.key == pygame.K_RIGHT:
-                    piece['x'] += 1
+                    piece.x += 1
                     if check_collision(piece):
-                        piece['x'] -= 1
+                        piece.x -= 1
                 if event.key == pygame.K_DOWN:
-                    piece['y'] += 1
+                    piece.y += 1
                     if check_collision(piece):
-                        piece['y'] -= 1
+                        piece.y -= 1
                 if event.key == pygame.K_UP:
-                    rotated_piece = list(zip(*reversed(piece['shape'])))
-                    if not check_collision({'shape': rotated_piece, 'x': piece['x'], 'y': piece['y'], 'color': piece['color']}):
-                        piece['shape'] = rotated_piece
+                    rotated_piece = list(zip(*reversed(piece.shape)))
+                    if not check_collision(piece, shape=rotated_piece):
+                        piece.shape = rotated_piece
                 if event.key == pygame.K_SPACE:  # Drop the piece
                     drop_piece(piece)
 
@@ -154,9 +233,9 @@ def main():
 
         if fall_time >= fall_speed:
             fall_time = 0
-            piece['y'] += 1
+            piece.y += 1
             if check_collision(piece):
-                piece['y'] -= 1
+                piece.y -= 1
                 merge_piece(piece)
                 lines_cleared = clear_lines()
                 if lines_cleared:
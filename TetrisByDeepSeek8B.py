@@ -2,13 +2,11 @@ import turtle
 import random
 from collections import deque
 
-# Set up the screen
-screen = turtle.Screen()
-screen.title("Tetris")
-screen.setup(600, 800)
-screen.setworldcoordinates(-1.5, -1.5, 14.5, 20.5)
-turtle.speed(0)
-turtle.delay(0)
+from timestep import FixedTimestep
+from turtle_renderer import CellRenderer
+
+# Screen size; the turtle window is opened by the first draw()
+CELL_PIXELS = min(600 / 16, 800 / 22)  # window pixels per world unit
 
 # Game constants
 BOARD_WIDTH = 14
@@ -43,33 +41,26 @@ board = [[0 for _ in range(BOARD_WIDTH)] for __ in range(BOARD_HEIGHT)]
 score = 0
 speed = 30
 
-def draw_block(x, y, color):
-    """Draw a single block at (x, y) with given color."""
-    turtle.penup()
-    turtle.goto(x * BLOCK_SIZE + 1.5, y * BLOCK_SIZE + 1.5)
-    if color != COLORS[0]:
-        turtle.color(color)
-        turtle.begin_fill()
-    else:
-        pass
-    turtle.pendown()
-    for _ in range(4):
-        turtle.forward(BLOCK_SIZE - 2)
-        turtle.left(90)
-    if color != COLORS[0]:
-        turtle.end_fill()
+# Set up by open_screen(): one stamp per cell, updated only when the cell changes
+screen = None
+renderer = None
+
+def open_screen():
+    """Open the turtle window and create the cell renderer."""
+    global screen, renderer
+    screen = turtle.Screen()
+    screen.title("Tetris")
+    screen.setup(600, 800)
+    screen.setworldcoordinates(-1.5, -1.5, 14.5, 20.5)
+    turtle.speed(0)
+    turtle.delay(0)
+    renderer = CellRenderer(screen, BOARD_WIDTH, BOARD_HEIGHT, COLORS, CELL_PIXELS)
 
 def draw():
-    """Draw the entire game board and blocks."""
-    global board
-
-    # Clear screen
-    turtle.clear()
-
-    # Draw the board
-    for y in range(len(board)):
-        for x in range(len(board[y])):
-            draw_block(x, len(board) - y - 1, COLORS[board[y][x]])
+    """Draw the game board, re-stamping only the cells that changed."""
+    if renderer is None:
+        open_screen()
+    renderer.render(board)
 
 def create_piece(type):
     """Create a new piece of given type."""
@@ -163,32 +154,47 @@ def move_right(piece):
         piece['position'][0] += 1
         draw()
 
-current_piece = create_piece(random.randint(1, 7))
-game_over = False
-
-# Set up event handlers
-turtle.listen()
-turtle.onkey(lambda: move_left(current_piece), 'Left')
-turtle.onkey(lambda: move_right(current_piece), 'Right')
-turtle.onkey(lambda: rotate_piece(current_piece), 'Down')
-turtle.onkey(lambda: move_down(current_piece), 'Up')
-
-
-
-# Main game loop
-while not game_over:
-    draw()
-    if get_collision(current_piece):
-        lock_piece(current_piece)
-        clear_lines()
-        current_piece = create_piece(random.randint(1, 7))
-
-        # Check for game over (if new piece can't be placed)
-        if get_collision(current_piece):
-            print("Game Over! Score: {}".format(score))
-            break
+def main():
+    """Open the window and play until the board fills up."""
+    open_screen()
+    current_piece = create_piece(random.randint(1, 7))
+    game_over = False
+
+    # Set up event handlers
+    turtle.listen()
+    turtle.onkey(lambda: move_left(current_piece), 'Left')
+    turtle.onkey(lambda: move_right(current_piece), 'Right')
+    turtle.onkey(lambda: rotate_piece(current_piece), 'Down')
+    turtle.onkey(lambda: move_down(current_piece), 'Up')
+
+    # Main game loop: gravity every `speed` sixtieths of a second, drawing only after it moved
+    timestep = FixedTimestep(speed / 60)
+    while not game_over:
+        changed = False
+        for _ in range(timestep.steps()):
+            changed = True
+            if get_collision(current_piece):
+                lock_piece(current_piece)
+                clear_lines()
+                timestep.step_seconds = speed / 60
+                current_piece = create_piece(random.randint(1, 7))
+
+                # Check for game over (if new piece can't be placed)
+                if get_collision(current_piece):
+                    print("Game Over! Score: {}".format(score))
+                    game_over = True
+                    break
+
+            else:
+                move_down(current_piece)
+
+        if timestep.frame_due(changed):
+            draw()
+        else:
+            screen.update()  # key events are handled during updates
+        timestep.wait()
 
-    else:
-        move_down(current_piece)
+    turtle.done()
 
-turtle.done()
+if __name__ == "__main__":
+    main()
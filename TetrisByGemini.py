@@ -1,14 +1,17 @@
 import pygame
 import random
 
-# Initialize Pygame
-pygame.init()
-
-# Set up the display
+from block_sprites import BlockAtlas
+from layers import StaticLayer
+from shape_tables import compile_shapes
+from text_cache import text_cache
+from timestep import FixedTimestep
+from window import Window
+
+# Set up the display (the window opens on the first draw)
 screen_width = 300
 screen_height = 600
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption('Tetris')
+WINDOW = Window((screen_width, screen_height), 'Tetris')
 
 # Define colors
 BLACK = (0, 0, 0)
@@ -117,6 +120,9 @@ shapes = [
 # Define shape colors
 shape_colors = [CYAN, BLUE, MAGENTA, YELLOW, GREEN, RED, WHITE]
 
+# Cell offsets and bounding box of every shape rotation, compiled once
+shape_tables = compile_shapes(shapes, '0')
+
 # Define grid size
 grid_width = 10
 grid_height = 20
@@ -129,6 +135,10 @@ top_left_y = screen_height - grid_height * block_size - 50
 # Create the grid
 grid = [[0 for _ in range(grid_width)] for _ in range(grid_height)]
 
+# Pre-rendered block sprites: locked cells (0 is empty) with the white outline baked in, and plain pieces
+cell_sprites = BlockAtlas(block_size, outline=WHITE, empty=0)
+piece_sprites = BlockAtlas(block_size)
+
 
 class Tetromino:
     """
@@ -141,8 +151,9 @@ class Tetromino:
 
     def __init__(self):
         """Initialize a new random Tetromino."""
-        self.shape = random.choice(shapes)
-        self.color = shape_colors[shapes.index(self.shape)]
+        self.shape_id = random.randrange(len(shapes))
+        self.shape = shapes[self.shape_id]
+        self.color = shape_colors[self.shape_id]
         self.x = grid_width // 2 - len(self.shape[0]) // 2
         self.y = 0
         self.rotation = 0
@@ -177,34 +188,41 @@ class Tetromino:
         Returns:
             bool: True if the move is valid, False otherwise.
         """
-        for i, row in enumerate(self.shape[new_rotation]):
-            for j, cell in enumerate(row):
-                if cell == '0':
-                    new_x = self.x + j + dx
-                    new_y = self.y + i + dy
-                    if (new_x < 0 or new_x >= grid_width or
-                            new_y >= grid_height or (new_y >= 0 and grid[new_y][new_x])):
-                        return False
+        table = shape_tables[self.shape_id][new_rotation]
+        x = self.x + dx
+        y = self.y + dy
+        if x + table.min_x < 0 or x + table.max_x >= grid_width or y + table.max_y >= grid_height:
+            return False
+        for j, i in table.cells:
+            if y + i >= 0 and grid[y + i][x + j]:
+                return False
         return True
 
 
-def draw_grid():
-    """Draw the game grid on the screen."""
+def draw_background(surface):
+    """Draw the static background: black with the outline of every grid cell."""
+    surface.fill(BLACK)
     for i in range(grid_height):
         for j in range(grid_width):
-            pygame.draw.rect(screen, WHITE,
+            pygame.draw.rect(surface, WHITE,
                              (top_left_x + j * block_size, top_left_y + i * block_size, block_size, block_size), 1)
 
 
+background = StaticLayer(draw_background)
+
+
+def draw_grid():
+    """Draw the game grid and the locked blocks on the screen."""
+    screen = WINDOW.get()
+    background.blit(screen)
+    cell_sprites.blit_grid(screen, grid, (top_left_x, top_left_y))
+
+
 def draw_tetromino(tetromino):
     """Draw the tetromino on the screen."""
-    for i, row in enumerate(tetromino.shape[tetromino.rotation]):
-        for j, cell in enumerate(row):
-            if cell == '0':
-                pygame.draw.rect(screen, tetromino.color,
-                                 (top_left_x + (tetromino.x + j) * block_size,
-                                  top_left_y + (tetromino.y + i) * block_size,
-                                  block_size, block_size))
+    piece_sprites.blit_cells(WINDOW.get(), [(tetromino.color, (top_left_x + (tetromino.x + j) * block_size,
+                                                               top_left_y + (tetromino.y + i) * block_size))
+                                            for j, i in shape_tables[tetromino.shape_id][tetromino.rotation].cells])
 
 
 def clear_lines():
@@ -220,67 +238,72 @@ def clear_lines():
 
 def game_over():
     """Display the game over message."""
-    font = pygame.font.SysFont('comicsans', 60)
-    label = font.render('Game Over', 1, WHITE)
-    screen.blit(label, (top_left_x + grid_width * block_size / 2 - label.get_width() / 2,
-                        top_left_y + grid_height * block_size / 2 - label.get_height() / 2))
-
-
-# Game loop
-clock = pygame.time.Clock()
-fall_speed = 0.27
-fall_time = 0
-current_piece = Tetromino()
-game_over_flag = False
-score = 0
-
-while True:
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            quit()
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_LEFT:
-                current_piece.move(-1, 0)
-            if event.key == pygame.K_RIGHT:
-                current_piece.move(1, 0)
-            if event.key == pygame.K_DOWN:
-                fall_speed = 0.05
-            if event.key == pygame.K_UP:
-                current_piece.rotate()
-
-    if not game_over_flag:
-        # Move the piece down
-        fall_time += clock.get_rawtime()
-        clock.tick()
-        if fall_time / 1000 >= fall_speed:
-            fall_time = 0
-            current_piece.move(0, 1)
-            if not current_piece.valid_move(0, 1, current_piece.rotation):
-                # Lock the piece in place
-                for i, row in enumerate(current_piece.shape[current_piece.rotation]):
-                    for j, cell in enumerate(row):
-                        if cell == '0':
-                            grid[current_piece.y + i][current_piece.x + j] = current_piece.color
-                # Clear lines and update score
-                score += clear_lines() * 100
-                # Create a new piece
-                current_piece = Tetromino()
-                # Check if game over
-                if not current_piece.valid_move(0, 0, current_piece.rotation):
-                    game_over_flag = True
-
-    # Draw everything
-    screen.fill(BLACK)
-    draw_grid()
-    draw_tetromino(current_piece)
-    if game_over_flag:
-        game_over()
-
-    # Display the score
-    font = pygame.font.SysFont('comicsans', 30)
-    label = font.render('Score: ' + str(score), 1, WHITE)
-    screen.blit(label, (top_left_x + grid_width * block_size / 2 - label.get_width() / 2, 30))
-
-    pygame.display.flip()
\ No newline at end of file
+    label = text_cache.render('Game Over', WHITE, 'comicsans', 60)
+    WINDOW.get().blit(label, (top_left_x + grid_width * block_size / 2 - label.get_width() / 2,
+                              top_left_y + grid_height * block_size / 2 - label.get_height() / 2))
+
+
+def main():
+    """Run the game in a window until it is closed."""
+    fall_speed = 0.27
+    timestep = FixedTimestep(fall_speed)
+    current_piece = Tetromino()
+    game_over_flag = False
+    score = 0
+    screen = WINDOW.get()
+
+    while True:
+        changed = False
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN:
+                changed = True
+                if event.key == pygame.K_LEFT:
+                    current_piece.move(-1, 0)
+                if event.key == pygame.K_RIGHT:
+                    current_piece.move(1, 0)
+                if event.key == pygame.K_DOWN:
+                    fall_speed = 0.05
+                    timestep.step_seconds = fall_speed
+                if event.key == pygame.K_UP:
+                    current_piece.rotate()
+
+        steps = timestep.steps()  # keep the accumulator current after game over too
+        if not game_over_flag:
+            # Move the piece down
+            for _ in range(steps):
+                changed = True
+                current_piece.move(0, 1)
+                if not current_piece.valid_move(0, 1, current_piece.rotation):
+                    # Lock the piece in place
+                    for j, i in shape_tables[current_piece.shape_id][current_piece.rotation].cells:
+                        grid[current_piece.y + i][current_piece.x + j] = current_piece.color
+                    # Clear lines and update score
+                    score += clear_lines() * 100
+                    # Create a new piece
+                    current_piece = Tetromino()
+                    # Check if game over
+                    if not current_piece.valid_move(0, 0, current_piece.rotation):
+                        game_over_flag = True
+                        break
+
+        if timestep.frame_due(changed):
+            # Draw everything
+            draw_grid()
+            draw_tetromino(current_piece)
+            if game_over_flag:
+                game_over()
+
+            # Display the score
+            label = text_cache.render('Score: ' + str(score), WHITE, 'comicsans', 30)
+            screen.blit(label, (top_left_x + grid_width * block_size / 2 - label.get_width() / 2, 30))
+
+            pygame.display.flip()
+        timestep.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,15 @@
 import pygame
 import random
+import sys
 
-# Initialize Pygame
-pygame.init()
+from block_sprites import BlockAtlas
+from layers import StaticLayer
+from shape_tables import compile_shapes
+from sparse_board import SparseBoard
+import frame_profiler
+from text_cache import text_cache
+from timestep import FixedTimestep
+from window import Window
 
 # Constants
 SCREEN_WIDTH = 800
@@ -11,6 +18,12 @@ PLAY_WIDTH = 300  # 10 blocks wide (30px each)
 PLAY_HEIGHT = 600  # 20 blocks tall (30px each)
 BLOCK_SIZE = 30
 
+# Board size (any size works; --size WxH) and the part of it the play area shows
+GRID_WIDTH = 10
+GRID_HEIGHT = 20
+VIEW_COLS = PLAY_WIDTH // BLOCK_SIZE
+VIEW_ROWS = PLAY_HEIGHT // BLOCK_SIZE
+
 # Positioning the play area in the center
 TOP_LEFT_X = (SCREEN_WIDTH - PLAY_WIDTH) // 2
 TOP_LEFT_Y = SCREEN_HEIGHT - PLAY_HEIGHT - 50
@@ -40,17 +53,22 @@ SHAPES = [
 
 SHAPE_COLORS = [CYAN, YELLOW, MAGENTA, ORANGE, BLUE, GREEN, RED]
 
-# Set up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Tetris by Grok")
-clock = pygame.time.Clock()
+# One pre-rendered sprite per cell color, gray outline included
+BLOCKS = BlockAtlas(BLOCK_SIZE, outline=GRAY, empty=BLACK)
+
+# Cell offsets of every rotation, compiled once with the centering offset baked in
+SHAPE_TABLES = compile_shapes(SHAPES, '0', offset=(-2, -4))
+
+# The display is set up when main() starts
+WINDOW = Window((SCREEN_WIDTH, SCREEN_HEIGHT), "Tetris by Grok")
 
 class Piece:
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.shape = random.choice(SHAPES)
-        self.color = SHAPE_COLORS[SHAPES.index(self.shape)]
+        self.shape_id = random.randrange(len(SHAPES))
+        self.shape = SHAPES[self.shape_id]
+        self.color = SHAPE_COLORS[self.shape_id]
         self.rotation = 0
 
     def move(self, dx, dy):
@@ -60,157 +78,219 @@ class Piece:
     def rotate(self):
         self.rotation = (self.rotation + 1) % len(self.shape)
 
-def create_grid(locked_positions={}):
-    grid = [[BLACK for _ in range(10)] for _ in range(20)]
-    for y in range(len(grid)):
-        for x in range(len(grid[y])):
-            if (x, y) in locked_positions:
-                grid[y][x] = locked_positions[(x, y)]
-    return grid
+def valid_space(piece, board):
+    # Cells above the board are ignored during initial spawn
+    return board.fits(convert_shape_format(piece))
 
-def valid_space(piece, grid):
-    accepted_pos = [[(x, y) for x in range(10) if grid[y][x] == BLACK] for y in range(20)]
-    accepted_pos = [pos for sublist in accepted_pos for pos in sublist]
+def convert_shape_format(piece):
+    x, y = piece.x, piece.y
+    return [(x + j, y + i) for j, i in SHAPE_TABLES[piece.shape_id][piece.rotation].cells]
 
-    formatted = convert_shape_format(piece)
-    for pos in formatted:
-        if pos not in accepted_pos:
-            if pos[1] > -1:  # Ignore positions above the grid during initial spawn
-                return False
-    return True
+def viewport(piece, board):
+    """
+    Board cell shown at the top left of the play area: (0, 0) when the
+    whole board fits, otherwise chosen to keep the piece near the middle.
+    """
+    left = min(max(piece.x - VIEW_COLS // 2, 0), max(board.width - VIEW_COLS, 0))
+    top = min(max(piece.y - VIEW_ROWS // 2, 0), max(board.height - VIEW_ROWS, 0))
+    return left, top
 
-def convert_shape_format(piece):
-    positions = []
-    shape = piece.shape[piece.rotation]
-    for i, line in enumerate(shape):
-        row = list(line)
-        for j, column in enumerate(row):
-            if column == '0':
-                positions.append((piece.x + j - 2, piece.y + i - 4))  # Offset for centering
-    return positions
-
-def check_lost(positions):
-    for pos in positions:
-        x, y = pos
-        if y < 0:  # Top of the screen
-            return True
-    return False
-
-def clear_rows(grid, locked):
-    rows_cleared = 0
-    for i in range(len(grid)-1, -1, -1):
-        row = grid[i]
-        if BLACK not in row:
-            rows_cleared += 1
-            for j in range(len(row)):
-                del locked[(j, i)]
-            # Shift rows down
-            for y in range(i-1, -1, -1):
-                for x in range(len(grid[y])):
-                    if (x, y) in locked:
-                        color = locked[(x, y)]
-                        del locked[(x, y)]
-                        locked[(x, y + 1)] = color
-    return rows_cleared
+def draw_cell(surface, x, y, color):
+    return surface.blit(BLOCKS.sprite(color), (TOP_LEFT_X + x * BLOCK_SIZE, TOP_LEFT_Y + y * BLOCK_SIZE))
 
 def draw_grid(surface, grid):
-    for y in range(len(grid)):
-        for x in range(len(grid[y])):
-            pygame.draw.rect(surface, grid[y][x],
-                           (TOP_LEFT_X + x * BLOCK_SIZE, TOP_LEFT_Y + y * BLOCK_SIZE,
-                            BLOCK_SIZE, BLOCK_SIZE), 0)
-            pygame.draw.rect(surface, GRAY,
-                           (TOP_LEFT_X + x * BLOCK_SIZE, TOP_LEFT_Y + y * BLOCK_SIZE,
-                            BLOCK_SIZE, BLOCK_SIZE), 1)
+    BLOCKS.blit_grid(surface, grid, (TOP_LEFT_X, TOP_LEFT_Y), skip_empty=False)
 
-def draw_window(surface, grid, score):
+def draw_background(surface):
     surface.fill(BLACK)
     # Draw title
-    font = pygame.font.SysFont('comicsans', 60)
-    label = font.render('TETRIS', 1, WHITE)
+    label = text_cache.render('TETRIS', WHITE, 'comicsans', 60)
     surface.blit(label, (TOP_LEFT_X + PLAY_WIDTH / 2 - label.get_width() / 2, 20))
-    # Draw score
-    font = pygame.font.SysFont('comicsans', 30)
-    score_label = font.render(f'Score: {score}', 1, WHITE)
-    surface.blit(score_label, (TOP_LEFT_X - 150, TOP_LEFT_Y + 200))
+
+def draw_border(surface):
+    pygame.draw.rect(surface, RED, (TOP_LEFT_X, TOP_LEFT_Y, PLAY_WIDTH, PLAY_HEIGHT), 5)
+
+# Static layers, drawn once: the title under everything, the play area border over the cells
+BACKGROUND = StaticLayer(draw_background)
+BORDER = StaticLayer(draw_border, transparent=BLACK)
+
+def draw_score(surface, score):
+    """Draw the score label; returns its rect."""
+    label = text_cache.render(f'Score: {score}', WHITE, 'comicsans', 30)
+    return surface.blit(label, (TOP_LEFT_X - 150, TOP_LEFT_Y + 200))
+
+def draw_window(surface, grid, score):
+    """Draw the whole window; returns the score label's rect."""
+    BACKGROUND.blit(surface)
+    score_rect = draw_score(surface, score)
     # Draw play area
     draw_grid(surface, grid)
-    pygame.draw.rect(surface, RED, (TOP_LEFT_X, TOP_LEFT_Y, PLAY_WIDTH, PLAY_HEIGHT), 5)
+    BORDER.blit(surface)
+    return score_rect
+
+def view_grid(board, piece, left, top):
+    """The play area's cells: the board's rows at (left, top) with the piece drawn in."""
+    grid = board.view(left, top, VIEW_COLS, VIEW_ROWS)
+    for x, y in convert_shape_format(piece):
+        if 0 <= y - top < VIEW_ROWS and 0 <= x - left < VIEW_COLS:
+            grid[y - top][x - left] = piece.color
+    return grid
+
+class DirtyRenderer:
+    """
+    Draws the full window once, then only the cells that can have changed:
+    those the piece covered in the last frame and covers now, cells a piece
+    was locked into (reported with cells_changed()) and the rows a line
+    clear moved (reported with rows_moved()). Just those rects go to
+    display.update, so a frame costs the same on any board size. Scrolling
+    the view redraws the whole window.
+    """
+    def __init__(self, surface, board):
+        self.surface = surface
+        self.board = board
+        self.view = None  # (left, top) of the last frame
+        self.piece_cells = []  # board cells the piece covered in the last frame
+        self.changed = []  # board cells changed since the last frame
+        self.moved = None  # (first, last) board rows moved since the last frame
+        self.last_score = None
+        self.score_rect = None
+
+    def cells_changed(self, cells):
+        """Board cells changed under the piece, e.g. a piece was locked into them."""
+        self.changed.extend(cells)
+
+    def rows_moved(self, first, last):
+        """Board rows first to last changed under the piece, e.g. a line clear moved them down."""
+        if self.moved is not None:
+            first, last = min(first, self.moved[0]), max(last, self.moved[1])
+        self.moved = (first, last)
+
+    def draw(self, piece, score, profiler=frame_profiler.NULL_PROFILER):
+        board, surface = self.board, self.surface
+        view = viewport(piece, board)
+        left, top = view
+        cells = convert_shape_format(piece)
+        last_cells = self.piece_cells
+        self.piece_cells = cells
+        moved, self.moved = self.moved, None
+        changed, self.changed = self.changed, []
+        if view != self.view:
+            self.score_rect = draw_window(surface, view_grid(board, piece, left, top), score)
+            self.view = view
+            self.last_score = score
+            profiler.draw_overlay(surface)
+            pygame.display.update()
+            return
 
-def main():
-    locked_positions = {}
-    grid = create_grid(locked_positions)
+        redraw = set(last_cells)
+        redraw.update(cells)
+        redraw.update(changed)
+        if moved is not None:
+            first, last = max(moved[0], top), min(moved[1], top + VIEW_ROWS - 1)
+            redraw.update((x, y) for y in range(first, last + 1)
+                          for x in range(left, min(left + VIEW_COLS, board.width)))
+        dirty = []
+        for x, y in redraw:
+            if 0 <= x - left < VIEW_COLS and 0 <= y - top < VIEW_ROWS:
+                color = piece.color if (x, y) in cells else board.get(x, y)
+                dirty.append(draw_cell(surface, x - left, y - top, color))
+        # Cells on the edge paint over the border, so put it back where they were drawn
+        for rect in dirty:
+            BORDER.blit(surface, area=rect)
+
+        if score != self.last_score:
+            BACKGROUND.blit(surface, area=self.score_rect)
+            dirty.append(self.score_rect)
+            self.score_rect = draw_score(surface, score)
+            dirty.append(self.score_rect)
+            self.last_score = score
+
+        dirty.extend(profiler.draw_overlay(surface))
+        if dirty:
+            pygame.display.update(dirty)
+
+PROFILE_PHASES = ['gravity', 'events', 'clear', 'draw']
+
+def main(profiler=frame_profiler.NULL_PROFILER, width=GRID_WIDTH, height=GRID_HEIGHT):
+    # Only rows with locked cells are stored, so per-frame work follows the
+    # locked cells and the play area, not the board size
+    board = SparseBoard(width, height, BLACK)
     change_piece = False
     run = True
-    current_piece = Piece(5, 0)
-    next_piece = Piece(5, 0)
-    fall_time = 0
+    current_piece = Piece(width // 2, 0)
+    next_piece = Piece(width // 2, 0)
     fall_speed = 0.5  # Seconds
     score = 0
+    screen = WINDOW.get()
+    renderer = DirtyRenderer(screen, board)
+    timestep = FixedTimestep(fall_speed)
 
     while run:
-        grid = create_grid(locked_positions)
-        fall_time += clock.get_rawtime()
-        clock.tick()
+        profiler.begin_frame()
+        changed = False
 
-        # Piece falling logic
-        if fall_time / 1000 >= fall_speed:
-            fall_time = 0
+        # Piece falling logic, one step per fall_speed of real time
+        profiler.switch('gravity')
+        for _ in range(timestep.steps()):
+            changed = True
             current_piece.move(0, 1)
-            if not valid_space(current_piece, grid) and current_piece.y > 0:
+            if not valid_space(current_piece, board) and current_piece.y > 0:
                 current_piece.move(0, -1)
                 change_piece = True
 
         # Event handling
+        profiler.switch('events')
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
             if event.type == pygame.KEYDOWN:
+                changed = True
                 if event.key == pygame.K_LEFT:
                     current_piece.move(-1, 0)
-                    if not valid_space(current_piece, grid):
+                    if not valid_space(current_piece, board):
                         current_piece.move(1, 0)
                 if event.key == pygame.K_RIGHT:
                     current_piece.move(1, 0)
-                    if not valid_space(current_piece, grid):
+                    if not valid_space(current_piece, board):
                         current_piece.move(-1, 0)
                 if event.key == pygame.K_DOWN:
                     current_piece.move(0, 1)
-                    if not valid_space(current_piece, grid):
+                    if not valid_space(current_piece, board):
                         current_piece.move(0, -1)
                 if event.key == pygame.K_UP:
                     current_piece.rotate()
-                    if not valid_space(current_piece, grid):
+                    if not valid_space(current_piece, board):
                         current_piece.rotate()  # Rotate back if invalid
                         current_piece.rotate()
                         current_piece.rotate()
 
         # Add piece to grid when it lands
+        profiler.switch('clear')
         if change_piece:
-            for pos in convert_shape_format(current_piece):
-                locked_positions[pos] = current_piece.color
+            locked = convert_shape_format(current_piece)
+            full_rows = board.lock(locked, current_piece.color)
+            renderer.cells_changed(locked)
+            if full_rows:
+                # Every stored row from the top of the stack down to the lowest cleared one moves
+                renderer.rows_moved(board.occupied[0], full_rows[-1])
             current_piece = next_piece
-            next_piece = Piece(5, 0)
+            next_piece = Piece(width // 2, 0)
             change_piece = False
-            score += clear_rows(grid, locked_positions) * 10
-
-        # Draw current piece
-        for pos in convert_shape_format(current_piece):
-            x, y = pos
-            if y >= 0:
-                grid[y][x] = current_piece.color
+            score += board.clear_rows(full_rows) * 10
 
-        draw_window(screen, grid, score)
+        # Draw the visible part of the board with the current piece
+        profiler.switch('draw')
+        if timestep.frame_due(changed):
+            renderer.draw(current_piece, score, profiler)
+        profiler.end_frame()
 
-        # Check game over
-        if check_lost(locked_positions):
+        # Check game over: a piece locked above the top
+        if board.topped_out:
             run = False
-
-        pygame.display.update()
+        timestep.wait()
 
     # Game over screen
-    font = pygame.font.SysFont('comicsans', 50)
-    label = font.render('Game Over', 1, WHITE)
+    label = text_cache.render('Game Over', WHITE, 'comicsans', 50)
     screen.blit(label, (TOP_LEFT_X + PLAY_WIDTH / 2 - label.get_width() / 2,
                        TOP_LEFT_Y + PLAY_HEIGHT / 2 - label.get_height() / 2))
     pygame.display.update()
@@ -218,4 +298,8 @@ def main():
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # --profile [CSV] shows a timing overlay and writes a per-frame CSV on exit
+    # --size WxH plays on a board of that size, e.g. --size 200x2000
+    size = sys.argv[sys.argv.index('--size') + 1] if '--size' in sys.argv else f'{GRID_WIDTH}x{GRID_HEIGHT}'
+    width, height = map(int, size.split('x'))
+    main(frame_profiler.from_argv(sys.argv, PROFILE_PHASES, 'profile_Grok3.csv'), width, height)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Vectorized multi-board Tetris for batch AI training, on the rules of
+TetrisByClaude3.5.py: its SHAPES tables, valid_move, the clear_lines
+scoring and the level/fall_speed progression.
+
+All N boards live in one contiguous uint8 array and are stepped together
+with one action per board. Requires numpy.
+
+    env = BatchTetris(1024, seed=0)
+    obs = env.reset()
+    obs, reward, done = env.step(actions)  # actions: int array of shape (1024,)
+
+Actions are those of Tetris.step(): NOOP, LEFT, RIGHT, ROTATE, DOWN and
+HARD_DROP. As in Tetris.step(), every step applies the action and then one
+gravity tick (none after a hard drop). Pass step_ms to let gravity follow
+fall_speed instead, as Tetris.run() does in real time. Boards whose game
+ended are reset automatically; their done flag is set for that step.
+"""
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+
+def _load_claude():
+    name = 'TetrisByClaude3_5'
+    if name not in sys.modules:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'TetrisByClaude3.5.py')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+rules = _load_claude()
+
+NOOP, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP = (rules.NOOP, rules.LEFT, rules.RIGHT,
+                                              rules.ROTATE, rules.DOWN, rules.HARD_DROP)
+
+# Observation values: 0 empty, 1-7 a locked cell of SHAPE_NAMES[value - 1], 8 the falling piece
+SHAPE_NAMES = list(rules.SHAPES)
+ACTIVE = len(SHAPE_NAMES) + 1
+
+# ROTATION_COUNTS[shape]; CELLS[shape, rotation % 4] -> (4, 2) array of (x, y) offsets
+ROTATION_COUNTS = np.array([len(rules.SHAPES[name]) for name in SHAPE_NAMES])
+CELLS = np.array([[rules.SHAPES[name][r % len(rules.SHAPES[name])] for r in range(4)]
+                  for name in SHAPE_NAMES], dtype=np.int64)
+
+
+class BatchTetris:
+    def __init__(self, n, width=rules.GRID_WIDTH, height=rules.GRID_HEIGHT, seed=None, step_ms=None):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.step_ms = step_ms
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((n, height, width), dtype=np.uint8)
+        self.shape = np.zeros(n, dtype=np.int64)
+        self.next_shape = np.zeros(n, dtype=np.int64)
+        self.rotation = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.fall_speed = np.full(n, 500, dtype=np.int64)
+        self.fall_time = np.zeros(n, dtype=np.int64)
+        self.rows = np.arange(height)
+        self.reset()
+
+    # --------------------------
+    #          RULES
+    # --------------------------
+
+    def new_shapes(self, count):
+        """Draw count random shape indices (Tetris.new_piece picks uniformly)."""
+        return self.rng.integers(0, len(SHAPE_NAMES), size=count)
+
+    def cells(self, idx, shape, rotation, x, y):
+        """Absolute (xs, ys) of the pieces of boards idx, each of shape (len(idx), 4)."""
+        offsets = CELLS[shape, rotation % 4]
+        return offsets[:, :, 0] + x[:, None], offsets[:, :, 1] + y[:, None]
+
+    def valid_move(self, idx, shape, rotation, x, y):
+        """Tetris.valid_move for boards idx: inside the walls and floor, and on empty cells."""
+        xs, ys = self.cells(idx, shape, rotation, x, y)
+        inside = (xs >= 0) & (xs < self.width) & (ys < self.height)
+        hit = self.boards[idx[:, None], np.clip(ys, 0, self.height - 1),
+                          np.clip(xs, 0, self.width - 1)] != 0
+        return (inside & ((ys < 0) | ~hit)).all(axis=1)
+
+    def spawn(self, idx):
+        """Make the next piece current and draw a new next piece; returns game-over flags."""
+        self.shape[idx] = self.next_shape[idx]
+        self.next_shape[idx] = self.new_shapes(len(idx))
+        self.rotation[idx] = 0
+        self.x[idx] = self.width // 2 - 2
+        self.y[idx] = 0
+        return ~self.valid_move(idx, self.shape[idx], self.rotation[idx], self.x[idx], self.y[idx])
+
+    def merge_piece(self, idx):
+        """Tetris.merge_piece for boards idx. Returns (reward, game_over) arrays."""
+        shape = self.shape[idx]
+        xs, ys = self.cells(idx, shape, self.rotation[idx], self.x[idx], self.y[idx])
+        visible = ys >= 0
+        rows = np.broadcast_to(idx[:, None], ys.shape)
+        self.boards[rows[visible], ys[visible], xs[visible]] = np.broadcast_to(
+            (shape + 1)[:, None], ys.shape)[visible]
+        reward = self.clear_lines(idx)
+        return reward, self.spawn(idx)
+
+    def clear_lines(self, idx):
+        """Tetris.clear_lines for boards idx, compacting every board in one pass."""
+        boards = self.boards[idx]
+        full = boards.all(axis=2)
+        lines = full.sum(axis=1)
+        reward = np.zeros(len(idx), dtype=np.int64)
+        cleared = lines > 0
+        if not cleared.any():
+            return reward
+
+        sub = idx[cleared]
+        boards, full, lines = boards[cleared], full[cleared], lines[cleared]
+        # Full rows sort to the top (stable, so the rest keep their order) and are emptied
+        order = np.argsort(~full, axis=1, kind='stable')
+        boards = np.take_along_axis(boards, order[:, :, None], axis=1)
+        boards[self.rows[None, :] < lines[:, None]] = 0
+        self.boards[sub] = boards
+
+        reward[cleared] = lines ** 2 * 100
+        self.score[sub] += reward[cleared]
+        self.level[sub] = self.score[sub] // 1000 + 1
+        self.fall_speed[sub] = np.maximum(100, 500 - (self.level[sub] - 1) * 50)
+        return reward
+
+    # --------------------------
+    #      ENVIRONMENT API
+    # --------------------------
+
+    def reset(self):
+        """Reset every board and return the observation."""
+        self.reset_boards(np.arange(self.n))
+        return self.observe()
+
+    def reset_boards(self, idx):
+        self.boards[idx] = 0
+        self.score[idx] = 0
+        self.level[idx] = 1
+        self.fall_speed[idx] = 500
+        self.fall_time[idx] = 0
+        # Tetris.reset_game draws the current piece, then the next one
+        self.next_shape[idx] = self.new_shapes(len(idx))
+        self.spawn(idx)
+
+    def observe(self):
+        """Boards with the falling piece drawn in as ACTIVE, shape (n, height, width)."""
+        obs = self.boards.copy()
+        idx = np.arange(self.n)
+        xs, ys = self.cells(idx, self.shape, self.rotation, self.x, self.y)
+        visible = ys >= 0
+        obs[np.broadcast_to(idx[:, None], ys.shape)[visible], ys[visible], xs[visible]] = ACTIVE
+        return obs
+
+    def step(self, actions):
+        """Step every board with its action. Returns (observation, reward, done)."""
+        actions = np.asarray(actions)
+        reward = np.zeros(self.n, dtype=np.int64)
+        done = np.zeros(self.n, dtype=bool)
+
+        # Moves and rotation are kept only where the new position is valid
+        idx = np.flatnonzero((actions >= LEFT) & (actions <= DOWN))
+        if len(idx):
+            a = actions[idx]
+            x = self.x[idx] + (a == RIGHT) - (a == LEFT)
+            y = self.y[idx] + (a == DOWN)
+            rotation = np.where(a == ROTATE, (self.rotation[idx] + 1) % ROTATION_COUNTS[self.shape[idx]],
+                                self.rotation[idx])
+            ok = self.valid_move(idx, self.shape[idx], rotation, x, y)
+            idx, x, y, rotation = idx[ok], x[ok], y[ok], rotation[ok]
+            self.x[idx], self.y[idx], self.rotation[idx] = x, y, rotation
+
+        # Hard drop: fall while the next row down is free, then lock
+        drop = np.flatnonzero(actions == HARD_DROP)
+        falling = drop
+        while len(falling):
+            ok = self.valid_move(falling, self.shape[falling], self.rotation[falling],
+                                 self.x[falling], self.y[falling] + 1)
+            falling = falling[ok]
+            self.y[falling] += 1
+        lock = [drop]
+
+        # Gravity for everything that was not hard dropped
+        if self.step_ms is None:
+            fall = np.flatnonzero(actions != HARD_DROP)
+        else:
+            self.fall_time += self.step_ms
+            fall = np.flatnonzero((actions != HARD_DROP) & (self.fall_time > self.fall_speed))
+            self.fall_time[fall] = 0
+        if len(fall):
+            ok = self.valid_move(fall, self.shape[fall], self.rotation[fall], self.x[fall], self.y[fall] + 1)
+            self.y[fall[ok]] += 1
+            lock.append(fall[~ok])
+
+        lock = np.concatenate(lock)
+        if len(lock):
+            reward[lock], done[lock] = self.merge_piece(lock)
+
+        if done.any():
+            self.reset_boards(np.flatnonzero(done))
+        return self.observe(), reward, done
@@ -0,0 +1,72 @@
+"""
+Board-steps per second of batch_env.BatchTetris, after checking that a
+single batched board plays exactly like Tetris(headless=True) from
+TetrisByClaude3.5.py when both get the same pieces and actions.
+
+    python benchmarks/bench_batch.py
+"""
+import random
+import time
+
+import numpy as np
+
+from common import load_game
+
+game = load_game('Claude3.5')
+import batch_env  # noqa: E402  (needs the repository root on sys.path, set up by common)
+
+
+def check_against_scalar(seed, steps=3000):
+    rng = random.Random(seed)
+    shapes = [rng.randrange(len(batch_env.SHAPE_NAMES)) for _ in range(steps + 2)]
+    scalar_shapes = iter(shapes)
+    batch_shapes = iter(shapes)
+
+    tetris = game.Tetris(headless=True)
+    tetris.new_piece = lambda: game.Piece(batch_env.SHAPE_NAMES[next(scalar_shapes)], 0,
+                                          game.GRID_WIDTH // 2 - 2, 0)
+    tetris.reset_game()
+    env = batch_env.BatchTetris(1)
+    env.new_shapes = lambda count: np.array([next(batch_shapes) for _ in range(count)])
+    env.reset()
+
+    colors = [game.BLACK] + [game.SHAPE_COLORS[name] for name in batch_env.SHAPE_NAMES]
+    for step in range(steps):
+        action = rng.choice((game.NOOP, game.LEFT, game.RIGHT, game.ROTATE, game.ROTATE,
+                             game.DOWN, game.HARD_DROP))
+        reward, done = tetris.step(action)
+        _, batch_reward, batch_done = env.step([action])
+        if done or batch_done[0]:
+            if not (done and batch_done[0]):
+                raise AssertionError(f'step {step}: game over differs')
+            return step
+        piece = tetris.current_piece
+        board = [[colors[c] for c in row] for row in env.boards[0].tolist()]
+        if (reward != batch_reward[0] or tetris.grid != board or
+                (piece.x, piece.y, piece.rotation) != (env.x[0], env.y[0], env.rotation[0])):
+            raise AssertionError(f'step {step}: batched board diverged from Tetris.step()')
+    return steps
+
+
+def main():
+    checked = sum(check_against_scalar(seed) for seed in range(20))
+    print(f'{checked} steps: batched board matches Tetris.step()')
+
+    print(f'{"boards":>8}{"board-steps/sec":>18}{"resets/sec":>13}')
+    rng = np.random.default_rng(0)
+    for n in (1, 64, 1024, 8192):
+        env = batch_env.BatchTetris(n, seed=0)
+        env.reset()
+        actions = rng.integers(0, 6, size=(64, n))
+        steps = resets = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < 1.0:
+            _, _, done = env.step(actions[steps % 64])
+            resets += int(done.sum())
+            steps += 1
+        elapsed = time.perf_counter() - start
+        print(f'{n:>8}{steps * n / elapsed:>18,.0f}{resets / elapsed:>13,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Collision-check throughput of TetrisByChatGPTo1.valid_space, comparing the
+original accepted_positions scan against the bitboard engine.
+
+    python benchmarks/bench_bitboard.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('ChatGPTo1')
+
+
+def legacy_valid_space(piece, grid):
+    """The original implementation: rebuild accepted_positions, then scan it."""
+    accepted_positions = [[(j, i) for j in range(game.GRID_WIDTH) if grid[i][j] == game.BLACK]
+                          for i in range(game.GRID_HEIGHT)]
+    accepted_positions = [pos for row in accepted_positions for pos in row]
+
+    for i, line in enumerate(piece.shape[piece.rotation % len(piece.shape)]):
+        for j, column in enumerate(line):
+            if column == 'X':
+                pos = (piece.x + j, piece.y + i)
+                if pos not in accepted_positions and pos[1] > -1:
+                    return False
+    return True
+
+
+def random_locked(rng, fill_rows=8, density=0.7):
+    """Random junk in the bottom rows, never completely full."""
+    locked = {}
+    for y in range(game.GRID_HEIGHT - fill_rows, game.GRID_HEIGHT):
+        cols = [x for x in range(game.GRID_WIDTH) if rng.random() < density]
+        for x in cols[:game.GRID_WIDTH - 1]:
+            locked[(x, y)] = game.GRAY
+    return locked
+
+
+def random_pieces(rng, count):
+    pieces = []
+    for _ in range(count):
+        piece = game.Piece(rng.randint(-2, game.GRID_WIDTH - 2),
+                           rng.randint(0, game.GRID_HEIGHT - 2),
+                           rng.choice(game.SHAPES))
+        piece.rotation = rng.randrange(len(piece.shape))
+        pieces.append(piece)
+    return pieces
+
+
+def checks_per_second(check, pieces, target, seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for piece in pieces:
+            check(piece, target)
+        count += len(pieces)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(1234)
+    locked = random_locked(rng)
+    grid = game.create_grid(locked)
+    board = game.Bitboard.from_locked(locked)
+    pieces = random_pieces(rng, 1000)
+
+    mismatches = sum(legacy_valid_space(p, grid) != game.valid_space(p, board) for p in pieces)
+    before = checks_per_second(legacy_valid_space, pieces, grid)
+    after = checks_per_second(game.valid_space, pieces, board)
+
+    print(f'{"implementation":<24}{"checks/sec":>14}')
+    print(f'{"accepted_positions":<24}{before:>14,.0f}')
+    print(f'{"bitboard":<24}{after:>14,.0f}')
+    print(f'speedup: {after / before:.1f}x, mismatches: {mismatches}')
+
+
+if __name__ == '__main__':
+    main()
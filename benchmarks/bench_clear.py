@@ -0,0 +1,83 @@
+"""
+Line-clear stress test for the Claude 3.5 game on tall boards where many
+rows clear at once: the original clear_lines (a full-row check per row and
+a copy of every row above for each cleared line) against the per-row fill
+counters and single-pass compaction.
+
+    python benchmarks/bench_clear.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('Claude3.5')
+BLACK, RED = game.BLACK, game.RED
+
+WIDTH = 10
+
+
+def legacy_clear_lines(grid, width, height):
+    """Tetris.clear_lines before the fill counters, on a board of any size."""
+    lines_cleared = 0
+    y = height - 1
+    while y >= 0:
+        if all(grid[y][x] != BLACK for x in range(width)):
+            lines_cleared += 1
+            for y2 in range(y, 0, -1):
+                grid[y2] = grid[y2 - 1][:]
+            grid[0] = [BLACK] * width
+        else:
+            y -= 1
+    return lines_cleared
+
+
+def stress_board(rng, height, full_fraction):
+    """Bottom half filled with junk rows (one hole each) and full rows mixed in."""
+    grid = [[BLACK] * WIDTH for _ in range(height)]
+    for y in range(height // 2, height):
+        if rng.random() < full_fraction:
+            grid[y] = [RED] * WIDTH
+        else:
+            grid[y] = [RED] * WIDTH
+            grid[y][rng.randrange(WIDTH)] = BLACK
+    return grid
+
+
+def best_of(setup, run, boards, repeat=3):
+    """Best milliseconds per board of run(setup(board)) over repeat passes; setup is not timed."""
+    best = float('inf')
+    for _ in range(repeat):
+        args = [setup([row[:] for row in board]) for board in boards]
+        start = time.perf_counter()
+        for arg in args:
+            run(arg)
+        best = min(best, (time.perf_counter() - start) / len(args))
+    return best * 1e3
+
+
+def main():
+    print(f'{"height":>8}{"cleared":>9}{"legacy (ms)":>14}{"counters (ms)":>15}{"speedup":>9}')
+    rng = random.Random(0)
+    for height, count in ((20, 200), (200, 50), (2000, 5)):
+        boards = [stress_board(rng, height, 0.5) for _ in range(count)]
+
+        def loaded(board):
+            tetris = game.Tetris(headless=True, width=WIDTH, height=height)
+            tetris.set_grid(board)
+            return tetris
+
+        # Both must leave the same board behind
+        board = [row[:] for row in boards[0]]
+        cleared = legacy_clear_lines(board, WIDTH, height)
+        tetris = loaded([row[:] for row in boards[0]])
+        tetris.clear_lines()
+        assert board == tetris.grid, 'compaction differs from the original clear_lines'
+
+        legacy = best_of(lambda board: board, lambda board: legacy_clear_lines(board, WIDTH, height), boards)
+        fast = best_of(loaded, game.Tetris.clear_lines, boards)
+        print(f'{height:>8}{cleared:>9}{legacy:14.3f}{fast:15.3f}{legacy / fast:9.0f}x')
+
+
+if __name__ == '__main__':
+    main()
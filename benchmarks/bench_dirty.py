@@ -0,0 +1,102 @@
+"""
+Checks TetrisByGrok3's DirtyRenderer against a full draw_window() of the
+same frame, pixel for pixel, over seeded games with a scripted player
+(gravity every frame, a random move every other frame, so lines clear and
+the view scrolls on large boards). Reports the cells redrawn and the draw
+time per frame on boards of different sizes; neither should grow with the
+board.
+
+    python benchmarks/bench_dirty.py [--frames 3000]
+"""
+import argparse
+import random
+import time
+
+from common import load_game
+
+game = load_game('Grok3')
+pygame = game.pygame
+SIZES = [(10, 20), (200, 200), (200, 2000)]
+
+
+def play(width, height, frames, surface, reference, check):
+    """
+    Play until frames frames were drawn, starting a new game when one ends.
+    Returns (seconds spent in DirtyRenderer.draw, cells redrawn).
+    """
+    rng = random.Random(width * height)
+    game.random.seed(width * height)
+    board = game.SparseBoard(width, height, game.BLACK)
+    renderer = game.DirtyRenderer(surface, board)
+    piece = game.Piece(width // 2, 0)
+    score = 0
+    seconds = 0.0
+    cells = 0
+    blit = game.draw_cell
+
+    def counting_draw_cell(*args):
+        nonlocal cells
+        cells += 1
+        return blit(*args)
+
+    game.draw_cell = counting_draw_cell
+    try:
+        for frame in range(frames):
+            if frame % 2:
+                dx, rotate = rng.choice(((-1, False), (1, False), (0, True)))
+                if rotate:
+                    piece.rotate()
+                    if not game.valid_space(piece, board):
+                        for _ in range(3):
+                            piece.rotate()
+                else:
+                    piece.move(dx, 0)
+                    if not game.valid_space(piece, board):
+                        piece.move(-dx, 0)
+            piece.move(0, 1)
+            if not game.valid_space(piece, board):
+                piece.move(0, -1)
+                locked = game.convert_shape_format(piece)
+                full = board.lock(locked, piece.color)
+                renderer.cells_changed(locked)
+                if full:
+                    renderer.rows_moved(board.occupied[0], full[-1])
+                score += board.clear_rows(full) * 10
+                piece = game.Piece(width // 2, 0)
+                if board.topped_out or not game.valid_space(piece, board):
+                    board.clear()
+                    renderer = game.DirtyRenderer(surface, board)
+                    score = 0
+
+            start = time.perf_counter()
+            renderer.draw(piece, score)
+            seconds += time.perf_counter() - start
+            if check:
+                left, top = game.viewport(piece, board)
+                game.draw_window(reference, game.view_grid(board, piece, left, top), score)
+                if pygame.image.tobytes(surface, 'RGB') != pygame.image.tobytes(reference, 'RGB'):
+                    raise AssertionError(f'{width}x{height}: frame {frame} differs from draw_window')
+    finally:
+        game.draw_cell = blit
+    return seconds, cells
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=3000)
+    args = parser.parse_args()
+
+    surface = game.WINDOW.get()
+    reference = pygame.Surface(surface.get_size(), 0, surface)
+    for width, height in SIZES:
+        play(width, height, args.frames, surface, reference, check=True)
+    print(f'{len(SIZES)} boards, {args.frames} frames each: every frame matches draw_window')
+
+    print(f'{"board":<12}{"cells/frame":>12}{"us/frame":>10}')
+    for width, height in SIZES:
+        seconds, cells = play(width, height, args.frames, surface, reference, check=False)
+        print(f'{f"{width}x{height}":<12}{cells / args.frames:12.1f}{seconds / args.frames * 1e6:10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Landing-row lookups per second for the Claude 3.5 hard drop: the original
+loop (copy the piece dict and call valid_move once per row) against
+Tetris.drop_y, which reads the column-height map. The ghost piece does one
+such lookup every frame.
+
+    python benchmarks/bench_drop.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('Claude3.5')
+
+
+def legacy_drop_y(tetris, piece):
+    """The row-by-row hard drop loop from Tetris.apply_action."""
+    new_piece = piece.copy()
+    landed = new_piece
+    while tetris.valid_move(new_piece):
+        landed = new_piece.copy()
+        new_piece.y += 1
+    return landed.y
+
+
+def seeded_tetris(rng, height, fill_rows):
+    """A board with junk in its bottom fill_rows rows and pieces at spawn."""
+    tetris = game.Tetris(headless=True, height=height)
+    grid = [[game.BLACK] * tetris.width for _ in range(height)]
+    for y in range(height - fill_rows, height):
+        for x in range(tetris.width):
+            if rng.random() < 0.6:
+                grid[y][x] = game.RED
+    tetris.set_grid(grid)
+    return tetris
+
+
+def rate(drop, cases, seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for tetris, piece in cases:
+            drop(tetris, piece)
+        count += len(cases)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(0)
+    shapes = list(game.SHAPES)
+    print(f'{"board":<10}{"loop/sec":>14}{"drop_y/sec":>14}{"speedup":>9}')
+    for height in (20, 200):
+        cases = []
+        for _ in range(50):
+            tetris = seeded_tetris(rng, height, 6)
+            piece = game.Piece(rng.choice(shapes), rng.randrange(4), rng.randrange(tetris.width - 3), 0)
+            if tetris.valid_move(piece):
+                assert tetris.drop_y(piece) == legacy_drop_y(tetris, piece)
+                cases.append((tetris, piece))
+        loop = rate(legacy_drop_y, cases)
+        fast = rate(game.Tetris.drop_y, cases)
+        print(f'{f"10x{height}":<10}{loop:14,.0f}{fast:14,.0f}{fast / loop:8.0f}x')
+
+
+if __name__ == '__main__':
+    main()
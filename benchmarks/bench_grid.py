@@ -0,0 +1,139 @@
+"""
+Checks the incrementally maintained grid of TetrisByChatGPTo1 against
+create_grid(locked_positions) over many seeded games played through Game,
+and draw_window() against the original way of drawing a frame (rebuild the
+grid with the piece in it, then draw every block), pixel for pixel. Then
+compares the per-frame allocations of the two.
+
+    python benchmarks/bench_grid.py
+"""
+import random
+import tracemalloc
+
+from common import load_game
+
+game = load_game('ChatGPTo1')
+pygame = game.pygame
+GAMES = 20
+
+
+def legacy_frame(surface, locked, piece, score):
+    """A frame as main_game drew it before the grid was maintained incrementally."""
+    grid = game.create_grid(locked)
+    for x, y in game.convert_shape_format(piece):
+        if y >= 0:
+            grid[y][x] = piece.color
+    game.BACKGROUND.blit(surface)
+    game.BLOCKS.blit_grid(surface, grid)
+    game.GRID_LINES.blit(surface)
+    title = game.text_cache.render('TETRIS', game.WHITE, 'comicsans', 60)
+    surface.blit(game.text_cache.render(f'Score: {score}', game.WHITE, 'comicsans', 30),
+                 (10, 10 + title.get_height()))
+
+
+def landing(state):
+    """(rotation, x) of the deepest spot the current piece can be dropped to, ties broken at random."""
+    piece = game.Piece(0, 0, state.current_piece.shape)
+    spots = []
+    for rotation in range(len(piece.shape)):
+        for x in range(-2, game.GRID_WIDTH):
+            piece.rotation, piece.x, piece.y = rotation, x, 0
+            if game.valid_space(piece, state.board):
+                while game.valid_space(piece, state.board):
+                    piece.y += 1
+                spots.append((piece.y, state.rng.random(), rotation, x))
+    return max(spots)[2:] if spots else None
+
+
+def play(seed, surfaces, pieces=200):
+    """
+    Play a game through Game.move() and Game.gravity(), steering each piece
+    to its deepest landing spot so that lines actually get cleared. After
+    every move and gravity tick the grid must equal create_grid(), and the
+    drawn frame must equal the legacy one. Returns (lines cleared, frames
+    checked); o1 scores 10 per line.
+    """
+    state = game.Game(seed)
+    surface, reference = surfaces
+    frames = 0
+
+    def check():
+        nonlocal frames
+        if state.grid != game.create_grid(state.locked_positions):
+            raise AssertionError('maintained grid diverged from create_grid(locked_positions)')
+        game.draw_window(surface, state.grid, score=state.score, piece=state.current_piece)
+        legacy_frame(reference, state.locked_positions, state.current_piece, state.score)
+        if pygame.image.tobytes(surface, 'RGB') != pygame.image.tobytes(reference, 'RGB'):
+            raise AssertionError(f'draw_window differs from the legacy frame (seed {seed}, frame {frames})')
+        frames += 1
+
+    while state.pieces < pieces and not state.lost:
+        target = landing(state)
+        if target is None:
+            break
+        rotation, x = target
+        for _ in range(rotation):
+            state.move(game.ROTATE)
+            check()
+        while state.current_piece.x != x:
+            before = state.current_piece.x
+            state.move(game.MOVE_LEFT if x < before else game.MOVE_RIGHT)
+            check()
+            if state.current_piece.x == before:
+                break  # blocked; drop it where it is
+        while not state.gravity():
+            check()
+        check()
+        if not game.valid_space(state.current_piece, state.board):
+            break  # the next piece cannot spawn; o1 itself never notices
+    return state.score // 10, frames
+
+
+def frame_allocations(frame, frames=300):
+    """Average peak bytes allocated during a frame, after a warm-up frame."""
+    frame()
+    tracemalloc.start()
+    total = 0
+    for _ in range(frames):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / frames
+
+
+def main():
+    surface = pygame.display.set_mode((game.SCREEN_WIDTH, game.SCREEN_HEIGHT))
+    reference = pygame.Surface(surface.get_size(), 0, surface)
+    lines = frames = 0
+    for seed in range(GAMES):
+        cleared, checked = play(seed, (surface, reference))
+        lines += cleared
+        frames += checked
+    print(f'{GAMES} games, {lines} lines cleared, {frames} frames: maintained grid matches '
+          f'create_grid(locked_positions) and draw_window matches the legacy frame')
+
+    locked = {(x, y): game.GRAY for y in range(14, 20) for x in range(game.GRID_WIDTH - 1)}
+    grid = game.create_grid(locked)
+    piece = game.Piece(3, 2, game.SHAPES[6])
+    rng = random.Random(0)
+
+    def move():
+        # The piece moves between frames, as it does while a player steers it
+        piece.x = rng.randrange(0, game.GRID_WIDTH - 3)
+
+    def rebuild_frame():
+        move()
+        legacy_frame(surface, locked, piece, 0)
+
+    def incremental_frame():
+        move()
+        game.draw_window(surface, grid, score=0, piece=piece)
+
+    print(f'rebuild grid every frame: {frame_allocations(rebuild_frame):8,.0f} bytes/frame')
+    print(f'maintained grid:          {frame_allocations(incremental_frame):8,.0f} bytes/frame')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Simulation speed of the headless Claude 3.5 game driven through Tetris.step().
+
+    python benchmarks/bench_headless.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('Claude3.5')
+
+
+def run(seconds=2.0, seed=0):
+    """Play random moves ending in a hard drop, restarting on game over."""
+    random.seed(seed)
+    rng = random.Random(seed)
+    tetris = game.Tetris(headless=True)
+    pieces = steps = games = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(rng.randrange(4)):
+            tetris.step(rng.choice((game.LEFT, game.RIGHT, game.ROTATE)))
+            steps += 1
+        _, done = tetris.step(game.HARD_DROP)
+        steps += 1
+        pieces += 1
+        if done:
+            games += 1
+            tetris.reset_game()
+    elapsed = time.perf_counter() - start
+    return pieces / elapsed, steps / elapsed, games
+
+
+def main():
+    pieces, steps, games = run()
+    print(f'pieces/sec: {pieces:,.0f}')
+    print(f'steps/sec:  {steps:,.0f}')
+    print(f'games:      {games}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Per-frame cost of the static parts of each window (grid lines, cell
+outlines, titles, labels, borders): painting them every frame, as the games
+used to, against blitting the cached layers.StaticLayer.
+
+    python benchmarks/bench_layers.py
+"""
+import time
+
+from common import load_game
+
+LAYERS = {
+    'ChatGPT4o': ['BACKGROUND', 'GRID_LINES'],
+    'ChatGPTo1': ['BACKGROUND', 'GRID_LINES'],
+    'Claude3.5': ['BACKGROUND'],
+    'DeepSeek': ['BACKGROUND'],
+    'Grok3': ['BACKGROUND', 'BORDER'],
+}
+
+
+def per_frame(draw, repeat=300):
+    """Median microseconds of draw() over repeat calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        draw()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1e6
+
+
+def main():
+    print(f'{"game":<12}{"repaint (us)":>14}{"cached (us)":>14}')
+    for name, layer_names in LAYERS.items():
+        game = load_game(name)
+        if hasattr(game, 'WINDOW'):  # opened on first use
+            screen = game.WINDOW.get()
+        else:
+            screen = game.pygame.display.get_surface()
+        if screen is None:  # ChatGPT 4o opens its window in main()
+            screen = game.pygame.display.set_mode((game.WIDTH + 150, game.HEIGHT))
+        layers = [getattr(game, layer) for layer in layer_names]
+
+        def repaint():
+            for layer in layers:
+                layer.paint(screen)
+
+        def cached():
+            for layer in layers:
+                layer.blit(screen)
+
+        print(f'{name:<12}{per_frame(repaint):14.1f}{per_frame(cached):14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Line-clear and collision throughput of TetrisByChatGPT4o's list-of-tuples
+board against its optional NumPy backend, on the standard 10x20 board and
+on large custom boards:
+
+    clear       clear every full row of a board with junk in its bottom half
+    lock+clear  what the game does when a piece lands: lock it, then clear
+                (the list path scans the whole grid, NumPy the piece's rows)
+    collision   valid_space() of one piece
+
+First plays seeded games on the NumPy board and on a list grid and checks
+that they stay identical.
+
+    python benchmarks/bench_numpy.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('ChatGPT4o')
+
+SIZES = [(10, 20), (100, 1000), (200, 2000)]
+
+
+def list_clear_lines(grid, cols):
+    """ChatGPT 4o's clear_lines on a board of any width."""
+    cleared = 0
+    for y in range(len(grid) - 1, -1, -1):
+        if game.BLACK not in grid[y]:
+            cleared += 1
+            del grid[y]
+            grid.insert(0, [game.BLACK for _ in range(cols)])
+    return cleared
+
+
+def list_valid_space(tetromino, grid, cols, rows):
+    """ChatGPT 4o's valid_space on a board of any size."""
+    for y, row in enumerate(tetromino.shape):
+        for x, cell in enumerate(row):
+            if cell:
+                if (tetromino.x + x < 0 or tetromino.x + x >= cols or
+                        tetromino.y + y >= rows or grid[tetromino.y + y][tetromino.x + x] != game.BLACK):
+                    return False
+    return True
+
+
+def list_lock(tetromino, grid, locked_positions):
+    """The list path of ChatGPT 4o's main() when a piece lands."""
+    for y, row in enumerate(tetromino.shape):
+        for x, cell in enumerate(row):
+            if cell:
+                locked_positions[(tetromino.x + x, tetromino.y + y)] = tetromino.color
+    grid = game.create_grid(locked_positions)
+    game.clear_lines(grid, locked_positions)
+    return grid
+
+
+def reference_lock(tetromino, grid):
+    """
+    Lock and clear on a list grid. Not list_lock(): the list path does not
+    move locked_positions down when rows clear, so its board drifts from
+    what the NumPy backend (correctly) holds.
+    """
+    for x, y in tetromino.cells:
+        grid[tetromino.y + y][tetromino.x + x] = tetromino.color
+    kept = [row for row in grid if game.BLACK in row]
+    return [[game.BLACK] * game.COLS for _ in range(game.ROWS - len(kept))] + kept
+
+
+def deepest_drop(rng, grid, shape, color):
+    """The piece placed at its deepest landing spot over every rotation and column, or None."""
+    best = None
+    piece = game.Tetromino(shape, color)
+    for rotation in range(4):
+        for x in range(game.COLS - len(piece.shape[0]) + 1):
+            piece.x, piece.y = x, 0
+            if not game.valid_space(piece, grid):
+                continue
+            while game.valid_space(piece, grid):
+                piece.y += 1
+            spot = (piece.y - 1 + len(piece.shape), rng.random(), rotation, x)
+            best = max(best or spot, spot)
+        piece.rotate()
+    if best is None:
+        return None
+    _, _, rotation, x = best
+    piece = game.Tetromino(shape, color)
+    for _ in range(rotation):
+        piece.rotate()
+    piece.x = x
+    while game.valid_space(piece, grid):
+        piece.y += 1
+    piece.y -= 1
+    return piece
+
+
+def check(games=100):
+    """
+    Drop pieces on both boards, each at its deepest spot so rows fill and
+    clear, until the stack reaches the top. valid_space() must agree on
+    every drop and the boards must match after every lock.
+    """
+    rng = random.Random(1)
+    pieces = cleared = 0
+    for _ in range(games):
+        grid, board = game.create_grid({}), game.NumpyBoard()
+        for _ in range(500):
+            t = deepest_drop(rng, grid, rng.choice(game.SHAPES), rng.choice(game.COLORS))
+            if t is None:
+                break
+            probe = game.Tetromino(t.shape, t.color)
+            for dx in (-1, 0, 1):
+                for dy in (0, 1):
+                    probe.x, probe.y = t.x + dx, t.y + dy
+                    if board.valid_space(probe) != game.valid_space(probe, grid):
+                        raise AssertionError(f'valid_space differs after {pieces} pieces')
+            grid = reference_lock(t, grid)
+            cleared += board.clear_lines(board.lock(t))
+            pieces += 1
+            if board.to_grid() != grid:
+                raise AssertionError(f'boards differ after {pieces} pieces')
+    return games, pieces, cleared
+
+
+def seeded_board(rng, cols, rows, full_fraction=0.25):
+    """Color indices: the bottom half is junk with about full_fraction of rows full."""
+    cells = [[0] * cols for _ in range(rows)]
+    for y in range(rows // 2, rows):
+        full = rng.random() < full_fraction
+        for x in range(cols):
+            if full or rng.random() < 0.6:
+                cells[y][x] = rng.randrange(1, len(game.COLORS) + 1)
+        if not full and all(cells[y]):
+            cells[y][rng.randrange(cols)] = 0
+    return cells
+
+
+def rate(setup, run, seconds=0.5):
+    """Calls per second of run(*setup()), not counting setup."""
+    count = 0
+    spent = 0.0
+    while spent < seconds:
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        spent += time.perf_counter() - start
+        count += 1
+    return count / spent
+
+
+def main():
+    games, pieces, cleared = check()
+    print(f'{games} games, {pieces} pieces, {cleared} rows cleared: NumPy board matches a list grid after every lock')
+    rng = random.Random(3)
+    palette = [game.BLACK] + game.COLORS
+    print(f'{"board":<11}{"operation":<11}{"lists/sec":>14}{"numpy/sec":>14}{"speedup":>9}')
+    for cols, rows in SIZES:
+        cells = seeded_board(rng, cols, rows)
+        grid = [[palette[c] for c in row] for row in cells]
+        board = game.NumpyBoard(cols, rows)
+        board.cells[:] = game.np.array(cells, dtype=game.np.uint8)
+        full_cells = board.cells.copy()
+
+        def numpy_setup():
+            board.cells[:] = full_cells
+            return ()
+
+        lists = rate(lambda: ([row[:] for row in grid], cols), list_clear_lines)
+        arrays = rate(numpy_setup, board.clear_lines)
+        size = f'{cols}x{rows}'
+        print(f'{size:<11}{"clear":<11}{lists:>14,.0f}{arrays:>14,.0f}{arrays / lists:>8.1f}x')
+
+        if (cols, rows) == (game.COLS, game.ROWS):
+            # A horizontal I piece resting on the junk, completing no row
+            piece = game.Tetromino(game.SHAPES[3], game.COLORS[0])
+            piece.x = 0
+            while board.valid_space(piece):
+                piece.y += 1
+            piece.y -= 1
+            locked = {(x, y): palette[c] for y, row in enumerate(cells) for x, c in enumerate(row) if c}
+            lists = rate(lambda: (piece, grid, dict(locked)), list_lock)
+            arrays = rate(lambda: (numpy_setup(), piece)[1:], lambda p: board.clear_lines(board.lock(p)))
+            print(f'{size:<11}{"lock+clear":<11}{lists:>14,.0f}{arrays:>14,.0f}{arrays / lists:>8.1f}x')
+
+        pieces = []
+        for _ in range(256):
+            t = game.Tetromino(rng.choice(game.SHAPES), rng.choice(game.COLORS))
+            t.x, t.y = rng.randrange(cols - 3), rng.randrange(rows - 3)
+            pieces.append(t)
+        board.cells[:] = full_cells
+        index = iter(range(1 << 62))
+        lists = rate(lambda: (pieces[next(index) % 256], grid, cols, rows), list_valid_space)
+        arrays = rate(lambda: (pieces[next(index) % 256],), board.valid_space)
+        print(f'{size:<11}{"collision":<11}{lists:>14,.0f}{arrays:>14,.0f}{arrays / lists:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Piece generation throughput: the games' original per-spawn
+random.choice(list(SHAPES)) against the piece_source queues, one piece at a
+time and in bulk with take(), plus the cost of a 5-piece lookahead read
+with peek() and with upcoming(), which builds a list.
+
+    python benchmarks/bench_pieces.py
+"""
+import random
+import time
+import tracemalloc
+
+import common  # noqa: F401  (puts the repository root on sys.path)
+from piece_source import BagSource, SequenceSource, UniformSource
+
+SHAPES = {name: None for name in 'IJLOSTZ'}
+COUNT = 200_000
+
+
+def rate(run, count=COUNT):
+    start = time.perf_counter()
+    run(count)
+    return count / (time.perf_counter() - start)
+
+
+def one_at_a_time(source):
+    def run(count):
+        next_piece = source.next
+        for _ in range(count):
+            next_piece()
+    return run
+
+
+def legacy(count):
+    for _ in range(count):
+        random.choice(list(SHAPES.keys()))
+
+
+def read_ahead(source):
+    return source.peek(0), source.peek(1), source.peek(2), source.peek(3), source.peek(4)
+
+
+def allocated(read, source):
+    """Peak bytes allocated by one read(source)."""
+    read(source)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    read(source)
+    used = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return used
+
+
+def main():
+    random.seed(0)
+    sources = {
+        'uniform': UniformSource(7, seed=0),
+        '7-bag': BagSource(7, seed=0),
+        'sequence': SequenceSource(BagSource(7, seed=1).take(7000)),
+    }
+    print(f'{"source":<12}{"next()/sec":>14}{"take()/sec":>14}')
+    print(f'{"choice":<12}{rate(legacy):14,.0f}{"":>14}')
+    for name, source in sources.items():
+        print(f'{name:<12}{rate(one_at_a_time(source)):14,.0f}{rate(source.take):14,.0f}')
+
+    source = sources['7-bag']
+    reads = 200_000
+    print('5-piece lookahead:')
+    for name, read in (('peek()', read_ahead), ('upcoming()', lambda source: source.upcoming(5))):
+        start = time.perf_counter()
+        for _ in range(reads):
+            read(source)
+        ns = (time.perf_counter() - start) / reads * 1e9
+        print(f'  {name:<12}{ns:8.0f} ns{allocated(read, source):8} bytes allocated')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Placements enumerated per second by placements.py, after checking its
+output against brute-force move/valid_move search in the Claude 3.5 game.
+
+    python benchmarks/bench_placements.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('Claude3.5')
+o1 = load_game('ChatGPTo1')
+import placements  # noqa: E402  (needs the repository root on sys.path, set up by common)
+
+
+def seeded_grid(rng, rows=8):
+    """Ragged junk in the bottom rows, leaving the top of the board free."""
+    grid = [[game.BLACK] * game.GRID_WIDTH for _ in range(game.GRID_HEIGHT)]
+    for x in range(game.GRID_WIDTH):
+        for y in range(game.GRID_HEIGHT - rng.randrange(rows), game.GRID_HEIGHT):
+            if rng.random() < 0.8:
+                grid[y][x] = game.RED
+    return grid
+
+
+def brute_force(tetris, shape):
+    """Every (rotation, x, y) reached by sliding at spawn height and dropping."""
+    found = set()
+    for rotation in range(len(game.SHAPES[shape])):
+        for x in range(-3, game.GRID_WIDTH):
+            piece = game.Piece(shape, rotation, x, 0)
+            if not tetris.valid_move(piece):
+                continue
+            while tetris.valid_move(piece):
+                piece.y += 1
+            found.add((rotation, x, piece.y - 1))
+    return found
+
+
+def main():
+    rng = random.Random(5)
+    tetris = game.Tetris(headless=True)
+    profiles = {name: placements.compile_rotations(rotations) for name, rotations in game.SHAPES.items()}
+    for _ in range(500):
+        tetris.grid = seeded_grid(rng)
+        tops = placements.column_tops(tetris.grid, game.BLACK)
+        for name in game.SHAPES:
+            fast = placements.enumerate_placements(profiles[name], tops)
+            if len(fast) != len(set(fast)) or set(fast) != brute_force(tetris, name):
+                raise AssertionError(f'{name}: placements differ from brute force')
+    print('500 boards x 7 pieces: placements match brute-force search')
+
+    o1_profiles = [placements.compile_rotations([t.cells for t in tables]) for tables in o1.SHAPE_TABLES]
+    print(f'{"rotation tables":<18}{"placements/sec":>16}{"boards/sec":>12}')
+    for label, table in (('Claude 3.5', list(profiles.values())), ('ChatGPT o1', o1_profiles)):
+        grids = [seeded_grid(rng) for _ in range(64)]
+        count = boards = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < 1.0:
+            tops = placements.column_tops(grids[boards % 64], game.BLACK)
+            for piece in table:
+                count += len(placements.enumerate_placements(piece, tops))
+            boards += 1
+        elapsed = time.perf_counter() - start
+        print(f'{label:<18}{count / elapsed:>16,.0f}{boards / elapsed:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Records seeded TetrisByChatGPTo1 games driven by a scripted player, plays
+them back headless, and reports log size per piece and playback speed.
+Also checks that a tampered log is caught at a checkpoint.
+
+    python benchmarks/bench_replay.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('ChatGPTo1')
+import replay  # noqa: E402  (needs the repository root on sys.path, set up by common)
+
+
+def record(seed, frames=200000):
+    """
+    Play the way main_game does, one gravity tick every 30 frames and about six
+    random key presses per piece, recording everything.
+    """
+    rng = random.Random(seed)
+    state = game.Game(seed)
+    recorder = replay.ReplayRecorder(seed)
+    for frame in range(frames):
+        if frame % 30 == 29:
+            recorder.tick()
+            if state.gravity():
+                recorder.piece_locked(state.checksum())
+        if rng.random() < 0.02:
+            move = rng.choice((game.MOVE_LEFT, game.MOVE_RIGHT, game.ROTATE, game.MOVE_LEFT,
+                               game.MOVE_RIGHT, game.MOVE_DOWN))
+            recorder.input(move)
+            state.move(move)
+        # o1 only ends a game when a block locks above the top, which its
+        # spawn position never produces, so stop once a new piece cannot fit
+        if state.lost or not game.valid_space(state.current_piece, state.board):
+            break
+    return state, recorder.finish()
+
+
+def main():
+    logs = []
+    pieces = 0
+    for seed in range(100):
+        state, data = record(seed)
+        logs.append((state, data))
+        pieces += state.pieces
+    size = sum(len(data) for _, data in logs)
+    print(f'{len(logs)} games, {pieces} pieces, {size:,} bytes ({size / pieces:.1f} bytes/piece)')
+
+    start = time.perf_counter()
+    for state, data in logs:
+        replayed = game.play_back(data)
+        if replayed.checksum() != state.checksum():
+            raise AssertionError('playback ended in a different state')
+    elapsed = time.perf_counter() - start
+    print(f'playback: {pieces / elapsed:,.0f} pieces/sec, all final states match')
+
+    # Push the first piece of the longest game three columns right before it
+    # starts: playback must stop at the first checkpoint
+    state, data = max(logs, key=lambda log: log[0].pieces)
+    seed, every, records = replay.read_replay(data)
+    tampered = replay.ReplayRecorder(seed, every)
+    for _ in range(3):
+        tampered.input(game.MOVE_RIGHT)
+    for tick, code, checksum in records:
+        tampered.ticks = tick
+        if code == replay.CHECKPOINT:
+            tampered.pieces = every - 1
+            tampered.piece_locked(checksum)
+        elif code != replay.END:
+            tampered.input(code)
+    try:
+        game.play_back(tampered.finish())
+    except replay.ReplayDivergence as e:
+        print(f'tampered log detected: {e}')
+    else:
+        raise AssertionError('tampered log was not detected')
+
+
+if __name__ == '__main__':
+    main()
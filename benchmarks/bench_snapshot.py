@@ -0,0 +1,151 @@
+"""
+Cost of branching a search from a Claude 3.5 game state: copy.deepcopy of
+the game (the only option while pieces were dicts and grid rows were
+written in place) against Tetris.snapshot() / restore(). Also times a
+one-ply search that tries every rotation and column of the current piece.
+
+First checks that branching is deterministic: after snapshot(), N moves,
+restore() and the same N moves, the game spawned the same pieces and
+ended on the same board both times. For Claude 3.5 with a 7-bag source
+and with the default source on the global random module, and for the
+module-level snapshot() / restore() of DeepSeek.
+
+    python benchmarks/bench_snapshot.py
+"""
+import copy
+import random
+import time
+
+from common import load_game
+
+game = load_game('Claude3.5')
+deepseek = load_game('DeepSeek')
+
+
+def seeded_game(seed=0, steps=400):
+    random.seed(seed)
+    rng = random.Random(seed)
+    tetris = game.Tetris(headless=True)
+    for _ in range(steps):
+        tetris.step(rng.choice((game.LEFT, game.RIGHT, game.ROTATE, game.HARD_DROP)))
+        if tetris.game_over:
+            tetris.reset_game()
+    return tetris
+
+
+def branch(tetris, actions):
+    """Play actions; returns the pieces spawned along the way and the final board."""
+    spawned = []
+    for action in actions:
+        before = tetris.next_piece
+        tetris.step(action)
+        if tetris.next_piece is not before:
+            spawned.append(tetris.next_piece.shape)
+    return spawned, [row[:] for row in tetris.grid], tetris.score
+
+
+def check_branches(moves=40, branches=5):
+    """Replay the same moves from one snapshot several times; every branch must match the first."""
+    rng = random.Random(0)
+    for source in (game.BagSource(len(game.SHAPE_NAMES), preview=1, seed=1), None):
+        tetris = game.Tetris(headless=True, source=source)
+        state = tetris.snapshot()
+        actions = [rng.choice((game.LEFT, game.RIGHT, game.ROTATE, game.HARD_DROP)) for _ in range(moves)]
+        first = branch(tetris, actions)
+        for _ in range(branches - 1):
+            random.random()  # other users of the global random module between branches
+            tetris.restore(state)
+            if branch(tetris, actions) != first:
+                raise AssertionError(f'{type(tetris.source).__name__}: a restored branch spawned '
+                                     f'different pieces or ended on a different board')
+    return moves, branches
+
+
+def deepseek_branch(piece, next_piece, actions):
+    """DeepSeek's rules, one action and one gravity step per move; returns spawned pieces and the board."""
+    spawned = []
+    for action in actions:
+        if action == 'drop':
+            deepseek.drop_piece(piece)
+        elif action == 'rotate':
+            rotated = list(zip(*reversed(piece.shape)))
+            if not deepseek.check_collision(piece, shape=rotated):
+                piece.shape = rotated
+        elif not deepseek.check_collision(piece, action):
+            piece.x += action
+        if deepseek.check_collision(piece, dy=1):
+            deepseek.merge_piece(piece)
+            deepseek.clear_lines()
+            piece, next_piece = next_piece, deepseek.new_piece()
+            spawned.append(next_piece.color)
+            if deepseek.check_collision(piece):
+                break
+        else:
+            piece.y += 1
+    return spawned, [row[:] for row in deepseek.grid]
+
+
+def check_deepseek_branches(moves=40, branches=5):
+    rng = random.Random(0)
+    actions = [rng.choice((-1, 1, 'rotate', 'drop')) for _ in range(moves)]
+    piece, next_piece = deepseek.new_piece(), deepseek.new_piece()
+    state = deepseek.snapshot(piece, next_piece)
+    first = deepseek_branch(piece, next_piece, actions)
+    for _ in range(branches - 1):
+        random.random()
+        if deepseek_branch(*deepseek.restore(state), actions) != first:
+            raise AssertionError('DeepSeek: a restored branch spawned different pieces or ended on a different board')
+
+
+def per_call(run, seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            run()
+        count += 100
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def search(tetris, branch):
+    """Score every rotation and column of the current piece with a hard drop; returns branch count."""
+    piece = tetris.current_piece
+    branches = 0
+    for rotation in range(len(game.SHAPES[piece.shape])):
+        for x in range(-2, tetris.width):
+            child = branch(tetris)
+            p = child.current_piece
+            if not child.fits(p.shape, rotation, x, p.y):
+                continue
+            p.rotation, p.x = rotation, x
+            child.apply_action(game.HARD_DROP)
+            branches += 1
+    return branches
+
+
+def main():
+    moves, branches = check_branches()
+    check_deepseek_branches(moves, branches)
+    print(f'{branches} branches of {moves} moves from one snapshot (Claude 3.5, DeepSeek): '
+          f'same pieces and board every time')
+    tetris = seeded_game()
+    state = tetris.snapshot()
+
+    def restore(t):
+        t.restore(state)
+        return t
+
+    print(f'{"":<30}{"deepcopy":>12}{"snapshot":>12}')
+    copy_us = per_call(lambda: copy.deepcopy(tetris))
+    snap_us = per_call(lambda: tetris.restore(tetris.snapshot()))
+    print(f'{"branch (us)":<30}{copy_us:12.2f}{snap_us:12.2f}')
+
+    branches = search(tetris, restore)
+    tetris.restore(state)
+    copy_us = per_call(lambda: search(tetris, copy.deepcopy), seconds=2.0)
+    snap_us = per_call(lambda: search(tetris, restore), seconds=2.0)
+    print(f'{f"1-ply search, {branches} moves (us)":<30}{copy_us:12.1f}{snap_us:12.1f}')
+
+
+if __name__ == '__main__':
+    main()
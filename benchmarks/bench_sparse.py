@@ -0,0 +1,107 @@
+"""
+Per-frame cost of the Grok 3 game on large boards: the original dense
+approach (rebuild the full grid from the locked-cell dict every frame and
+check collisions against a list of every free cell) against
+sparse_board.SparseBoard, which only touches locked rows and the 10x20
+play area. A frame here is one collision check, one gravity check and
+building the play-area grid; every 10 frames a piece locks and full rows
+are cleared.
+
+    python benchmarks/bench_sparse.py
+"""
+import random
+import time
+
+from common import load_game
+
+game = load_game('Grok3')
+BLACK, GRAY = game.BLACK, game.GRAY
+
+
+def legacy_create_grid(locked, width, height):
+    grid = [[BLACK for _ in range(width)] for _ in range(height)]
+    for y in range(len(grid)):
+        for x in range(len(grid[y])):
+            if (x, y) in locked:
+                grid[y][x] = locked[(x, y)]
+    return grid
+
+
+def legacy_valid_space(cells, grid, width, height):
+    accepted_pos = [[(x, y) for x in range(width) if grid[y][x] == BLACK] for y in range(height)]
+    accepted_pos = [pos for sublist in accepted_pos for pos in sublist]
+    for pos in cells:
+        if pos not in accepted_pos and pos[1] > -1:
+            return False
+    return True
+
+
+def legacy_clear(locked, width, rows):
+    """Clear the given full rows (ascending) from the locked dict, shifting the cells above down."""
+    for row in rows:
+        for x in range(width):
+            del locked[(x, row)]
+        for (x, y) in sorted((pos for pos in locked if pos[1] < row), key=lambda pos: -pos[1]):
+            locked[(x, y + 1)] = locked.pop((x, y))
+
+
+def junk(rng, width, height, rows):
+    """Locked cells in the bottom rows, one gap per row."""
+    cells = []
+    for y in range(height - rows, height):
+        gap = rng.randrange(width)
+        cells.extend((x, y) for x in range(width) if x != gap and rng.random() < 0.7)
+    return cells
+
+
+def drops(rng, width, height, count):
+    """Piece cells to lock: a horizontal I piece just above the junk, at a random column."""
+    result = []
+    for _ in range(count):
+        x = rng.randrange(width - 4)
+        result.append([(x + i, height - 9) for i in range(4)])
+    return result
+
+
+def legacy_frames(width, height, frames, rng):
+    locked = {pos: GRAY for pos in junk(rng, width, height, 8)}
+    pieces = drops(rng, width, height, frames // 10 + 1)
+    start = time.perf_counter()
+    for i in range(frames):
+        grid = legacy_create_grid(locked, width, height)
+        cells = pieces[i // 10]
+        legacy_valid_space(cells, grid, width, height)
+        legacy_valid_space([(x, y + 1) for x, y in cells], grid, width, height)
+        if i % 10 == 9:
+            for pos in cells:
+                locked[pos] = GRAY
+            full = [y for y in range(height) if all((x, y) in locked for x in range(width))]
+            legacy_clear(locked, width, full)
+    return (time.perf_counter() - start) / frames
+
+
+def sparse_frames(width, height, frames, rng):
+    board = game.SparseBoard(width, height, BLACK)
+    board.lock(junk(rng, width, height, 8), GRAY)
+    pieces = drops(rng, width, height, frames // 10 + 1)
+    start = time.perf_counter()
+    for i in range(frames):
+        cells = pieces[i // 10]
+        board.view(max(cells[0][0] - 3, 0), max(height - 20, 0), game.VIEW_COLS, game.VIEW_ROWS)
+        board.fits(cells)
+        board.fits([(x, y + 1) for x, y in cells])
+        if i % 10 == 9:
+            board.clear_rows(board.lock(cells, GRAY))
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    print(f'{"board":<12}{"dense (us/frame)":>18}{"sparse (us/frame)":>19}{"speedup":>9}')
+    for width, height, frames in ((10, 20, 2000), (200, 200, 40), (200, 2000, 10)):
+        dense = legacy_frames(width, height, frames, random.Random(0)) * 1e6
+        sparse = sparse_frames(width, height, max(frames, 2000), random.Random(0)) * 1e6
+        print(f'{f"{width}x{height}":<12}{dense:18,.1f}{sparse:19,.1f}{dense / sparse:8,.0f}x')
+
+
+if __name__ == '__main__':
+    main()
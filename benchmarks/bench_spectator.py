@@ -0,0 +1,108 @@
+"""
+Spectator stream size and cost for TetrisByChatGPTo1 games. Plays seeded
+games with the scripted player of bench_replay.py (one gravity tick every
+30 frames, a random key press on about 2% of frames) at 60 frames per
+second, streams every frame with spectator.py and decodes it again,
+checking each decoded frame against the game. Reports bytes per second
+per game and encode/decode time per frame for:
+
+    raw          every frame as 200 RGB cells, 3 bytes each
+    keyframes    every frame a keyframe (packed cells)
+    delta        a keyframe every --keyframe-every frames, row diffs between
+    delta+zlib   the same, deflated
+
+    python benchmarks/bench_spectator.py [--games 2000] [--keyframe-every 60]
+"""
+import argparse
+import random
+import time
+
+from common import load_game
+
+game = load_game('ChatGPTo1')
+import spectator  # noqa: E402  (needs the repository root on sys.path, set up by common)
+
+COLORS = [game.BLACK] + game.SHAPE_COLORS
+FPS = 60
+MOVES = (game.MOVE_LEFT, game.MOVE_RIGHT, game.ROTATE, game.MOVE_LEFT, game.MOVE_RIGHT, game.MOVE_DOWN)
+
+
+def frames(seed, max_frames=200000):
+    """Play one game, yielding it after every frame."""
+    rng = random.Random(seed)
+    state = game.Game(seed)
+    for frame in range(max_frames):
+        if frame % 30 == 29:
+            state.gravity()
+        if rng.random() < 0.02:
+            state.move(rng.choice(MOVES))
+        # As in bench_replay.py: stop once a new piece cannot fit
+        if not state.lost and not game.valid_space(state.current_piece, state.board):
+            state.lost = True
+        yield state
+        if state.lost:
+            return
+
+
+def expected(state):
+    piece = state.current_piece
+    return (state.grid, state.score, state.lost,
+            (piece.shape_id, piece.rotation % len(piece.shape), piece.x, piece.y))
+
+
+class Mode:
+    def __init__(self, name, keyframe_every, compress):
+        self.name = name
+        self.keyframe_every = keyframe_every
+        self.compress = compress
+        self.bytes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def run(self, states):
+        """Stream one game, checking every decoded frame. Returns the number of frames."""
+        encoder = spectator.StreamEncoder(COLORS, self.keyframe_every, self.compress)
+        decoder = spectator.StreamDecoder(COLORS)
+        clock = time.perf_counter
+        count = 0
+        for state in states:
+            start = clock()
+            packet = encoder.encode(state)
+            middle = clock()
+            frame = decoder.decode(packet)
+            self.decode_seconds += clock() - middle
+            self.encode_seconds += middle - start
+            self.bytes += len(packet)
+            count += 1
+            if (frame.grid, frame.score, frame.lost, frame.piece) != expected(state):
+                raise AssertionError(f'{self.name}: frame {count} decoded differently')
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--keyframe-every', type=int, default=60)
+    args = parser.parse_args()
+
+    modes = [Mode('keyframes', 0, False), Mode('delta', args.keyframe_every, False),
+             Mode('delta+zlib', args.keyframe_every, True)]
+    total = 0
+    for seed in range(args.games):
+        for mode in modes:
+            count = mode.run(frames(seed))
+        total += count
+    seconds = total / FPS
+
+    print(f'{args.games} games, {total:,} frames ({seconds / args.games:.0f} s of play per game at {FPS} fps), '
+          f'all decoded frames match')
+    print(f'{"stream":<12}{"bytes/frame":>12}{"kB/s per game":>15}{"encode us":>11}{"decode us":>11}')
+    raw = game.GRID_WIDTH * game.GRID_HEIGHT * 3
+    print(f'{"raw":<12}{raw:12.1f}{raw * FPS / 1000:15.2f}')
+    for mode in modes:
+        print(f'{mode.name:<12}{mode.bytes / total:12.1f}{mode.bytes / seconds / 1000:15.2f}'
+              f'{mode.encode_seconds / total * 1e6:11.2f}{mode.decode_seconds / total * 1e6:11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Time to draw one frame of a 10x20 board: a pygame.draw.rect per cell (with
+and without the per-cell outline rect some implementations add) against
+block_sprites.BlockAtlas, which blits pre-rendered sprites in one batch.
+
+    python benchmarks/bench_sprites.py
+"""
+import random
+import time
+
+import common  # noqa: F401  (sets the SDL dummy drivers, puts the repository root on sys.path)
+import pygame
+
+from block_sprites import BlockAtlas
+
+WIDTH, HEIGHT, BLOCK_SIZE = 10, 20, 30
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+COLORS = [(0, 255, 255), (255, 255, 0), (255, 0, 255), (255, 165, 0),
+          (0, 0, 255), (0, 255, 0), (255, 0, 0)]
+
+
+def boards(count, seed=0):
+    """Seeded boards, about half full, bottom-heavy like a game in progress."""
+    rng = random.Random(seed)
+    return [[[rng.choice(COLORS) if rng.random() < y / HEIGHT else BLACK for _ in range(WIDTH)]
+             for y in range(HEIGHT)] for _ in range(count)]
+
+
+def draw_rects(surface, grid):
+    for y, row in enumerate(grid):
+        for x, color in enumerate(row):
+            pygame.draw.rect(surface, color, (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE))
+
+
+def draw_rects_outlined(surface, grid):
+    for y, row in enumerate(grid):
+        for x, color in enumerate(row):
+            rect = (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE)
+            pygame.draw.rect(surface, color, rect)
+            pygame.draw.rect(surface, WHITE, rect, 1)
+
+
+def per_frame(draw, surface, grids, repeat=20):
+    """Median microseconds per frame over repeat passes through grids."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for grid in grids:
+            draw(surface, grid)
+        times.append((time.perf_counter() - start) / len(grids))
+    return sorted(times)[len(times) // 2] * 1e6
+
+
+def main():
+    pygame.init()
+    surface = pygame.display.set_mode((WIDTH * BLOCK_SIZE, HEIGHT * BLOCK_SIZE))
+    plain = BlockAtlas(BLOCK_SIZE, empty=BLACK)
+    outlined = BlockAtlas(BLOCK_SIZE, outline=WHITE, empty=BLACK)
+    grids = boards(50)
+
+    cases = [
+        ('draw.rect per cell', draw_rects),
+        ('atlas, empty cells skipped', plain.blit_grid),
+        ('draw.rect + outline per cell', draw_rects_outlined),
+        ('atlas with outline, all cells', lambda s, g: outlined.blit_grid(s, g, skip_empty=False)),
+    ]
+    print(f'blit call: {"fblits" if hasattr(surface, "fblits") else "blits"}')
+    for name, draw in cases:
+        print(f'{name:<32}{per_frame(draw, surface, grids):10.1f} us/frame')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
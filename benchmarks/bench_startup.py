@@ -0,0 +1,130 @@
+"""
+Startup cost of every implementation, split into import time (defining the
+rules and data) and time to first frame (initializing pygame or turtle,
+opening the window and drawing one frame of a new game). Each measurement
+runs in a fresh interpreter so nothing is cached between games; `import
+pygame` itself is timed separately and not counted in either column.
+ChatGPT 4o, o1 and Claude 3.5 still call pygame.init() when imported, so
+their import column includes it.
+
+    python benchmarks/bench_startup.py [--repeat 5]
+
+The DeepSeek 8B turtle frame needs a display (Tk); without one it is
+reported as unavailable.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import GAMES, load_game
+
+
+def first_frame_chatgpt4o(game):
+    screen = game.pygame.display.set_mode((game.WIDTH + 150, game.HEIGHT))
+    grid = game.create_grid({})
+    piece = game.Tetromino(game.SHAPES[0], game.COLORS[0])
+    game.BACKGROUND.blit(screen)
+    game.draw_grid(screen, grid)
+    game.draw_next_tetromino(screen, piece)
+    game.draw_tetromino(screen, piece, (piece.x * game.GRID_SIZE, piece.y * game.GRID_SIZE))
+    game.pygame.display.update()
+
+
+def first_frame_chatgpto1(game):
+    screen = game.pygame.display.set_mode((game.SCREEN_WIDTH, game.SCREEN_HEIGHT))
+    game.draw_window(screen, game.create_grid(), 0, game.Piece(5, 0, game.get_shape()))
+    game.pygame.display.update()
+
+
+def first_frame_claude(game):
+    game.Tetris().draw()
+
+
+def first_frame_deepseek(game):
+    piece, next_piece = game.new_piece(), game.new_piece()
+    game.draw_grid()
+    game.draw_ghost(piece)
+    game.draw_piece(piece)
+    game.draw_next_piece(next_piece)
+    game.pygame.display.update()
+
+
+def first_frame_deepseek8b(game):
+    game.draw()
+
+
+def first_frame_gemini(game):
+    game.draw_grid()
+    game.draw_tetromino(game.Tetromino())
+    game.pygame.display.flip()
+
+
+def first_frame_grok3(game):
+    board = game.SparseBoard(game.GRID_WIDTH, game.GRID_HEIGHT, game.BLACK)
+    game.DirtyRenderer(game.WINDOW.get(), board).draw(game.Piece(game.GRID_WIDTH // 2, 0), 0)
+
+
+FIRST_FRAME = {
+    'ChatGPT4o': first_frame_chatgpt4o,
+    'ChatGPTo1': first_frame_chatgpto1,
+    'Claude3.5': first_frame_claude,
+    'DeepSeek': first_frame_deepseek,
+    'DeepSeek8B': first_frame_deepseek8b,
+    'Gemini': first_frame_gemini,
+    'Grok3': first_frame_grok3,
+}
+
+
+def child(name):
+    """Time one cold start of name in this (fresh) interpreter and print it as JSON."""
+    start = time.perf_counter()
+    import pygame  # noqa: F401
+    pygame_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    game = load_game(name)
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        FIRST_FRAME[name](game)
+        frame_s = time.perf_counter() - start
+    except Exception as e:  # turtle without a display
+        frame_s = None
+        print(f'{name}: no first frame: {type(e).__name__}: {e}', file=sys.stderr)
+    print(json.dumps({'pygame': pygame_s, 'import': import_s, 'first_frame': frame_s}))
+
+
+def cold_start(name):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', name],
+                         capture_output=True, text=True, check=True, timeout=60)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    print(f'{"implementation":<16}{"import (ms)":>13}{"first frame (ms)":>18}')
+    pygame_times = []
+    for name in GAMES:
+        runs = [cold_start(name) for _ in range(args.repeat)]
+        pygame_times.extend(run['pygame'] for run in runs)
+        import_ms = statistics.median(run['import'] for run in runs) * 1e3
+        frames = [run['first_frame'] for run in runs if run['first_frame'] is not None]
+        frame = f'{statistics.median(frames) * 1e3:18.1f}' if frames else f'{"unavailable":>18}'
+        print(f'{name:<16}{import_ms:13.1f}{frame}')
+    print(f'(import pygame: {statistics.median(pygame_times) * 1e3:.1f} ms, not included above)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+"""
+Micro-benchmarks of the hot paths of every TetrisBy*.py implementation on
+identical seeded board states: collision checks, line clearing, grid
+building and rotation.
+
+    python benchmarks/bench_suite.py [--ops 5000] [--seed 0] [--json results.json]
+
+For each operation the table reports ops/sec, the peak number of bytes
+allocated by a single call (tracemalloc) and p50/p99 latency. Modules that
+run their game loop at import time are reported as skipped, and operations
+that raise on the seeded boards are reported as errors.
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from common import GAMES, load_game, runs_at_import
+
+OPERATIONS = ['collision', 'clear', 'create_grid', 'rotate']
+
+
+# --------------------------
+#      SEEDED BOARDS
+# --------------------------
+
+def junk_cells(rng, width, height, rows=8, density=0.7):
+    """Random occupied cells in the bottom rows; no row is completely full."""
+    cells = set()
+    for y in range(height - rows, height):
+        row = [x for x in range(width) if rng.random() < density]
+        cells.update((x, y) for x in row[:width - 1])
+    return cells
+
+
+def clear_cells(rng, width, height, full_rows=4):
+    """Junk with the bottom full_rows rows completely filled."""
+    cells = junk_cells(rng, width, height - full_rows, rows=4)
+    for y in range(height - full_rows, height):
+        cells.update((x, y) for x in range(width))
+    return cells
+
+
+def poses(rng, width, height, count):
+    """(shape index, rotation count, x, y) tuples used to place test pieces."""
+    return [(rng.randrange(7), rng.randrange(4), rng.randrange(width - 3), rng.randrange(height - 4))
+            for _ in range(count)]
+
+
+def to_grid(cells, width, height, empty, fill):
+    grid = [[empty for _ in range(width)] for _ in range(height)]
+    for x, y in cells:
+        grid[y][x] = fill
+    return grid
+
+
+# --------------------------
+#        ADAPTERS
+# --------------------------
+# Each adapter returns {operation: (setup, run)}. setup(i) builds the
+# arguments for the i-th call outside the timed region; run(*args) is timed.
+
+def adapt_chatgpt4o(game, rng):
+    w, h = game.COLS, game.ROWS
+    locked = {pos: game.COLORS[0] for pos in junk_cells(rng, w, h)}
+    full = {pos: game.COLORS[0] for pos in clear_cells(rng, w, h)}
+    grid = game.create_grid(locked)
+
+    def piece(shape, rotations, x, y):
+        t = game.Tetromino(game.SHAPES[shape], game.COLORS[shape])
+        for _ in range(rotations):
+            t.rotate()
+        t.x, t.y = x, y
+        return t
+
+    pieces = [piece(*pose) for pose in poses(rng, w, h, 256)]
+    return {
+        'collision': (lambda i: (pieces[i % 256], grid), game.valid_space),
+        'clear': (lambda i: (game.create_grid(full), dict(full)), game.clear_lines),
+        'create_grid': (lambda i: (locked,), game.create_grid),
+        'rotate': (lambda i: (pieces[i % 256],), lambda t: t.rotate()),
+    }
+
+
+def adapt_chatgpto1(game, rng):
+    w, h = game.GRID_WIDTH, game.GRID_HEIGHT
+    locked = {pos: game.GRAY for pos in junk_cells(rng, w, h)}
+    full = {pos: game.GRAY for pos in clear_cells(rng, w, h)}
+    board = game.Bitboard.from_locked(locked)
+
+    def piece(shape, rotations, x, y):
+        p = game.Piece(x, y, game.SHAPES[shape])
+        p.rotation = rotations % len(p.shape)
+        return p
+
+    def rotate(p):
+        p.rotation = (p.rotation + 1) % len(p.shape)
+
+    pieces = [piece(*pose) for pose in poses(rng, w, h, 256)]
+    return {
+        'collision': (lambda i: (pieces[i % 256], board), game.valid_space),
+        'clear': (lambda i: (game.Bitboard.from_locked(full), dict(full)), game.clear_rows),
+        'create_grid': (lambda i: (locked,), game.create_grid),
+        'rotate': (lambda i: (pieces[i % 256],), rotate),
+    }
+
+
+def adapt_claude(game, rng):
+    w, h = game.GRID_WIDTH, game.GRID_HEIGHT
+    shapes = list(game.SHAPES)
+    tetris = game.Tetris(headless=True)
+    tetris.grid = to_grid(junk_cells(rng, w, h), w, h, game.BLACK, game.RED)
+    full = to_grid(clear_cells(rng, w, h), w, h, game.BLACK, game.RED)
+    pieces = [game.Piece(shapes[s], r, x, y) for s, r, x, y in poses(rng, w, h, 256)]
+
+    def clear(t):
+        t.clear_lines()
+
+    def rotate(p):
+        new_piece = p.copy()
+        new_piece.rotation = (new_piece.rotation + 1) % len(game.SHAPES[new_piece.shape])
+
+    def clear_setup(i):
+        t = game.Tetris(headless=True)
+        t.set_grid([row[:] for row in full])
+        return (t,)
+
+    return {
+        'collision': (lambda i: (pieces[i % 256],), tetris.valid_move),
+        'clear': (clear_setup, clear),
+        'rotate': (lambda i: (pieces[i % 256],), rotate),
+    }
+
+
+def adapt_deepseek(game, rng):
+    w, h = len(game.grid[0]), len(game.grid)
+    board = to_grid(junk_cells(rng, w, h), w, h, 0, 1)
+    full = to_grid(clear_cells(rng, w, h), w, h, 0, 1)
+
+    def piece(shape, rotations, x, y):
+        cells = game.SHAPES[shape]
+        for _ in range(rotations):
+            cells = list(zip(*reversed(cells)))
+        return game.Piece(cells, shape + 1, x, y)
+
+    def collision_setup(i):
+        game.grid[:] = board
+        return (pieces[i % 256],)
+
+    def clear_setup(i):
+        game.grid[:] = [row[:] for row in full]
+        return ()
+
+    pieces = [piece(*pose) for pose in poses(rng, w, h, 256)]
+    return {
+        'collision': (collision_setup, game.check_collision),
+        'clear': (clear_setup, game.clear_lines),
+        'rotate': (lambda i: (pieces[i % 256],), lambda p: list(zip(*reversed(p.shape)))),
+    }
+
+
+def adapt_deepseek8b(game, rng):
+    w, h = game.BOARD_WIDTH, game.BOARD_HEIGHT
+    board = to_grid(junk_cells(rng, w, h), w, h, 0, 1)
+    full = to_grid(clear_cells(rng, w, h), w, h, 0, 1)
+
+    def collision_setup(i):
+        game.board[:] = board
+        return (pieces[i % 256],)
+
+    def clear_setup(i):
+        game.board[:] = [row[:] for row in full]
+        return ()
+
+    def rotate_setup(i):
+        game.board[:] = board
+        p = pieces[i % 256]
+        return ({'type': p['type'], 'shape': p['shape'], 'position': [0, 0], 'color': p['color']},)
+
+    pieces = []
+    for s, _, x, y in poses(rng, w, h, 256):
+        p = game.create_piece(s + 1)
+        p['position'] = [x, y]
+        pieces.append(p)
+    return {
+        'collision': (collision_setup, game.get_collision),
+        'clear': (clear_setup, game.clear_lines),
+        'rotate': (rotate_setup, game.rotate_piece),
+    }
+
+
+def adapt_gemini(game, rng):
+    w, h = game.grid_width, game.grid_height
+    board = to_grid(junk_cells(rng, w, h), w, h, 0, game.RED)
+    full = to_grid(clear_cells(rng, w, h), w, h, 0, game.RED)
+
+    def piece(shape, rotations, x, y):
+        t = game.Tetromino()
+        t.shape_id = shape
+        t.shape = game.shapes[shape]
+        t.rotation = rotations % len(t.shape)
+        t.x, t.y = x, y
+        return t
+
+    def collision_setup(i):
+        game.grid[:] = board
+        t = pieces[i % 256]
+        return (t, t.rotation)
+
+    def clear_setup(i):
+        game.grid[:] = [row[:] for row in full]
+        return ()
+
+    def rotate_setup(i):
+        game.grid[:] = board
+        return (pieces[i % 256],)
+
+    pieces = [piece(*pose) for pose in poses(rng, w, h, 256)]
+    return {
+        'collision': (collision_setup, lambda t, rotation: t.valid_move(0, 0, rotation)),
+        'clear': (clear_setup, game.clear_lines),
+        'rotate': (rotate_setup, lambda t: t.rotate()),
+    }
+
+
+def adapt_grok3(game, rng):
+    w, h = game.GRID_WIDTH, game.GRID_HEIGHT
+
+    def board(cells):
+        b = game.SparseBoard(w, h, game.BLACK)
+        b.lock(sorted(cells), game.GRAY)
+        return b
+
+    def piece(shape, rotations, x, y):
+        p = game.Piece(x + 2, y + 4)
+        p.shape_id = shape
+        p.shape = game.SHAPES[shape]
+        p.color = game.SHAPE_COLORS[shape]
+        p.rotation = rotations % len(p.shape)
+        return p
+
+    junk = board(junk_cells(rng, w, h))
+    full = clear_cells(rng, w, h)
+    pieces = [piece(*pose) for pose in poses(rng, w, h, 256)]
+    return {
+        'collision': (lambda i: (pieces[i % 256], junk), game.valid_space),
+        'clear': (lambda i: (board(full),), lambda b: b.clear_rows(b.full_rows())),
+        'create_grid': (lambda i: (junk,), lambda b: b.view(0, 0, w, h)),
+        'rotate': (lambda i: (pieces[i % 256],), lambda p: p.rotate()),
+    }
+
+
+ADAPTERS = {
+    'ChatGPT4o': adapt_chatgpt4o,
+    'ChatGPTo1': adapt_chatgpto1,
+    'Claude3.5': adapt_claude,
+    'DeepSeek': adapt_deepseek,
+    'DeepSeek8B': adapt_deepseek8b,
+    'Gemini': adapt_gemini,
+    'Grok3': adapt_grok3,
+}
+
+
+# --------------------------
+#        MEASURING
+# --------------------------
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(setup, run, ops):
+    """Time ops calls individually, then measure the peak allocation of one call."""
+    latencies = []
+    perf_counter_ns = time.perf_counter_ns
+    for i in range(ops):
+        args = setup(i)
+        start = perf_counter_ns()
+        run(*args)
+        latencies.append(perf_counter_ns() - start)
+
+    peaks = []
+    tracemalloc.start()
+    for i in range(min(ops, 200)):
+        args = setup(i)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        run(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'ops_per_sec': ops * 1e9 / max(1, sum(latencies)),
+        'alloc_bytes': sum(peaks) / len(peaks),
+        'p50_us': percentile(latencies, 0.50) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+    }
+
+
+def run_suite(ops=5000, seed=0):
+    results = {}
+    for name in GAMES:
+        if runs_at_import(name):
+            results[name] = {'skipped': 'runs its game loop at import time'}
+            continue
+        random.seed(seed)
+        game = load_game(name)
+        cases = ADAPTERS[name](game, random.Random(seed))
+        results[name] = {}
+        for op in OPERATIONS:
+            if op not in cases:
+                continue
+            try:
+                results[name][op] = measure(*cases[op], ops)
+            except Exception as e:  # some implementations have bugs on these boards
+                results[name][op] = {'error': f'{type(e).__name__}: {e}'}
+    return results
+
+
+def print_table(results):
+    print(f'{"implementation":<16}{"operation":<13}{"ops/sec":>13}{"alloc B":>10}{"p50 us":>9}{"p99 us":>9}')
+    for name, ops in results.items():
+        if 'skipped' in ops:
+            print(f'{name:<16}skipped: {ops["skipped"]}')
+            continue
+        for op, r in ops.items():
+            if 'error' in r:
+                print(f'{name:<16}{op:<13}error: {r["error"]}')
+                continue
+            print(f'{name:<16}{op:<13}{r["ops_per_sec"]:>13,.0f}{r["alloc_bytes"]:>10,.0f}'
+                  f'{r["p50_us"]:>9.2f}{r["p99_us"]:>9.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--ops', type=int, default=5000, help='calls per operation')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    results = run_suite(args.ops, args.seed)
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'ops': args.ops, 'seed': args.seed, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+CPU use and gravity timing of the old game loop (pygame Clock.tick() with no
+frame cap, gravity from get_rawtime() with the remainder thrown away)
+against timestep.FixedTimestep.
+
+Each loop runs for a few seconds idle (no input, nothing to draw but
+gravity) and then under load (every frame does 0-30 ms of work), with a
+gravity step every 50 ms.
+
+    python benchmarks/bench_timestep.py
+"""
+import random
+import time
+
+import common  # noqa: F401  (sets the SDL dummy drivers, puts the repository root on sys.path)
+import pygame
+
+from timestep import FixedTimestep
+
+STEP_SECONDS = 0.05
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def old_loop(seconds, max_work, rng):
+    clock = pygame.time.Clock()
+    fall_time = steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fall_time += clock.get_rawtime()
+        clock.tick()
+        if fall_time / 1000 >= STEP_SECONDS:
+            fall_time = 0
+            steps += 1
+        busy(rng.uniform(0, max_work))
+    return steps
+
+
+def fixed_loop(seconds, max_work, rng):
+    timestep = FixedTimestep(STEP_SECONDS)
+    steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        changed = False
+        for _ in range(timestep.steps()):
+            changed = True
+            steps += 1
+        if timestep.frame_due(changed):
+            busy(rng.uniform(0, max_work))
+        timestep.wait()
+    return steps
+
+
+def measure(loop, seconds, max_work):
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    steps = loop(seconds, max_work, random.Random(0))
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return 100 * cpu / wall, steps, wall / STEP_SECONDS
+
+
+def main(seconds=3.0):
+    pygame.init()
+    print(f'{"loop":<12}{"load":<8}{"cpu %":>8}{"gravity steps":>16}{"expected":>10}')
+    for max_work, load in ((0, 'idle'), (0.03, 'loaded')):
+        for name, loop in (('old', old_loop), ('fixed', fixed_loop)):
+            cpu, steps, expected = measure(loop, seconds, max_work)
+            print(f'{name:<12}{load:<8}{cpu:8.1f}{steps:16d}{expected:10.0f}')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
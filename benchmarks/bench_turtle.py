@@ -0,0 +1,107 @@
+"""
+Frames per second of the DeepSeek 8B turtle board: the original full redraw
+(turtle.clear() and a goto/forward/left/fill square per cell, with live
+screen updates) against turtle_renderer.CellRenderer. Both draw the same
+sequence of boards, in the world coordinates the game sets up, and every
+frame is timed, including the renderer's first one, which stamps every
+cell.
+
+Needs a display (turtle opens a Tk window).
+
+    python benchmarks/bench_turtle.py [--frames 100]
+"""
+import argparse
+import random
+import time
+import tkinter
+import turtle
+
+import common  # noqa: F401  (puts the repository root on sys.path)
+from turtle_renderer import CellRenderer
+
+WIDTH, HEIGHT = 14, 20  # TetrisByDeepSeek8B's board
+WORLD = (-1.5, -1.5, 14.5, 20.5)  # its setworldcoordinates(), one unit per cell
+CELL_PIXELS = min(600 / (WORLD[2] - WORLD[0]), 800 / (WORLD[3] - WORLD[1]))
+SQUARE = 0.9  # side of a drawn cell in world units, as CellRenderer stamps it
+COLORS = {0: (0, 0, 0), 1: (0, 0, 255), 2: (0, 255, 0), 3: (255, 0, 0), 4: (255, 255, 0),
+          5: (255, 165, 0), 6: (0, 255, 255), 7: (255, 0, 255)}
+
+
+def legacy_draw_block(x, y, color):
+    # The original drew at pixel offsets (x * 30 + 1.5), which lie outside
+    # the game's world coordinates; the same moves here draw the square where
+    # the renderer stamps it
+    turtle.penup()
+    turtle.goto(x + (1 - SQUARE) / 2, y + (1 - SQUARE) / 2)
+    if color != COLORS[0]:
+        turtle.color(color)
+        turtle.begin_fill()
+    turtle.pendown()
+    for _ in range(4):
+        turtle.forward(SQUARE)
+        turtle.left(90)
+    if color != COLORS[0]:
+        turtle.end_fill()
+
+
+def legacy_draw(board):
+    turtle.clear()
+    for y in range(len(board)):
+        for x in range(len(board[y])):
+            legacy_draw_block(x, len(board) - y - 1, COLORS[board[y][x]])
+
+
+def frames(rng, count):
+    """Boards where a 4-cell piece moves one row down per frame over some junk."""
+    board = [[0] * WIDTH for _ in range(HEIGHT)]
+    for y in range(HEIGHT - 6, HEIGHT):
+        for x in range(WIDTH):
+            if rng.random() < 0.6:
+                board[y][x] = rng.randrange(1, 8)
+    result = []
+    for i in range(count):
+        frame = [row[:] for row in board]
+        x, y = rng.randrange(WIDTH - 2), i % (HEIGHT - 8)
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            frame[y + dy][x + dx] = 7
+        result.append(frame)
+    return result
+
+
+def fps(draw, boards):
+    start = time.perf_counter()
+    for board in boards:
+        draw(board)
+    return len(boards) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100)
+    args = parser.parse_args()
+
+    try:
+        screen = turtle.Screen()
+    except tkinter.TclError as e:
+        print(f'no display available: {e}')
+        return
+    screen.setup(600, 800)
+    screen.setworldcoordinates(*WORLD)
+    screen.colormode(255)
+    turtle.speed(0)
+    turtle.delay(0)
+    boards = frames(random.Random(0), args.frames)
+
+    before = fps(legacy_draw, boards)
+    turtle.clear()
+
+    # Turns off automatic screen updates, so it is created after the full redraw has run
+    renderer = CellRenderer(screen, WIDTH, HEIGHT, COLORS, CELL_PIXELS)
+    after = fps(renderer.render, boards)
+    print(f'{len(boards)} frames each')
+    print(f'full redraw:        {before:10.2f} frames/sec')
+    print(f'retained renderer:  {after:10.2f} frames/sec '
+          f'({renderer.cells_drawn / len(boards):.1f} cells re-stamped per frame)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Load test for versus.py over localhost. The server runs in its own process;
+this one runs the simulated clients, which connect in pairs, send a random
+input every --input-ms (on average) and start a new match whenever one
+ends. Reports matches served, frames and bytes received, server CPU time
+and input latency: the time from sending an input to the first frame of
+the player's board that acknowledges it (at most one server tick plus the
+round trip and the time this process takes to get to the frame).
+
+Before the load test, a few matches are played against a server in this
+process, and after every frame both clients' copies of the board are
+compared with the server's game as it was when the frame was sent. Then
+one player leaves a match midway, and the other must win and the server
+must close both connections.
+
+    python benchmarks/bench_versus.py [--clients 200] [--seconds 20] [--input-ms 50] [--tick-rate 60]
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import deque
+
+from common import ROOT
+import versus
+
+# Mostly moves, with a hard drop now and then, so games last a few dozen pieces
+ACTIONS = [versus.LEFT, versus.RIGHT, versus.ROTATE, versus.DOWN] * 2 + [versus.HARD_DROP]
+
+
+class Stats:
+    def __init__(self):
+        self.matches = 0
+        self.frames = 0
+        self.bytes = 0
+        self.latencies = []
+
+
+def acked(sequence, ack):
+    """True if ack is at or after sequence, allowing for wrap-around."""
+    return (ack - sequence) & 0xFFFF < 0x8000
+
+
+def board_state(game):
+    piece = game.current_piece
+    return ([row[:] for row in game.grid], game.score, game.game_over,
+            (versus.SHAPE_CODES[piece.shape], piece.rotation, piece.x, piece.y))
+
+
+def view_state(view):
+    return view.colors(), view.score, view.game_over, view.piece
+
+
+async def play(port, rng, input_seconds, stats, deadline, expected=None):
+    """
+    Play matches until the deadline (at least one). With expected, a dict of
+    (board, tick) -> state, check the board after every frame. Returns the
+    number of frames that did not match.
+    """
+    mismatches = 0
+    while True:
+        client = versus.VersusClient()
+        try:
+            # No one joins after the deadline, so the last player to connect may wait alone
+            await asyncio.wait_for(client.connect('127.0.0.1', port), max(deadline - time.perf_counter(), 0) + 1)
+        except asyncio.TimeoutError:
+            await client.close()
+            return mismatches
+        pending = deque()  # (sequence, time sent)
+
+        async def send_inputs():
+            while True:
+                await asyncio.sleep(input_seconds * (0.5 + rng.random()))
+                pending.append((client.send(rng.choice(ACTIONS)), time.perf_counter()))
+
+        sender = asyncio.ensure_future(send_inputs())
+        try:
+            while True:
+                board = await client.receive()
+                if board is None:
+                    break
+                stats.frames += 1
+                view = client.boards[board]
+                if board == client.seat:
+                    now = time.perf_counter()
+                    while pending and acked(pending[0][0], view.ack):
+                        stats.latencies.append(now - pending.popleft()[1])
+                if expected is not None and view_state(view) != expected[board, view.tick]:
+                    mismatches += 1
+        finally:
+            sender.cancel()
+            stats.bytes += client.received
+            await client.close()
+        if client.seat == 0 and client.winner is not None:
+            stats.matches += 1
+        if time.perf_counter() >= deadline:
+            return mismatches
+
+
+async def check(matches=5):
+    """
+    Play matches one at a time against a server in this process. The state
+    of each board is recorded whenever the server sends a frame for it, and
+    both clients compare their copy after every frame. Returns (frames
+    checked, mismatches).
+    """
+    server = versus.VersusServer(tick_rate=200, seed=0)
+    port = await server.start()
+    expected = {}
+    frame = versus.Seat.frame
+
+    def recording_frame(seat, board, tick):
+        message = frame(seat, board, tick)
+        if message is not None:
+            expected[board, tick] = board_state(seat.game)
+        return message
+
+    versus.Seat.frame = recording_frame
+    stats = Stats()
+    mismatches = 0
+    try:
+        for i in range(matches):
+            expected.clear()
+            results = await asyncio.gather(*(play(port, random.Random(2 * i + seat), 0.005, stats, 0, expected)
+                                             for seat in range(2)))
+            mismatches += sum(results)
+    finally:
+        versus.Seat.frame = frame
+        await server.close()
+    return stats.frames, stats.matches, mismatches
+
+
+async def check_disconnect():
+    """
+    One player leaves mid-match. The other must be told they won, and the
+    server must close both connections, the leaver's included. Returns
+    True if it did.
+    """
+    server = versus.VersusServer(tick_rate=200, seed=0)
+    port = await server.start()
+    writers = []
+    init = versus.Seat.__init__
+
+    def recording_init(seat, writer):
+        init(seat, writer)
+        writers.append(writer)
+
+    versus.Seat.__init__ = recording_init
+    try:
+        clients = [versus.VersusClient() for _ in range(2)]
+        await asyncio.gather(*(client.connect('127.0.0.1', port) for client in clients))
+        stayer, leaver = sorted(clients, key=lambda client: client.seat)
+        await stayer.receive()
+        await leaver.close()
+        while await stayer.receive() is not None:
+            pass
+        await stayer.close()
+        for _ in range(100):
+            if all(writer.transport.is_closing() for writer in writers):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        versus.Seat.__init__ = init
+        await server.close()
+    return stayer.winner == stayer.seat and all(writer.transport.is_closing() for writer in writers)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def load(port, clients, seconds, input_seconds):
+    stats = Stats()
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(play(port, random.Random(i), input_seconds, stats, deadline) for i in range(clients)))
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=200, help='simulated players (two per match)')
+    parser.add_argument('--seconds', type=float, default=20, help='time after which no new match is started')
+    parser.add_argument('--input-ms', type=float, default=50, help='average time between inputs of a player')
+    parser.add_argument('--tick-rate', type=int, default=60)
+    args = parser.parse_args()
+
+    frames, matches, mismatches = asyncio.run(check())
+    print(f'check: {matches} matches, {frames} frames, {mismatches} mismatches')
+    if mismatches:
+        sys.exit(1)
+    if not asyncio.run(check_disconnect()):
+        print('check: a player who left mid-match was not closed, or the other player did not win')
+        sys.exit(1)
+    print('check: a player leaving mid-match loses, and the server closes both connections')
+
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'versus.py'), '--port', '0',
+                               '--tick-rate', str(args.tick_rate)], stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(server.stdout.readline().rsplit(':', 1)[1])
+        stats, elapsed = asyncio.run(load(port, args.clients, args.seconds, args.input_ms / 1000))
+    finally:
+        server.terminate()
+        server.wait()
+    server_cpu = resource.getrusage(resource.RUSAGE_CHILDREN)
+    latencies = sorted(stats.latencies)
+    ms = [percentile(latencies, fraction) * 1000 for fraction in (0.5, 0.9, 0.99)] + [latencies[-1] * 1000]
+
+    print(f'{args.clients} clients, {args.tick_rate} ticks/sec, {elapsed:.1f} s')
+    print(f'matches served: {stats.matches} ({stats.matches / elapsed:.1f}/sec)')
+    print(f'frames: {stats.frames / elapsed:,.0f}/sec, {stats.bytes / stats.frames:.1f} bytes each, '
+          f'{stats.bytes / elapsed / args.clients / 1000:.1f} kB/sec per client')
+    print(f'server CPU: {(server_cpu.ru_utime + server_cpu.ru_stime) / elapsed:.0%} of a core')
+    print(f'input latency over {len(latencies):,} inputs (ms): '
+          f'p50 {ms[0]:.1f}  p90 {ms[1]:.1f}  p99 {ms[2]:.1f}  max {ms[3]:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Helpers shared by the benchmark scripts."""
+import ast
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The games import shared helpers (shape_tables.py, ...) from the repository root
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+GAMES = ['ChatGPT4o', 'ChatGPTo1', 'Claude3.5', 'DeepSeek', 'DeepSeek8B', 'Gemini', 'Grok3']
+
+# Never open a real window or audio device while benchmarking
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+
+def load_game(name):
+    """
+    Import TetrisBy<name>.py by file path (some file names contain dots,
+    e.g. TetrisByClaude3.5.py, so a plain import does not work).
+    """
+    module_name = 'TetrisBy' + name.replace('.', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, game_path(name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def game_path(name):
+    return os.path.join(ROOT, 'TetrisBy' + name + '.py')
+
+
+def runs_at_import(name):
+    """
+    Return True if the module runs a game loop at import time (a top-level
+    ``while``), in which case importing it would never return.
+    """
+    with open(game_path(name)) as f:
+        tree = ast.parse(f.read())
+    return any(isinstance(node, ast.While) for node in tree.body)
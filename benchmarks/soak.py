@@ -0,0 +1,348 @@
+"""
+Long-run soak test for memory growth. Runs each implementation's own game
+loop headless (SDL dummy driver, so frames are still drawn) for many
+frames, with scripted input: a seeded random key every few frames, and a
+new game whenever one ends.
+
+The loops are not copied here. While a game runs, pygame.event.get() hands
+it the scripted events and counts frames (every loop calls it once per
+iteration), and the game's clocks (pygame.time.Clock, get_ticks and
+timestep.py's time source) follow a simulated time that advances one frame
+per call, so gravity falls at the game's own speed without real sleeping.
+When the frames run out, or a game sits on its game-over screen, the
+script sends QUIT, as closing the window would.
+
+After a warm-up of --warm-up frames (by default half the run, at most
+50,000), and every --sample-every frames after that, it records the memory
+traced by tracemalloc and the process RSS. The warm-up fills caches such
+as fonts, sprites and static layers, and buffers that pygame and SDL fill
+over the first few thousand frames behind calls such as
+pygame.display.update(). Traced memory leaves out allocations made inside
+pygame, SDL and the standard library (their font lists, module caches and
+so on); what the games allocate themselves is still counted at the game's
+own line. The growth rate is the least-squares slope of traced memory over
+frames from the first sample on. At the end it lists the source lines
+whose allocations grew the most since the warm-up.
+
+    python benchmarks/soak.py [--games Grok3 Claude3.5] [--frames 1000000]
+                              [--sample-every 50000] [--warm-up FRAMES]
+                              [--max-growth 1.0]
+
+A game fails if it grows by more than --max-growth bytes per frame or
+raises; the exit status is 1 if any game failed. Each game runs in its own
+interpreter. Games with a known bug that ends every run (KNOWN_BUGS) are
+skipped and do not affect the exit status, so a failure is always a new
+one.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import sysconfig
+import time
+import tracemalloc
+
+from common import GAMES, ROOT, load_game
+import timestep
+
+INPUT_EVERY = 4  # frames between scripted key presses
+# Simulated time per frame: a 60 fps frame, rounded up so the games' 60 fps frame caps never hold one back
+FRAME_SECONDS = 0.017
+
+ARROWS = ['K_LEFT', 'K_RIGHT', 'K_UP', 'K_DOWN']
+
+KNOWN_BUGS = {
+    'DeepSeek8B': 'lock_piece() writes below the board (IndexError) when the first piece lands',
+}
+
+
+# --------------------------
+#          SCRIPT
+# --------------------------
+
+class Script:
+    """
+    The event queue and clock a game's loop sees during the soak. events()
+    replaces pygame.event.get(); the script itself stands in for the time
+    module in timestep.py.
+    """
+    def __init__(self, pygame, keys, frames, rng, warm_up, sample_every, sample):
+        self.pygame = pygame
+        self.keys = [getattr(pygame, key) for key in keys]
+        self.frames = frames
+        self.rng = rng
+        self.warm_up = warm_up
+        self.sample_every = sample_every
+        self.sample = sample
+        self.frame = 0
+        self.sampled = 0
+        self.now = 0.0
+        self.quit = False  # close the window on the next frame
+
+    @property
+    def done(self):
+        return self.frame >= self.frames
+
+    def events(self, *args, **kwargs):
+        """One frame has passed since the last call; return its events."""
+        pygame = self.pygame
+        self.sample_due()
+        if self.quit or self.done:
+            self.quit = False
+            return [pygame.event.Event(pygame.QUIT)]
+        self.frame += 1
+        self.now += FRAME_SECONDS
+        if self.frame % INPUT_EVERY == 0:
+            return [pygame.event.Event(pygame.KEYDOWN, key=self.rng.choice(self.keys))]
+        return []
+
+    def sample_due(self):
+        """Take a sample if the last frame completed a sampling interval and it has not been taken."""
+        frame = self.frame - self.warm_up
+        if frame >= 0 and frame % self.sample_every == 0 and self.frame > self.sampled:
+            self.sampled = self.frame
+            self.sample(self.frame)
+
+    def perf_counter(self):
+        return self.now
+
+    def ticks(self):
+        return int(self.now * 1000)
+
+    def sleep(self, *args):
+        pass
+
+    def install(self):
+        """Route pygame's events and clocks, and timestep.py's, through this script."""
+        pygame = self.pygame
+        pygame.event.get = self.events
+        pygame.time.Clock = lambda: ScriptClock(self)
+        pygame.time.get_ticks = self.ticks
+        pygame.time.delay = pygame.time.wait = self.sleep
+        # The games quit pygame when they end; the next game keeps the window, fonts and caches
+        pygame.quit = self.sleep
+        # Called from here, what SDL and pygame allocate inside a display update (a pool of small
+        # buffers that keeps growing for tens of thousands of frames) is traced to this file,
+        # which is filtered out, instead of to the game's line
+        update, flip = pygame.display.update, pygame.display.flip
+        pygame.display.update = lambda *args: update(*args)
+        pygame.display.flip = lambda: flip()
+        timestep.time = self
+
+
+class ScriptClock:
+    """pygame.time.Clock on the script's time."""
+    def __init__(self, script):
+        self.script = script
+        self.last = script.now
+
+    def get_rawtime(self):
+        return round((self.script.now - self.last) * 1000)
+
+    def tick(self, framerate=0):
+        elapsed = self.get_rawtime()
+        self.last = self.script.now
+        return elapsed
+
+
+# --------------------------
+#          GAMES
+# --------------------------
+# Each plays one game through the implementation's own loop, starting from a fresh board.
+
+def play_chatgpt4o(game, script):
+    game.main()
+
+
+def play_chatgpto1(game, script):
+    screen = game.pygame.display.set_mode((game.SCREEN_WIDTH, game.SCREEN_HEIGHT))
+    game.main_game(screen, seed=script.rng.randrange(2**32))
+
+
+def play_claude(game, script):
+    # Restarts itself on R after a game over, so it only ends on QUIT
+    game.Tetris().run()
+
+
+def play_deepseek(game, script):
+    game.grid[:] = [[0] * len(game.grid[0]) for _ in game.grid]
+    game.update_column_tops()
+    game.main()
+
+
+def play_gemini(game, script):
+    game.grid[:] = [[0] * game.grid_width for _ in range(game.grid_height)]
+    # After a game over the loop keeps showing "Game Over" until the window is closed
+    draw_game_over = game.game_over
+
+    def game_over():
+        draw_game_over()
+        script.quit = True
+
+    game.game_over = game_over
+    try:
+        game.main()
+    finally:
+        game.game_over = draw_game_over
+
+
+def play_grok3(game, script):
+    game.main()
+
+
+# name: (play, keys)
+GAME_LOOPS = {
+    'ChatGPT4o': (play_chatgpt4o, ARROWS),
+    'ChatGPTo1': (play_chatgpto1, ARROWS),
+    'Claude3.5': (play_claude, ARROWS + ['K_SPACE', 'K_r']),
+    'DeepSeek': (play_deepseek, ARROWS + ['K_SPACE']),
+    'Gemini': (play_gemini, ARROWS),
+    'Grok3': (play_grok3, ARROWS),
+}
+
+
+# --------------------------
+#        MEASURING
+# --------------------------
+
+def rss_bytes():
+    """Resident set size of this process, or the peak RSS where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def slope(xs, ys):
+    """Least-squares slope of ys over xs."""
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    var = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var if var else 0.0
+
+
+def soak(name, frames, warm_up, sample_every, top):
+    random.seed(0)
+    game = load_game(name)
+    play, keys = GAME_LOOPS[name]
+    ignore = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, os.path.join(os.path.dirname(game.pygame.__file__), '*')),
+        tracemalloc.Filter(False, os.path.join(sysconfig.get_paths()['stdlib'], '*')),
+    ]
+    samples = []
+    baseline = final = None
+
+    def sample(frame):
+        nonlocal baseline, final
+        # A full collection also empties the interpreter's free lists (tuples, floats, frames),
+        # whose freed objects tracemalloc still counts at the line that made them
+        gc.collect()
+        # Filter later, and only a copy, so the filtering's own caches are not in the snapshot
+        final = tracemalloc.take_snapshot()
+        traced = sum(trace.size for trace in final.filter_traces(ignore).traces)
+        samples.append((frame, traced, rss_bytes()))
+        if baseline is None:
+            baseline = final
+
+    script = Script(game.pygame, keys, frames, random.Random(0), warm_up, sample_every, sample)
+    script.install()
+    tracemalloc.start()
+    start = time.perf_counter()
+    games = 0
+    while not script.done:
+        try:
+            play(game, script)
+        except Exception as e:  # some implementations crash in long games
+            tracemalloc.stop()
+            return {'error': f'{type(e).__name__} at frame {script.frame:,}: {e}'}
+        games += 1
+    script.sample_due()  # in case the last game ended on its own on the last frame
+    elapsed = time.perf_counter() - start
+
+    sites = []
+    if baseline is not None:
+        final = final.filter_traces(ignore)
+        for stat in final.compare_to(baseline.filter_traces(ignore), 'lineno')[:top]:
+            location = stat.traceback[0]
+            filename = location.filename
+            if filename.startswith(ROOT):
+                filename = os.path.relpath(filename, ROOT)
+            sites.append([f'{filename}:{location.lineno}', stat.size_diff, stat.count_diff])
+    tracemalloc.stop()
+
+    xs = [s[0] for s in samples]
+    return {
+        'frames': frames,
+        'games': games,
+        'fps': frames / elapsed,
+        'traced': samples[-1][1] if samples else 0,
+        'rss': samples[-1][2] if samples else rss_bytes(),
+        'growth': slope(xs, [s[1] for s in samples]) if len(samples) > 1 else 0.0,
+        'rss_growth': slope(xs, [s[2] for s in samples]) if len(samples) > 1 else 0.0,
+        'sites': sites,
+    }
+
+
+def child(args):
+    try:
+        result = soak(args.child, args.frames, args.warm_up, args.sample_every, args.top)
+    except Exception as e:
+        result = {'error': f'{type(e).__name__}: {e}'}
+    print(json.dumps(result))
+
+
+def run(name, args):
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--frames', str(args.frames),
+               '--warm-up', str(args.warm_up), '--sample-every', str(args.sample_every), '--top', str(args.top)]
+    out = subprocess.run(command, capture_output=True, text=True)
+    lines = out.stdout.strip().splitlines()
+    if out.returncode or not lines:
+        return {'error': out.stderr.strip().splitlines()[-1] if out.stderr.strip() else 'no output'}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', nargs='+', default=GAMES, choices=GAMES)
+    parser.add_argument('--frames', type=int, default=1_000_000)
+    parser.add_argument('--sample-every', type=int, default=50_000)
+    parser.add_argument('--warm-up', type=int, help='frames before the first sample (default: half of --frames, at most 50,000)')
+    parser.add_argument('--max-growth', type=float, default=1.0, help='bytes per frame')
+    parser.add_argument('--top', type=int, default=5, help='allocation sites to list')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.warm_up is None:
+        args.warm_up = min(args.frames // 2, 50_000)
+    if args.child:
+        child(args)
+        return
+
+    failed = False
+    for name in args.games:
+        if name in KNOWN_BUGS:
+            print(f'{name:<12}skip  known bug: {KNOWN_BUGS[name]}')
+            continue
+        r = run(name, args)
+        if 'error' in r:
+            failed = True
+            print(f'{name:<12}FAIL  error: {r["error"]}')
+            continue
+        ok = r['growth'] <= args.max_growth
+        failed |= not ok
+        print(f'{name:<12}{"ok  " if ok else "FAIL"}  {r["frames"]:,} frames ({r["games"]:,} games) at {r["fps"]:,.0f}/sec, '
+              f'traced {r["traced"] / 1024:,.0f} KiB ({r["growth"]:+.3f} B/frame), '
+              f'RSS {r["rss"] / 2**20:,.1f} MiB ({r["rss_growth"]:+.3f} B/frame)')
+        for site, size, count in r['sites']:
+            print(f'{"":<16}{size:+12,} B {count:+8,} blocks  {site}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
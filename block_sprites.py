@@ -0,0 +1,82 @@
+"""
+Pre-rendered block sprites for the pygame implementations.
+
+Drawing a board with pygame.draw.rect (often plus an outline rect) for every
+cell costs one or two draw calls per cell per frame. A BlockAtlas renders
+one sprite per color the first time the color is drawn, with the shading
+and outline baked in, converts it to the display's pixel format, and
+draws a whole board with a single Surface.fblits() call (Surface.blits()
+on pygame versions without fblits).
+
+    BLOCKS = BlockAtlas(BLOCK_SIZE, empty=BLACK)
+    BLOCKS.blit_grid(surface, grid)
+"""
+import pygame
+
+HIGHLIGHT = 0.45  # how far the top and left edges are blended toward white
+SHADOW = 0.6  # brightness of the bottom and right edges
+
+
+def _blend(color, target, amount):
+    return tuple(int(c + (t - c) * amount) for c, t in zip(color[:3], target))
+
+
+class BlockAtlas:
+    def __init__(self, size, outline=None, empty=None):
+        """
+        size: sprite width and height in pixels.
+        outline: color of a 1 px border baked into every sprite, or None.
+        empty: color of empty cells. It gets a flat sprite (outline only)
+        and blit_grid() skips it unless asked not to.
+        """
+        self.size = size
+        self.outline = outline
+        self.empty = empty
+        self.bevel = max(1, size // 10)
+        self.sprites = {}
+
+    def sprite(self, color):
+        """Return the sprite for color, rendering it on first use."""
+        sprite = self.sprites.get(color)
+        if sprite is None:
+            sprite = self.sprites[color] = self.render(color)
+        return sprite
+
+    def render(self, color):
+        size, bevel = self.size, self.bevel
+        sprite = pygame.Surface((size, size))
+        sprite.fill(color)
+        if color != self.empty:
+            light = _blend(color, (255, 255, 255), HIGHLIGHT)
+            dark = _blend(color, (0, 0, 0), 1 - SHADOW)
+            sprite.fill(light, (0, 0, size, bevel))
+            sprite.fill(light, (0, 0, bevel, size))
+            sprite.fill(dark, (0, size - bevel, size, bevel))
+            sprite.fill(dark, (size - bevel, bevel, bevel, size - bevel))
+        if self.outline is not None:
+            pygame.draw.rect(sprite, self.outline, sprite.get_rect(), 1)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        return sprite
+
+    def blit_cells(self, surface, cells):
+        """Draw (color, (x, y)) pairs, positions in pixels, in one batch."""
+        sprite = self.sprite
+        batch = [(sprite(color), pos) for color, pos in cells]
+        fblits = getattr(surface, 'fblits', None)
+        if fblits is not None:
+            fblits(batch)
+        else:
+            surface.blits(batch, doreturn=False)
+
+    def blit_grid(self, surface, grid, origin=(0, 0), pitch=None, skip_empty=True):
+        """
+        Draw a grid of colors with its top-left cell at origin, cells pitch
+        pixels apart (default: the sprite size).
+        """
+        pitch = pitch or self.size
+        ox, oy = origin
+        empty = self.empty if skip_empty else object()
+        self.blit_cells(surface, ((color, (ox + x * pitch, oy + y * pitch))
+                                  for y, row in enumerate(grid)
+                                  for x, color in enumerate(row) if color != empty))
@@ -0,0 +1,174 @@
+"""
+Opt-in per-frame timing of game loop phases.
+
+A loop marks the start of each phase with switch(); the time until the next
+switch() (or end_frame()) is charged to that phase. switch() returns the
+phase it interrupted, so code deep inside a phase can time a sub-phase
+exclusively:
+
+    prev = profiler.switch('clear')
+    clear_lines()
+    profiler.switch(prev)
+
+Per-frame totals go into fixed-size ring buffers read by draw_overlay()
+(p50/p99 per phase, FPS and the text_cache hit rate) and dump_csv(). Games
+use NULL_PROFILER when profiling is off, whose methods do nothing.
+"""
+import atexit
+import csv
+import time
+from array import array
+
+import pygame
+
+from text_cache import text_cache
+
+OVERLAY_COLOR = (255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0)
+OVERLAY_FONT_SIZE = 18
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off."""
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def switch(self, phase):
+        return None
+
+    def end_frame(self):
+        pass
+
+    def draw_overlay(self, surface, pos=(0, 0)):
+        return []
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, phases, size=600, refresh=30):
+        self.phases = list(phases)
+        self.size = size
+        self.refresh = refresh  # frames between overlay updates
+        self.buffers = {phase: array('q', bytes(8 * size)) for phase in self.phases}
+        self.frame_times = array('q', bytes(8 * size))
+        self.frame_starts = array('q', bytes(8 * size))
+        self.totals = dict.fromkeys(self.phases, 0)
+        self.frames = 0
+        self.current = None
+        self.last = self.frame_start = time.perf_counter_ns()
+        self.labels = []
+        self.overlay_rect = None
+        # The overlay has its own font instead of using text_cache, so its ever-changing
+        # numbers do not push the game's HUD labels out of the shared cache
+        self.font = None
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.current = None
+
+    def switch(self, phase):
+        now = time.perf_counter_ns()
+        previous = self.current
+        if previous is not None:
+            self.totals[previous] += now - self.last
+        self.current = phase
+        self.last = now
+        return previous
+
+    def end_frame(self):
+        self.switch(None)
+        slot = self.frames % self.size
+        for phase in self.phases:
+            self.buffers[phase][slot] = self.totals[phase]
+            self.totals[phase] = 0
+        self.frame_times[slot] = self.last - self.frame_start
+        self.frame_starts[slot] = self.frame_start
+        self.frames += 1
+
+    # --------------------------
+    #        REPORTING
+    # --------------------------
+
+    def samples(self, buffer):
+        count = min(self.frames, self.size)
+        return sorted(buffer[:count]) if count else [0]
+
+    def percentiles(self, phase):
+        """(p50, p99) of a phase in milliseconds over the buffered frames."""
+        values = self.samples(self.buffers[phase])
+        return (values[len(values) // 2] / 1e6,
+                values[min(len(values) - 1, len(values) * 99 // 100)] / 1e6)
+
+    def fps(self):
+        """Frames per second, from start-to-start time of the buffered frames."""
+        count = min(self.frames, self.size)
+        if count < 2:
+            return 0.0
+        newest = (self.frames - 1) % self.size
+        oldest = self.frames % self.size if self.frames > self.size else 0
+        span = self.frame_starts[newest] - self.frame_starts[oldest]
+        return (count - 1) * 1e9 / span if span else 0.0
+
+    def summary(self):
+        lines = [f'FPS {self.fps():.1f}', 'ms: p50 / p99']
+        for phase in self.phases:
+            p50, p99 = self.percentiles(phase)
+            lines.append(f'{phase} {p50:.2f} / {p99:.2f}')
+        if text_cache.hits or text_cache.misses:
+            lines.append(f'text cache {text_cache.hit_rate:.1%} hits')
+        return lines
+
+    def draw_overlay(self, surface, pos=(0, 0)):
+        """
+        Draw the summary at pos, re-rendering it every `refresh` frames.
+        Returns the rects it drew over, for dirty-rect renderers.
+        """
+        if self.frames % self.refresh == 0 or not self.labels:
+            if self.font is None:
+                self.font = pygame.font.Font(None, OVERLAY_FONT_SIZE)
+            self.labels = [self.font.render(line, True, OVERLAY_COLOR) for line in self.summary()]
+        width = max(label.get_width() for label in self.labels)
+        height = sum(label.get_height() for label in self.labels)
+        rect = surface.fill(OVERLAY_BACKGROUND, (pos[0], pos[1], width + 4, height + 4))
+        y = pos[1] + 2
+        for label in self.labels:
+            surface.blit(label, (pos[0] + 2, y))
+            y += label.get_height()
+        dirty = [rect] if self.overlay_rect is None else [rect, self.overlay_rect]
+        self.overlay_rect = rect
+        return dirty
+
+    def dump_csv(self, path):
+        """Write the buffered frames, oldest first, one row per frame in nanoseconds."""
+        count = min(self.frames, self.size)
+        first = self.frames - count
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'frame_ns'] + [f'{phase}_ns' for phase in self.phases])
+            for frame in range(first, self.frames):
+                slot = frame % self.size
+                writer.writerow([frame, self.frame_times[slot]] +
+                                [self.buffers[phase][slot] for phase in self.phases])
+
+    def dump_csv_at_exit(self, path):
+        atexit.register(self.dump_csv, path)
+
+
+def from_argv(argv, phases, default_path):
+    """
+    Return a FrameProfiler that dumps its CSV at exit if argv contains
+    --profile (optionally followed by a CSV path), else NULL_PROFILER.
+    """
+    if '--profile' not in argv:
+        return NULL_PROFILER
+    profiler = FrameProfiler(phases)
+    index = argv.index('--profile') + 1
+    path = argv[index] if index < len(argv) and not argv[index].startswith('--') else default_path
+    profiler.dump_csv_at_exit(path)
+    return profiler
@@ -0,0 +1,61 @@
+"""
+Cached layers for content that does not change from frame to frame, such
+as grid lines, cell outlines, titles, labels and borders.
+
+A StaticLayer paints its content once into an offscreen Surface, converted
+to the display's pixel format, and is only repainted when the target size
+or the key passed to blit() changes (e.g. a window resize or a new board
+size). Each frame the game blits the background layer, draws the dynamic
+content (blocks, score) on top, then blits any overlay layers:
+
+    BACKGROUND = StaticLayer(draw_background)
+    GRID_LINES = StaticLayer(draw_grid, transparent=BLACK)
+
+    BACKGROUND.blit(surface)
+    BLOCKS.blit_grid(surface, grid)
+    GRID_LINES.blit(surface)
+
+Overlays are painted on a transparent color, which is skipped when
+blitting, so only the lines themselves cover the layers below.
+"""
+import pygame
+
+
+class StaticLayer:
+    def __init__(self, paint, transparent=None):
+        """
+        paint(surface) draws the layer's content onto a blank surface the
+        size of the target (filled with transparent, if given).
+        """
+        self.paint = paint
+        self.transparent = transparent
+        self.surface = None
+        self.key = None
+
+    def get(self, size, key=None):
+        """Return the layer surface for size and key, repainting it if either changed."""
+        if self.surface is None or self.key != (size, key):
+            self.surface = self.render(size)
+            self.key = (size, key)
+        return self.surface
+
+    def render(self, size):
+        surface = pygame.Surface(size)
+        if self.transparent is not None:
+            surface.fill(self.transparent)
+            surface.set_colorkey(self.transparent, pygame.RLEACCEL)
+        self.paint(surface)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    def blit(self, target, key=None, area=None):
+        """
+        Blit the layer over target, or only the part inside area (a rect in
+        target coordinates). Returns the rect that was drawn.
+        """
+        surface = self.get(target.get_size(), key)
+        if area is None:
+            return target.blit(surface, (0, 0))
+        area = pygame.Rect(area)
+        return target.blit(surface, area.topleft, area)
@@ -0,0 +1,171 @@
+"""
+Pluggable piece randomizers with an N-piece lookahead queue.
+
+A source produces shape indices (0 to count - 1) into a fixed-size ring
+buffer that always holds the next `preview` pieces after the one that
+next() will return, so a preview panel or a search agent can look ahead
+with peek(i) without allocating anything (peek(i) for i >= preview + 1
+raises IndexError rather than wrapping around to an unrelated piece):
+
+    source = BagSource(7, preview=5, seed=42)
+    shape = SHAPES[source.next()]
+    upcoming = [source.peek(i) for i in range(5)]
+
+take(n) returns the next n pieces as a list in one call, for batch
+simulations that need long sequences up front. It continues the same
+sequence next() would have produced.
+
+getstate() and setstate() save and rewind the position in the sequence
+(buffered pieces, bag contents and rng state), so a game snapshot can
+branch and see the same pieces on every branch. A source sharing an rng,
+including the global random module, rewinds it for its other users too.
+
+Sources:
+    UniformSource  every piece is drawn independently (the classic rule,
+                   and what the games did before)
+    BagSource      7-bag: every run of `count` pieces is one shuffled set,
+                   so at most 2 * count - 2 other pieces come between two
+                   of the same shape
+    SequenceSource replays a fixed list of indices, looping at the end
+
+UniformSource and BagSource take a `seed` for a private random.Random, or
+an `rng` to share (default: the global `random` module, so random.seed()
+still makes a game reproducible).
+"""
+import copy
+import random
+
+
+class PieceSource:
+    def __init__(self, count=7, preview=5, rng=None, seed=None):
+        """
+        count: number of distinct shapes.
+        preview: how many pieces past the next one peek() can see.
+        """
+        if rng is None:
+            rng = random if seed is None else random.Random(seed)
+        self.count = count
+        self.rng = rng
+        self.size = preview + 1
+        self.buffer = self.draw(self.size)
+        self.head = 0
+
+    def __deepcopy__(self, memo):
+        # The global random module cannot be copied, so copies share it
+        memo[id(random)] = random
+        clone = self.__class__.__new__(self.__class__)
+        memo[id(self)] = clone
+        clone.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return clone
+
+    @property
+    def preview(self):
+        return self.size - 1
+
+    def draw_one(self):
+        """Generate the next index of the underlying sequence."""
+        raise NotImplementedError
+
+    def draw(self, n):
+        """Generate the next n indices of the underlying sequence."""
+        return [self.draw_one() for _ in range(n)]
+
+    def next(self):
+        """Return the next piece and refill its slot with a new one."""
+        head = self.head
+        piece = self.buffer[head]
+        self.buffer[head] = self.draw_one()
+        self.head = (head + 1) % self.size
+        return piece
+
+    def peek(self, i=0):
+        """The piece the (i + 1)-th next() call will return, for 0 <= i < size."""
+        if not 0 <= i < self.size:
+            raise IndexError(f'peek({i}) outside the {self.size} buffered pieces')
+        return self.buffer[(self.head + i) % self.size]
+
+    def upcoming(self, n=None):
+        """The next n pieces (default: all buffered, at most size) without consuming them."""
+        n = self.size if n is None else n
+        if not 0 <= n <= self.size:
+            raise IndexError(f'upcoming({n}) beyond the {self.size} buffered pieces')
+        return [self.buffer[(self.head + i) % self.size] for i in range(n)]
+
+    def getstate(self):
+        """The position in the sequence, for setstate()."""
+        return self.buffer[:], self.head, self.rng.getstate()
+
+    def setstate(self, state):
+        """Rewind to a getstate(); the same state can be set any number of times."""
+        buffer, self.head, rng_state = state
+        self.buffer = buffer[:]
+        self.rng.setstate(rng_state)
+
+    def take(self, n):
+        """Consume the next n pieces at once; the same as n calls to next()."""
+        queued = self.buffer[self.head:] + self.buffer[:self.head]
+        stream = queued + self.draw(n)
+        self.buffer = stream[n:]
+        self.head = 0
+        return stream[:n]
+
+
+class UniformSource(PieceSource):
+    def draw_one(self):
+        return self.rng.randrange(self.count)
+
+    def draw(self, n):
+        randrange, count = self.rng.randrange, self.count
+        return [randrange(count) for _ in range(n)]
+
+
+class BagSource(PieceSource):
+    def __init__(self, count=7, preview=5, rng=None, seed=None):
+        self.bag = []
+        super().__init__(count, preview, rng, seed)
+
+    def draw_one(self):
+        if not self.bag:
+            self.refill()
+        return self.bag.pop()
+
+    def draw(self, n):
+        out = []
+        while len(out) < n:
+            if not self.bag:
+                self.refill()
+            k = min(n - len(out), len(self.bag))
+            out.extend(reversed(self.bag[-k:]))  # same order as popping one at a time
+            del self.bag[-k:]
+        return out
+
+    def getstate(self):
+        return super().getstate() + (self.bag[:],)
+
+    def setstate(self, state):
+        super().setstate(state[:-1])
+        self.bag = state[-1][:]
+
+    def refill(self):
+        self.bag = list(range(self.count))
+        self.rng.shuffle(self.bag)
+
+
+class SequenceSource(PieceSource):
+    def __init__(self, sequence, preview=5):
+        self.sequence = list(sequence)
+        self.pos = 0
+        super().__init__(max(self.sequence) + 1, preview, rng=random)
+
+    def draw_one(self):
+        piece = self.sequence[self.pos]
+        self.pos = (self.pos + 1) % len(self.sequence)
+        return piece
+
+    def getstate(self):
+        # The sequence is fixed, so there is no rng state to save
+        return self.buffer[:], self.head, self.pos
+
+    def setstate(self, state):
+        buffer, self.head, self.pos = state
+        self.buffer = buffer[:]
@@ -0,0 +1,82 @@
+"""
+Fast enumeration of every final resting position of a piece dropped
+straight down onto a board, for search-based agents.
+
+Works with any implementation's rotation tables, given as a list of
+rotations each made of (x, y) cell offsets, for example
+SHAPES['T'] from TetrisByClaude3.5.py or
+[t.cells for t in SHAPE_TABLES[i]] from the string-grid versions.
+
+    profiles = compile_rotations(SHAPES['T'])
+    tops = column_tops(grid, BLACK)
+    for rotation, x, y in enumerate_placements(profiles, tops):
+        ...
+
+A placement is reported as (rotation, x, landing y) in the coordinates the
+game uses for its piece position. Rotations that only differ from an
+earlier one by a translation are dropped, so every placement is distinct.
+"""
+from collections import namedtuple
+
+# rotation: index into the original rotation list
+# cells: ((x, y), ...) offsets, as given
+# min_x/max_x/min_y: bounding box of the cells
+# bottom: ((column offset, lowest y offset in that column), ...)
+RotationProfile = namedtuple('RotationProfile', ['rotation', 'cells', 'min_x', 'max_x', 'min_y', 'bottom'])
+
+
+def compile_rotations(rotations):
+    """Precompute a RotationProfile for every distinct rotation of a piece."""
+    profiles = []
+    seen = set()
+    for index, cells in enumerate(rotations):
+        cells = tuple(cells)
+        min_x = min(x for x, _ in cells)
+        min_y = min(y for _, y in cells)
+        normalized = frozenset((x - min_x, y - min_y) for x, y in cells)
+        if normalized in seen:
+            continue  # same footprint as an earlier rotation, e.g. the O piece
+        seen.add(normalized)
+
+        bottom = {}
+        for x, y in cells:
+            bottom[x] = max(bottom.get(x, y), y)
+        profiles.append(RotationProfile(index, cells, min_x, max(x for x, _ in cells),
+                                        min_y, tuple(sorted(bottom.items()))))
+    return profiles
+
+
+def column_tops(grid, empty):
+    """
+    Return, for every column, the row index of its highest occupied cell,
+    or the board height for an empty column.
+    """
+    height = len(grid)
+    tops = [height] * len(grid[0])
+    open_columns = set(range(len(tops)))
+    for y, row in enumerate(grid):
+        for x in list(open_columns):
+            if row[x] != empty:
+                tops[x] = y
+                open_columns.discard(x)
+        if not open_columns:
+            break
+    return tops
+
+
+def enumerate_placements(profiles, tops):
+    """
+    Return [(rotation, x, y), ...] for every place the piece can come to
+    rest when dropped straight down. Placements that would leave part of
+    the piece above the top of the board are left out.
+    """
+    width = len(tops)
+    placements = []
+    append = placements.append
+    for profile in profiles:
+        rotation, bottom, min_y = profile.rotation, profile.bottom, profile.min_y
+        for x in range(-profile.min_x, width - profile.max_x):
+            y = min([tops[x + dx] - dy for dx, dy in bottom]) - 1
+            if y + min_y >= 0:
+                append((rotation, x, y))
+    return placements
@@ -0,0 +1,106 @@
+"""
+Compact binary replay logs for deterministic games.
+
+A replay stores the RNG seed of a game and the player's inputs, each tagged
+with the number of gravity ticks that had happened when it was applied.
+Given the same seed, inputs and tick tags, a game's rules reproduce it
+exactly, without a window or wall-clock timing. Every checkpoint_every
+locked pieces the recorder also stores a board checksum, so playback can
+report the first checkpoint where a long game diverged.
+
+Format: b'TTR1', seed (u64), checkpoint_every (u16), then records. A record
+is a varint of (ticks since the previous record << 3 | code), followed by a
+u32 checksum for CHECKPOINT records. Codes 0-5 are game inputs; most inputs
+take a single byte.
+"""
+import struct
+
+MAGIC = b'TTR1'
+HEADER = struct.Struct('>4sQH')
+CHECKSUM = struct.Struct('>I')
+
+CHECKPOINT = 6
+END = 7
+
+
+class ReplayDivergence(Exception):
+    """Playback reached a checkpoint whose board checksum does not match."""
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayRecorder:
+    def __init__(self, seed, checkpoint_every=10):
+        self.seed = seed
+        self.checkpoint_every = checkpoint_every
+        self.data = bytearray(HEADER.pack(MAGIC, seed, checkpoint_every))
+        self.ticks = 0
+        self.last_tick = 0
+        self.pieces = 0
+
+    def _record(self, code):
+        _write_varint(self.data, (self.ticks - self.last_tick) << 3 | code)
+        self.last_tick = self.ticks
+
+    def tick(self):
+        """Call once per gravity tick."""
+        self.ticks += 1
+
+    def input(self, code):
+        """Record a game input (0-5) applied at the current tick."""
+        self._record(code)
+
+    def piece_locked(self, checksum):
+        """Call when a piece locks; stores checksum every checkpoint_every pieces."""
+        self.pieces += 1
+        if self.pieces % self.checkpoint_every == 0:
+            self._record(CHECKPOINT)
+            self.data += CHECKSUM.pack(checksum & 0xffffffff)
+
+    def finish(self):
+        """Mark the end of the game and return the replay bytes."""
+        self._record(END)
+        return bytes(self.data)
+
+
+def read_replay(data):
+    """
+    Return (seed, checkpoint_every, records) where records yields
+    (tick, code, checksum or None) in order.
+    """
+    magic, seed, checkpoint_every = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('not a replay file')
+
+    def records():
+        pos = HEADER.size
+        tick = 0
+        while pos < len(data):
+            value, pos = _read_varint(data, pos)
+            tick += value >> 3
+            code = value & 7
+            checksum = None
+            if code == CHECKPOINT:
+                checksum, = CHECKSUM.unpack_from(data, pos)
+                pos += CHECKSUM.size
+            yield tick, code, checksum
+            if code == END:
+                return
+
+    return seed, checkpoint_every, records()
@@ -0,0 +1,36 @@
+"""
+Startup-time compiler for shapes written as lists of strings.
+
+TetrisByChatGPTo1.py, TetrisByGemini.py and TetrisByGrok3.py describe each
+rotation as a small text picture. compile_shapes() turns every rotation into
+a tuple of (x, y) cell offsets plus its bounding box once, so the hot paths
+never look at the strings again.
+"""
+from collections import namedtuple
+
+# cells: ((x, y), ...) offsets of the filled cells
+# min_x/max_x/min_y/max_y: bounding box of the cells, inclusive
+CompiledShape = namedtuple('CompiledShape', ['cells', 'min_x', 'max_x', 'min_y', 'max_y'])
+
+
+def compile_rotation(rows, filled, offset=(0, 0)):
+    """Compile one rotation (a list of strings) into a CompiledShape."""
+    dx, dy = offset
+    cells = tuple((j + dx, i + dy)
+                  for i, line in enumerate(rows)
+                  for j, column in enumerate(line) if column == filled)
+    xs = [x for x, _ in cells]
+    ys = [y for _, y in cells]
+    return CompiledShape(cells, min(xs), max(xs), min(ys), max(ys))
+
+
+def compile_shapes(shapes, filled, offset=(0, 0)):
+    """
+    Compile a list of shapes (each a list of rotations) into
+    tables[shape_index][rotation] -> CompiledShape.
+
+    offset is added to every cell, for games that draw a template relative
+    to a point other than its top-left corner.
+    """
+    return [[compile_rotation(rows, filled, offset) for rows in rotations]
+            for rotations in shapes]
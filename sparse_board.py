@@ -0,0 +1,111 @@
+"""
+Sparse row store for boards of any size.
+
+A dense board (a list of `height` rows of `width` cells) costs O(width *
+height) to build, copy, scan or draw, even when almost all of it is empty,
+which makes giant boards such as 200x2000 impractical. A SparseBoard keeps
+only the rows that have filled cells, in a dict, with a filled-cell count
+per row and a sorted index of the occupied rows:
+
+    board = SparseBoard(200, 2000, empty=BLACK)
+    if board.fits(cells):
+        full = board.lock(cells, color)
+        board.clear_rows(full)
+    grid = board.view(left, top, 10, 20)  # dense rows for the visible area
+
+Collision checks and locking cost O(cells), a line clear only moves the
+occupied rows above the lowest cleared row, and view() only copies the
+occupied rows inside the viewport. Cells are (x, y) with y growing
+downward; cells above the top (y < 0) are never stored, and locking one
+sets topped_out.
+"""
+from bisect import bisect_left, bisect_right, insort
+
+
+class SparseBoard:
+    def __init__(self, width, height, empty=None):
+        self.width = width
+        self.height = height
+        self.empty = empty
+        self.rows = {}  # y -> list of width cells, only for rows with filled cells
+        self.counts = {}  # y -> number of filled cells in the row
+        self.occupied = []  # sorted ys of the stored rows
+        self.topped_out = False
+
+    def get(self, x, y):
+        row = self.rows.get(y)
+        return self.empty if row is None else row[x]
+
+    def fits(self, cells):
+        """True if every cell is inside the board (or above it) and empty."""
+        rows, width, height, empty = self.rows, self.width, self.height, self.empty
+        for x, y in cells:
+            if y < 0:
+                continue
+            if not (0 <= x < width and y < height):
+                return False
+            row = rows.get(y)
+            if row is not None and row[x] != empty:
+                return False
+        return True
+
+    def lock(self, cells, color):
+        """Fill cells with color and return the ys of the rows this filled up."""
+        rows, counts = self.rows, self.counts
+        touched = []
+        for x, y in cells:
+            if y < 0:
+                self.topped_out = True
+                continue
+            row = rows.get(y)
+            if row is None:
+                row = rows[y] = [self.empty] * self.width
+                counts[y] = 0
+                insort(self.occupied, y)
+            if row[x] == self.empty:
+                counts[y] += 1
+            row[x] = color
+            touched.append(y)
+        return sorted({y for y in touched if counts[y] == self.width})
+
+    def full_rows(self):
+        return [y for y in self.occupied if self.counts[y] == self.width]
+
+    def clear_rows(self, full):
+        """
+        Remove the given full rows and move the rows above them down. Returns
+        the number of rows cleared.
+        """
+        if not full:
+            return 0
+        cleared = sorted(full)
+        rows, counts, occupied = self.rows, self.counts, self.occupied
+        lowest = bisect_left(occupied, cleared[-1])
+        for y in cleared:
+            del rows[y]
+            del counts[y]
+
+        # Only stored rows above the lowest cleared row move, each by the number of cleared rows below it
+        moving = [y for y in occupied[:lowest] if y in rows]
+        moved = [(y + len(cleared) - bisect_right(cleared, y), rows.pop(y), counts.pop(y)) for y in moving]
+        for y, row, count in moved:
+            rows[y] = row
+            counts[y] = count
+        self.occupied = [y for y, _, _ in moved] + occupied[lowest + 1:]
+        return len(cleared)
+
+    def view(self, left, top, cols, rows):
+        """Dense rows x cols copy of the area whose top-left cell is (left, top)."""
+        empty = self.empty
+        grid = [[empty] * cols for _ in range(rows)]
+        occupied = self.occupied
+        right = min(left + cols, self.width)
+        for y in occupied[bisect_left(occupied, top):bisect_left(occupied, top + rows)]:
+            grid[y - top][:right - left] = self.rows[y][left:right]
+        return grid
+
+    def clear(self):
+        self.rows.clear()
+        self.counts.clear()
+        self.occupied.clear()
+        self.topped_out = False
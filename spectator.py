@@ -0,0 +1,229 @@
+"""
+Spectator streams for TetrisByChatGPTo1.py games.
+
+Sending the whole grid of a game (200 RGB tuples) to every observer on
+every frame wastes bandwidth, since between two frames usually only the
+falling piece moves. A StreamEncoder turns one game into a stream of
+packets, one per frame: a full keyframe every keyframe_every frames (and
+whenever keyframe() is called, e.g. when an observer joins), and in
+between a delta carrying only the rows that changed since the last
+packet, the falling piece if it moved and the score if it changed. A
+frame in which nothing changed costs 3 bytes.
+
+    colors = [BLACK] + SHAPE_COLORS
+    encoder = StreamEncoder(colors, keyframe_every=60, compress=True)
+    decoder = StreamDecoder(colors)
+    frame = decoder.decode(encoder.encode(game))  # every frame
+    frame.grid, frame.piece, frame.score, frame.lost
+
+Packet: flags (u8), then
+    sequence number (u16, wrapping)
+    score (u32)                          if flags & SCORE
+    shape, rotation (u8), x, y (i8)      if flags & PIECE (shape 255: none)
+    width, height (u8), every row        if flags & KEYFRAME
+    changed-row mask (u32), those rows   if flags & ROWS (boards of up to 32 rows)
+A row is its cells as 4-bit color codes (indices into colors), two to a
+byte. A keyframe has every field, so a decoder can start at any keyframe;
+a delta only applies to the frame right before it.
+
+With compress=True, keyframes and deltas with rows are deflated with zlib
+after the flags byte (flags & DEFLATED), in one stream per keyframe
+interval, so rows seen earlier in the interval compress to
+back-references. Each keyframe starts a new stream, so decoding can still
+start at any keyframe. Deltas without rows are a few bytes and are sent
+as they are.
+"""
+import struct
+import zlib
+from collections import namedtuple
+from itertools import chain
+
+SCORE, PIECE, ROWS, LOST, DEFLATED, KEYFRAME = 0x01, 0x02, 0x04, 0x08, 0x10, 0x80
+
+SEQUENCE = struct.Struct('>H')
+SCORE_FIELD = struct.Struct('>I')
+PIECE_FIELD = struct.Struct('>BBbb')
+SIZE_FIELD = struct.Struct('>BB')
+MASK_FIELD = struct.Struct('>I')
+NO_PIECE = (255, 0, 0, 0)
+
+# Every zlib sync flush ends with these bytes, so they are left out of packets
+SYNC_TAIL = b'\x00\x00\xff\xff'
+
+# A decoded frame. Rows are shared between frames; a later frame replaces a row instead of writing into it
+Frame = namedtuple('Frame', ['sequence', 'grid', 'score', 'piece', 'lost'])
+
+
+class StreamError(ValueError):
+    """A delta arrived that does not follow the frame the decoder has."""
+
+
+class StreamEncoder:
+    def __init__(self, colors, keyframe_every=60, compress=False):
+        """
+        colors: every color a cell can have, at most 16.
+        keyframe_every: frames from one keyframe to the next.
+        """
+        self.codes = {color: code for code, color in enumerate(colors)}
+        self.keyframe_every = keyframe_every
+        self.compress = compress
+        self.compressor = None
+        self.sequence = 0
+        self.until_keyframe = 0
+        self.rows = None  # copies of the rows as last sent
+        self.packed = None  # and those rows packed, so a keyframe only packs rows that changed
+        self.head = None  # (score, piece) as last sent; the lost flag is in every packet
+
+    def keyframe(self):
+        """Make the next packet a keyframe."""
+        self.until_keyframe = 0
+
+    def pack(self, row):
+        codes = self.codes
+        cells = [codes[color] for color in row]
+        if len(cells) % 2:
+            cells.append(0)
+        return bytes([high << 4 | low for high, low in zip(cells[::2], cells[1::2])])
+
+    def encode(self, game):
+        """The packet for the current frame of an o1 Game: its grid, current_piece, score and lost flag."""
+        grid = game.grid
+        piece = game.current_piece
+        pose = NO_PIECE if piece is None else (piece.shape_id, piece.rotation % len(piece.shape), piece.x, piece.y)
+        head = (game.score, pose)
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        flags = LOST if game.lost else 0
+        fields = [SEQUENCE.pack(self.sequence)]
+
+        if self.until_keyframe <= 0:
+            self.until_keyframe = self.keyframe_every - 1
+            if self.rows is None or len(self.rows) != len(grid):
+                self.rows = [None] * len(grid)
+                self.packed = [None] * len(grid)
+            self.update_rows(grid)
+            self.head = head
+            if self.compress:
+                self.compressor = zlib.compressobj(wbits=-15)
+            fields += [SCORE_FIELD.pack(game.score), PIECE_FIELD.pack(*pose),
+                       SIZE_FIELD.pack(len(grid[0]), len(grid))]
+            fields += self.packed
+            return self.packet(flags | KEYFRAME | SCORE | PIECE, fields)
+        self.until_keyframe -= 1
+
+        score, last_pose = self.head
+        self.head = head
+        if game.score != score:
+            flags |= SCORE
+            fields.append(SCORE_FIELD.pack(game.score))
+        if pose != last_pose:
+            flags |= PIECE
+            fields.append(PIECE_FIELD.pack(*pose))
+
+        mask = self.update_rows(grid)
+        if mask:
+            flags |= ROWS
+            fields.append(MASK_FIELD.pack(mask))
+            fields += [row for y, row in enumerate(self.packed) if mask >> y & 1]
+        return self.packet(flags, fields)
+
+    def update_rows(self, grid):
+        """Take copies of the rows that changed since the last packet. Returns their mask."""
+        sent, packed = self.rows, self.packed
+        mask = 0
+        for y, row in enumerate(grid):
+            if row != sent[y]:
+                sent[y] = row[:]
+                packed[y] = self.pack(row)
+                mask |= 1 << y
+        return mask
+
+    def packet(self, flags, fields):
+        body = b''.join(fields)
+        if self.compress and flags & (KEYFRAME | ROWS):
+            flags |= DEFLATED
+            body = (self.compressor.compress(body) + self.compressor.flush(zlib.Z_SYNC_FLUSH))[:-len(SYNC_TAIL)]
+        return bytes([flags]) + body
+
+
+class StreamDecoder:
+    def __init__(self, colors):
+        """colors: as given to the encoder."""
+        # Each packed byte to the colors of its two cells
+        table = list(colors) + [None] * (16 - len(colors))
+        self.pairs = [(table[byte >> 4], table[byte & 15]) for byte in range(256)]
+        self.decompressor = None
+        self.frame = None
+        self.width = 0
+        self.packed = []  # each row of the current frame as packed, to reuse unchanged rows of a keyframe
+
+    def unpack(self, data):
+        row = list(chain.from_iterable(map(self.pairs.__getitem__, data)))
+        if len(row) > self.width:
+            del row[self.width:]
+        return row
+
+    def decode(self, packet):
+        """
+        Apply one packet and return the Frame it describes. Raises
+        StreamError for a delta that does not follow the previous packet
+        (a packet was lost, or decoding did not start at a keyframe).
+        """
+        flags = packet[0]
+        body = packet[1:]
+        if flags & DEFLATED:
+            if flags & KEYFRAME:
+                self.decompressor = zlib.decompressobj(wbits=-15)
+            elif self.decompressor is None:
+                raise StreamError('compressed delta before any keyframe')
+            try:
+                body = self.decompressor.decompress(body + SYNC_TAIL)
+            except zlib.error as e:
+                raise StreamError(f'cannot inflate delta: {e}') from None
+        sequence, = SEQUENCE.unpack_from(body)
+        pos = SEQUENCE.size
+        frame = self.frame
+        if not flags & KEYFRAME and (frame is None or sequence != (frame.sequence + 1) & 0xFFFF):
+            raise StreamError(f'delta {sequence} does not follow frame {frame and frame.sequence}')
+
+        score = frame.score if frame is not None else 0
+        if flags & SCORE:
+            score, = SCORE_FIELD.unpack_from(body, pos)
+            pos += SCORE_FIELD.size
+        piece = frame.piece if frame is not None else None
+        if flags & PIECE:
+            piece = PIECE_FIELD.unpack_from(body, pos)
+            pos += PIECE_FIELD.size
+            if piece == NO_PIECE:
+                piece = None
+
+        step = (self.width + 1) // 2
+        packed = self.packed
+        if flags & KEYFRAME:
+            width, height = SIZE_FIELD.unpack_from(body, pos)
+            pos += SIZE_FIELD.size
+            if frame is None or (width, height) != (self.width, len(frame.grid)):
+                self.width, step = width, (width + 1) // 2
+                grid = [None] * height
+                packed = self.packed = [None] * height
+            else:
+                grid = frame.grid[:]
+            for y in range(height):
+                row = body[pos:pos + step]
+                pos += step
+                if row != packed[y]:
+                    packed[y] = row
+                    grid[y] = self.unpack(row)
+        elif flags & ROWS:
+            grid = frame.grid[:]
+            mask, = MASK_FIELD.unpack_from(body, pos)
+            pos += MASK_FIELD.size
+            for y in range(len(grid)):
+                if mask >> y & 1:
+                    packed[y] = row = body[pos:pos + step]
+                    grid[y] = self.unpack(row)
+                    pos += step
+        else:
+            grid = frame.grid
+
+        self.frame = Frame(sequence, grid, score, piece, bool(flags & LOST))
+        return self.frame
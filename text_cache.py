@@ -0,0 +1,63 @@
+"""
+Cache of pygame fonts and rendered text labels.
+
+pygame.font.SysFont() searches the system fonts on every call, and
+Font.render() allocates a new Surface, so HUD code that does both every
+frame wastes most of its time. TextCache keeps one font object per
+(name, size, bold) and an LRU of rendered labels per (font, text, color),
+so a label is only rendered again when its text actually changes.
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    def __init__(self, max_labels=64):
+        self.max_labels = max_labels
+        self.fonts = {}
+        self.labels = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, name, size, bold=False):
+        """Return a font, loading it on first use. name=None is pygame's default font."""
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            if name is None:
+                font = pygame.font.Font(None, size)
+                font.set_bold(bold)
+            else:
+                font = pygame.font.SysFont(name, size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, name, size, bold=False, antialias=True):
+        """Return a rendered label Surface; do not draw onto it, it is shared."""
+        key = (name, size, bold, text, color, antialias)
+        label = self.labels.get(key)
+        if label is not None:
+            self.hits += 1
+            self.labels.move_to_end(key)
+            return label
+
+        self.misses += 1
+        label = self.font(name, size, bold).render(text, antialias, color)
+        self.labels[key] = label
+        if len(self.labels) > self.max_labels:
+            self.labels.popitem(last=False)
+        return label
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return (f'text cache: {self.hits} hits, {self.misses} misses '
+                f'({self.hit_rate:.1%} hit rate), {len(self.fonts)} fonts, {len(self.labels)} labels')
+
+
+# Shared by every game in the process
+text_cache = TextCache()
@@ -0,0 +1,78 @@
+"""
+Fixed-timestep game loop scheduling.
+
+Simulation steps (gravity) run at a fixed interval from an accumulator of
+real elapsed time, so the fall speed does not depend on the frame rate and
+no step is lost or delayed when a frame runs long. Frames are drawn at most
+max_fps times a second, and only when the loop says something changed.
+Between the two the loop sleeps instead of spinning a CPU core.
+
+    timestep = FixedTimestep(0.5)
+    while running:
+        changed = handle_events()
+        for _ in range(timestep.steps()):
+            changed = True
+            gravity()
+        if timestep.frame_due(changed):
+            draw()
+        timestep.wait()
+"""
+import time
+
+
+class FixedTimestep:
+    def __init__(self, step_seconds, max_fps=60, max_steps=5):
+        """
+        step_seconds: simulation interval; may be changed between frames,
+        e.g. to speed up gravity.
+        max_steps: the most steps one steps() call returns. A longer backlog
+        (the window was dragged, the process was suspended) is dropped so the
+        game does not fast-forward.
+        """
+        self.step_seconds = step_seconds
+        self.frame_seconds = 1 / max_fps
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.last = time.perf_counter()
+        self.last_frame = None
+        self.pending_frame = True  # draw the first frame even if nothing changed
+
+    def steps(self):
+        """Return how many simulation steps are due since the last call."""
+        now = time.perf_counter()
+        self.accumulator += now - self.last
+        self.last = now
+        count = int(self.accumulator // self.step_seconds)
+        if count > self.max_steps:
+            count = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= count * self.step_seconds
+        return count
+
+    def frame_due(self, changed=True):
+        """
+        Return True if a frame should be drawn now: something changed since
+        the last frame and the frame cap allows it. Changes that arrive
+        while the cap holds a frame back are drawn on a later call.
+        """
+        self.pending_frame = self.pending_frame or changed
+        if not self.pending_frame:
+            return False
+        now = time.perf_counter()
+        if self.last_frame is not None and now - self.last_frame < self.frame_seconds:
+            return False
+        self.last_frame = now
+        self.pending_frame = False
+        return True
+
+    def wait(self):
+        """
+        Sleep until the next step is due, polling input at the frame rate.
+        """
+        now = time.perf_counter()
+        delay = min(self.step_seconds - self.accumulator - (now - self.last), self.frame_seconds)
+        if self.pending_frame and self.last_frame is not None:
+            delay = min(delay, self.last_frame + self.frame_seconds - now)
+        if delay > 0:
+            time.sleep(delay)
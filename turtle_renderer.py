@@ -0,0 +1,64 @@
+"""
+Retained-mode board renderer for turtle graphics.
+
+Redrawing a board with turtle.clear() and goto/forward/left/fill per cell
+costs hundreds of turtle moves per frame, each animated on screen. Here
+automatic screen updates are turned off (tracer(0)), every cell is a
+stamped square that is re-stamped only when its value changes, and the
+screen is refreshed with one update() per frame.
+"""
+import turtle
+
+EMPTY_OUTLINE = (0, 0, 0)
+EMPTY_FILL = (255, 255, 255)
+STAMP_PIXELS = 20  # size of turtle's 'square' shape at shapesize 1
+
+
+class CellRenderer:
+    def __init__(self, screen, width, height, colors, cell_pixels):
+        """
+        colors maps a board value to an (r, g, b) tuple; value 0 is drawn as
+        an empty outlined cell. Cell (x, y) is centered on world coordinates
+        (x + 0.5, height - y - 0.5), so row 0 is at the top.
+        """
+        screen.tracer(0)
+        screen.colormode(255)
+        self.screen = screen
+        self.width = width
+        self.height = height
+        self.colors = colors
+
+        self.pen = turtle.RawTurtle(screen, visible=False)
+        self.pen.penup()
+        self.pen.shape('square')
+        stretch = cell_pixels * 0.9 / STAMP_PIXELS
+        self.pen.shapesize(stretch, stretch, 1)
+
+        self.stamps = [[None] * width for _ in range(height)]
+        self.values = [[None] * width for _ in range(height)]
+        self.cells_drawn = 0
+
+    def draw_cell(self, x, y, value):
+        pen = self.pen
+        stamp = self.stamps[y][x]
+        if stamp is not None:
+            pen.clearstamp(stamp)
+        pen.goto(x + 0.5, self.height - y - 0.5)
+        if value:
+            pen.color(self.colors[value], self.colors[value])
+        else:
+            pen.color(EMPTY_OUTLINE, EMPTY_FILL)
+        self.stamps[y][x] = pen.stamp()
+        self.values[y][x] = value
+        self.cells_drawn += 1
+
+    def render(self, board):
+        """Re-stamp the cells whose value changed, then refresh the screen once."""
+        values = self.values
+        for y, row in enumerate(board):
+            if row != values[y]:
+                last_row = values[y]
+                for x, value in enumerate(row):
+                    if value != last_row[x]:
+                        self.draw_cell(x, y, value)
+        self.screen.update()
@@ -0,0 +1,377 @@
+"""
+Head-to-head versus matches over asyncio, on the Tetris class of
+TetrisByClaude3.5.py.
+
+One server process runs the authoritative game of every match. Clients
+only send inputs; the server applies them on its next tick, runs gravity
+as Tetris.run() does, and sends each board's changes to both players of
+the match. Clients are paired in the order they connect. Both players get
+the same pieces (a 7-bag with a per-match seed). Clearing 2, 3 or 4 lines
+at once sends 1, 2 or 4 garbage rows to the opponent, with the gap in one
+random column. The match ends when a board tops out or a player leaves.
+
+    python versus.py --port 8765
+
+    client = VersusClient()
+    await client.connect('127.0.0.1', 8765)
+    client.send(HARD_DROP)
+    while await client.receive() is not None:
+        draw(client.boards[client.seat], client.boards[1 - client.seat])
+
+Protocol, all integers big-endian:
+
+    client -> server, 3 bytes per input
+        action (u8, the actions of Tetris.step()), sequence number (u16,
+        counting up and wrapping)
+    server -> client, each message prefixed with its length (u16)
+        START  0, your seat (u8), width (u8), height (u8), preview (u8)
+        FRAME  1, board (u8), tick (u32), ack (u16), score (i32),
+               game over (u8), piece code (u8), rotation (u8), x (i8),
+               y (i8), next pieces (preview x u8), changed rows (u8),
+               then for each changed row its y (u8) and width cell codes (u8)
+        END    2, winning seat (u8, DRAW if neither won)
+
+Board width, height and row numbers are u8 and piece x and y are i8, so a
+board can be at most MAX_SIZE (127) cells each way; Match refuses larger
+ones. Cell and piece codes are 0 for empty, 1-7 for SHAPE_NAMES[code - 1]
+and 8 for garbage. ack is the sequence number of the last input the server
+applied for the board's player. A frame is only sent when something on
+the board changed, and it only carries the rows that differ from the last
+frame for that board; the server finds them by identity first, since
+Tetris replaces a row instead of writing into it.
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import struct
+import sys
+from collections import deque
+
+
+def _load_claude():
+    name = 'TetrisByClaude3_5'
+    if name not in sys.modules:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'TetrisByClaude3.5.py')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+# The rules module calls pygame.init(), which would otherwise turn SIGINT/SIGTERM into a pygame
+# QUIT event that nothing here reads, leaving the server impossible to stop
+os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+rules = _load_claude()
+
+NOOP, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP = (rules.NOOP, rules.LEFT, rules.RIGHT,
+                                              rules.ROTATE, rules.DOWN, rules.HARD_DROP)
+
+START, FRAME, END = range(3)
+DRAW = 255
+PREVIEW = 3  # next pieces sent with every frame
+
+INPUT = struct.Struct('>BH')
+LENGTH = struct.Struct('>H')
+START_MESSAGE = struct.Struct('>HBBBBB')
+FRAME_HEADER = struct.Struct('>HBBIHiBBBbb')
+END_MESSAGE = struct.Struct('>HBB')
+
+GARBAGE = [0, 0, 1, 2, 4]  # rows sent for 0-4 lines cleared at once
+
+# Cell and piece codes, and the colors they stand for on the client
+COLORS = [rules.BLACK] + [rules.SHAPE_COLORS[name] for name in rules.SHAPE_NAMES] + [rules.GRAY]
+CODES = {color: code for code, color in enumerate(COLORS)}
+SHAPE_CODES = {name: code for code, name in enumerate(rules.SHAPE_NAMES, 1)}
+
+# A client that stops reading is dropped once this much is queued for it
+MAX_BUFFER = 256 * 1024
+
+# Largest board width or height the protocol can carry: piece x and y are i8
+MAX_SIZE = 127
+
+
+class Seat:
+    """One player of a match: their game, connection and what they were last sent."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.inputs = deque()  # (action, sequence) received since the last tick
+        self.connected = True
+        self.game = None
+        self.ack = 0
+        self.lines = 0
+        self.sent_rows = None
+        self.sent_head = None
+
+    def start(self, seed, now_ms):
+        game = rules.Tetris(headless=True, source=rules.BagSource(len(rules.SHAPE_NAMES), PREVIEW - 1, seed=seed))
+        game.fall_time = now_ms
+        self.game = game
+        # The client starts from an empty board, so empty rows are never sent
+        self.sent_rows = [[rules.BLACK] * game.width] * game.height
+
+    def frame(self, board, tick):
+        """The FRAME message for this seat's board, or None if nothing changed since the last one."""
+        game = self.game
+        grid, sent = game.grid, self.sent_rows
+        changed = [y for y, row in enumerate(grid) if row is not sent[y] and row != sent[y]]
+        piece = game.current_piece
+        queue = bytes([SHAPE_CODES[game.next_piece.shape]] + [code + 1 for code in game.source.upcoming(PREVIEW - 1)])
+        head = (self.ack, game.score, game.game_over, piece.shape, piece.rotation, piece.x, piece.y, queue)
+        if not changed and head == self.sent_head:
+            return None
+        self.sent_rows = grid[:]
+        self.sent_head = head
+
+        width = game.width
+        rows = b''.join(bytes([y]) + bytes([CODES[cell] for cell in grid[y]]) for y in changed)
+        length = FRAME_HEADER.size - LENGTH.size + len(queue) + 1 + len(changed) * (width + 1)
+        return (FRAME_HEADER.pack(length, FRAME, board, tick, self.ack, game.score, game.game_over,
+                                  SHAPE_CODES[piece.shape], piece.rotation, piece.x, piece.y)
+                + queue + bytes([len(changed)]) + rows)
+
+
+class Match:
+    def __init__(self, seats, seed, now_ms):
+        self.seats = seats
+        self.rng = random.Random(seed)
+        for seat in seats:
+            seat.start(seed, now_ms)
+        width, height = seats[0].game.width, seats[0].game.height
+        if not (0 < width <= MAX_SIZE and 0 < height <= MAX_SIZE):
+            raise ValueError(f'a {width}x{height} board does not fit the protocol (at most {MAX_SIZE}x{MAX_SIZE})')
+        for index, seat in enumerate(seats):
+            seat.writer.write(START_MESSAGE.pack(START_MESSAGE.size - LENGTH.size, START, index,
+                                                 width, height, PREVIEW))
+
+    def tick(self, tick, now_ms):
+        """Apply inputs and gravity, exchange garbage and send frames. Returns True when the match is over."""
+        seats = self.seats
+        for index, seat in enumerate(seats):
+            game, opponent = seat.game, seats[1 - index]
+            inputs = seat.inputs
+            while inputs and not game.game_over:
+                action, seat.ack = inputs.popleft()
+                game.apply_action(action)
+                self.send_garbage(seat, opponent)
+            inputs.clear()
+            if not game.game_over and now_ms - game.fall_time > game.fall_speed:
+                game.fall_time = now_ms
+                game.apply_gravity()
+                self.send_garbage(seat, opponent)
+
+        for index, seat in enumerate(seats):
+            message = seat.frame(index, tick)
+            if message is not None:
+                for viewer in seats:
+                    if viewer.connected:
+                        viewer.writer.write(message)
+
+        for seat in seats:
+            if seat.connected and seat.writer.transport.get_write_buffer_size() > MAX_BUFFER:
+                seat.connected = False
+                seat.writer.close()
+        over = [seat.game.game_over or not seat.connected for seat in seats]
+        if not any(over):
+            return False
+        winner = DRAW if all(over) else over.index(False)
+        for seat in seats:
+            if seat.connected:
+                seat.writer.write(END_MESSAGE.pack(END_MESSAGE.size - LENGTH.size, END, winner))
+                seat.writer.close()
+        return True
+
+    def send_garbage(self, seat, opponent):
+        # Called after every action and gravity step, so each lock is counted on its own
+        cleared = seat.game.lines_cleared - seat.lines
+        if cleared:
+            seat.lines = seat.game.lines_cleared
+            rows = GARBAGE[min(cleared, 4)]
+            if rows and not opponent.game.game_over:
+                opponent.game.add_garbage(rows, self.rng.randrange(opponent.game.width))
+
+
+class VersusServer:
+    def __init__(self, tick_rate=60, seed=None):
+        """
+        tick_rate: game ticks per second. Inputs are applied and frames sent
+        once per tick, for every match at once.
+        """
+        self.tick_seconds = 1 / tick_rate
+        self.rng = random.Random(seed)
+        self.lobby = None  # a seat waiting for an opponent
+        self.matches = []
+        self.matches_served = 0
+        self.server = None
+        self.ticker = None
+        self.started = 0.0
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Listen on host:port (0 picks a free port). Returns the bound port."""
+        self.started = asyncio.get_running_loop().time()
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self.ticker = asyncio.ensure_future(self.run_ticks())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.ticker.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        writer.transport.set_write_buffer_limits(MAX_BUFFER)
+        seat = Seat(writer)
+        if self.lobby is None or not self.lobby.connected:
+            self.lobby = seat
+        else:
+            self.matches.append(Match([self.lobby, seat], self.rng.getrandbits(32), self.now_ms()))
+            self.lobby = None
+
+        pending = b''
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                pending += data
+                end = len(pending) - len(pending) % INPUT.size
+                seat.inputs.extend(INPUT.iter_unpack(pending[:end]))
+                pending = pending[end:]
+        except ConnectionError:
+            pass
+        seat.connected = False
+        if self.lobby is seat:
+            self.lobby = None
+        # Match.tick() only closes seats that are still connected, so a player who left is closed here
+        writer.close()
+
+    def now_ms(self):
+        return int((asyncio.get_running_loop().time() - self.started) * 1000)
+
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        tick = 0
+        while True:
+            now_ms = self.now_ms()
+            finished = [match for match in self.matches if match.tick(tick, now_ms)]
+            for match in finished:
+                self.matches.remove(match)
+            self.matches_served += len(finished)
+            tick += 1
+            next_tick += self.tick_seconds
+            delay = next_tick - loop.time()
+            if delay < -self.tick_seconds:
+                next_tick = loop.time()  # fell behind: skip the missed ticks instead of bunching them up
+            await asyncio.sleep(max(delay, 0))
+
+
+class BoardView:
+    """A client's copy of one board, rebuilt from FRAME messages."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.grid = [bytearray(width) for _ in range(height)]  # cell codes
+        self.tick = 0
+        self.ack = 0
+        self.score = 0
+        self.game_over = False
+        self.piece = None  # (shape code, rotation, x, y)
+        self.queue = ()
+
+    def apply(self, message, preview):
+        (_, _, _, self.tick, self.ack, self.score, game_over,
+         shape, rotation, x, y) = FRAME_HEADER.unpack_from(message)
+        self.game_over = bool(game_over)
+        self.piece = (shape, rotation, x, y)
+        offset = FRAME_HEADER.size
+        self.queue = tuple(message[offset:offset + preview])
+        offset += preview
+        width = self.width
+        for _ in range(message[offset]):
+            y = message[offset + 1]
+            self.grid[y][:] = message[offset + 2:offset + 2 + width]
+            offset += width + 1
+
+    def colors(self):
+        """The board as rows of colors, like Tetris.grid."""
+        return [[COLORS[code] for code in row] for row in self.grid]
+
+
+class VersusClient:
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.seat = None
+        self.boards = None
+        self.preview = 0
+        self.winner = None
+        self.sequence = 0
+        self.received = 0  # bytes
+
+    async def connect(self, host='127.0.0.1', port=8765):
+        """Connect and wait for an opponent; returns once the match starts."""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        message = await self.read()
+        _, _, self.seat, width, height, self.preview = START_MESSAGE.unpack(message)
+        self.boards = [BoardView(width, height), BoardView(width, height)]
+
+    def send(self, action):
+        """Send an input. Returns its sequence number, which boards[seat].ack reaches once it was applied."""
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        self.writer.write(INPUT.pack(action, self.sequence))
+        return self.sequence
+
+    async def read(self):
+        header = await self.reader.readexactly(LENGTH.size)
+        message = header + await self.reader.readexactly(LENGTH.unpack(header)[0])
+        self.received += len(message)
+        return message
+
+    async def receive(self):
+        """
+        Read one message. Returns the index of the board a frame updated, or
+        None once the match is over (winner is then set).
+        """
+        try:
+            message = await self.read()
+        except asyncio.IncompleteReadError:
+            return None
+        if message[2] == END:
+            self.winner = message[3]
+            return None
+        board = message[3]
+        self.boards[board].apply(message, self.preview)
+        return board
+
+    async def close(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(host, port, tick_rate):
+    server = VersusServer(tick_rate)
+    port = await server.start(host, port)
+    print(f'listening on {host}:{port}', flush=True)
+    await server.server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tetris versus server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='0 picks a free port')
+    parser.add_argument('--tick-rate', type=int, default=60)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.tick_rate))
+    except KeyboardInterrupt:
+        pass
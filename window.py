@@ -0,0 +1,34 @@
+"""
+Lazily opened pygame window.
+
+Importing a game module should only define its rules and data, so tools
+(benchmarks, agents, replays) can use the game logic without a display.
+A Window holds the size and caption and only initializes pygame (display,
+font and mixer) and opens the window the first time something is drawn:
+
+    WINDOW = Window((SCREEN_WIDTH, SCREEN_HEIGHT), 'Tetris')
+
+    def draw_grid():
+        screen = WINDOW.get()
+        ...
+"""
+import pygame
+
+
+class Window:
+    def __init__(self, size, caption='Tetris'):
+        self.size = size
+        self.caption = caption
+        self.surface = None
+
+    def get(self):
+        """Return the display surface, initializing pygame and opening the window on first use."""
+        if self.surface is None or not pygame.display.get_init():  # also reopen after pygame.quit()
+            pygame.init()
+            self.surface = pygame.display.set_mode(self.size)
+            pygame.display.set_caption(self.caption)
+        return self.surface
+
+    @property
+    def is_open(self):
+        return self.surface is not None and pygame.display.get_init()